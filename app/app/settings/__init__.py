@@ -0,0 +1,3 @@
+"""
+Settings package, select a module with DJANGO_SETTINGS_MODULE
+"""
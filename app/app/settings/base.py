@@ -0,0 +1,306 @@
+"""
+Django settings for app project, shared by every environment.
+
+Environment specific values live in app.settings.development and
+app.settings.production.
+
+Generated by 'django-admin startproject' using Django 4.0.10.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.0/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/4.0/ref/settings/
+"""
+
+import os
+from pathlib import Path
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/4.0/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = (
+    "django-insecure-y^d59uu&wo03sab*-+9^8z)exw)oll2uxhs=t-2dnz@i!j_ee_"
+)
+
+# SECURITY WARNING: don't run with debug turned on in production!
+# DEBUG keeps every executed query in memory, only development enables it.
+DEBUG = False
+
+ALLOWED_HOSTS = ["host.docker.internal", "localhost", "127.0.0.1"]
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "rest_framework",
+    "rest_framework.authtoken",
+    "drf_spectacular",
+    "django_prometheus",
+    "core",
+    "user",
+    "product",
+]
+
+MIDDLEWARE = [
+    "django_prometheus.middleware.PrometheusBeforeMiddleware",
+    "core.middleware.CompressionMiddleware",
+    "core.middleware.QueryBudgetMiddleware",
+    "core.middleware.ProfilingMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "django_prometheus.middleware.PrometheusAfterMiddleware",
+]
+
+ROOT_URLCONF = "app.urls"
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [],
+        "APP_DIRS": True,
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = "app.wsgi.application"
+
+
+# Database
+# https://docs.djangoproject.com/en/4.0/ref/settings/#databases
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django_prometheus.db.backends.postgresql",
+        "HOST": os.environ.get("DB_HOST"),
+        "NAME": os.environ.get("DB_NAME"),
+        "USER": os.environ.get("DB_USER"),
+        "PASSWORD": os.environ.get("DB_PASS"),
+        "CONN_MAX_AGE": 0,
+    }
+}
+
+# Optional streaming replica, catalog list and retrieve actions read from it
+if os.environ.get("DB_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": os.environ.get("DB_REPLICA_HOST"),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["core.routers.PrimaryReplicaRouter"]
+
+REPLICA_DATABASE = "replica" if "replica" in DATABASES else None
+
+# Seconds a user's reads stay on the primary after they wrote
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 5))
+
+
+# Password hashing
+# The profile's hasher hashes new passwords, the others only verify old
+# hashes, which are upgraded on the next successful login.
+
+PASSWORD_HASHER_PROFILES = {
+    "argon2": "core.hashers.Argon2PasswordHasher",
+    "bcrypt": "core.hashers.BCryptSHA256PasswordHasher",
+    "scrypt": "core.hashers.ScryptPasswordHasher",
+    "pbkdf2": "core.hashers.PBKDF2PasswordHasher",
+}
+
+PASSWORD_HASHER_PROFILE = os.environ.get("PASSWORD_HASHER_PROFILE", "pbkdf2")
+
+PASSWORD_HASHERS = [PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]] + [
+    hasher
+    for name, hasher in PASSWORD_HASHER_PROFILES.items()
+    if name != PASSWORD_HASHER_PROFILE
+]
+
+# Cost parameters, unset values keep Django's defaults
+PASSWORD_HASHER_COST = {
+    name: int(os.environ[name])
+    for name in (
+        "ARGON2_TIME_COST",
+        "ARGON2_MEMORY_COST",
+        "ARGON2_PARALLELISM",
+        "BCRYPT_ROUNDS",
+        "SCRYPT_WORK_FACTOR",
+        "PBKDF2_ITERATIONS",
+    )
+    if name in os.environ
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.CommonPasswordValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/4.0/topics/i18n/
+
+LANGUAGE_CODE = "en-us"
+
+TIME_ZONE = "Asia/Jakarta"
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/4.0/howto/static-files/
+
+STATIC_URL = "static/"
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+AUTH_USER_MODEL = "core.User"
+
+REST_FRAMEWORK = {
+    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.TimedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.EstimatedCountPagination",
+    "DEFAULT_THROTTLE_CLASSES": ["core.throttling.TokenBucketThrottle"],
+    # Trusted proxies in front of the app. Throttles key anonymous clients
+    # on REMOTE_ADDR unless set, as clients can forge X-Forwarded-For.
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", 0)),
+}
+
+# Lists and admin changelists the planner expects to hold more rows count
+# from an estimate, see core/pagination.py. Exact counts are refreshed in
+# a background thread and cached for COUNT_CACHE_TIMEOUT seconds.
+COUNT_ESTIMATE_THRESHOLD = int(
+    os.environ.get("COUNT_ESTIMATE_THRESHOLD", 100_000)
+)
+COUNT_CACHE_TIMEOUT = 300
+COUNT_REFRESH_IN_BACKGROUND = True
+
+# Return the per-phase timings of the API views in a Server-Timing header
+SERVER_TIMING_HEADER = os.environ.get("SERVER_TIMING_HEADER") == "1"
+
+# Seconds the catalog list responses are cached per user, 0 to disable.
+# See core/cache.py.
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_TIMEOUT", 0))
+
+# Seconds the response to an Idempotency-Key is kept for retries, and
+# the longest a first request may run before a retry may run again. See
+# core/idempotency.py.
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+IDEMPOTENCY_LOCK_TIMEOUT = 60
+
+# Deployed release, keying caches that must not outlive a deploy
+APP_VERSION = os.environ.get("APP_VERSION", "dev")
+
+# Where the prebuilt OpenAPI schema of each APP_VERSION is kept, see
+# core/schema.py
+SCHEMA_CACHE_DIR = os.environ.get("SCHEMA_CACHE_DIR", "/tmp/schema")
+
+# Seconds the async read views cache a token's user id and active flag.
+# Deleting the token or changing the user drops the entry sooner.
+AUTH_TOKEN_CACHE_TIMEOUT = 60
+
+# Opt-in stateless tokens, see core/tokens.py. Lifetimes are in seconds,
+# access tokens can't be revoked so keep theirs short.
+SIGNED_TOKENS_ENABLED = os.environ.get("SIGNED_TOKENS_ENABLED") == "1"
+SIGNED_ACCESS_TOKEN_LIFETIME = int(
+    os.environ.get("SIGNED_ACCESS_TOKEN_LIFETIME", 300)
+)
+SIGNED_REFRESH_TOKEN_LIFETIME = int(
+    os.environ.get("SIGNED_REFRESH_TOKEN_LIFETIME", 7 * 24 * 3600)
+)
+
+REDIS_URL = os.environ.get("REDIS_URL", "redis://127.0.0.1:6379")
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+    },
+    # Per-process LRU in front of "default" for tiny hot values, see
+    # core/nearcache.py
+    "near": {
+        "BACKEND": "core.nearcache.NearCache",
+        "LOCATION": "near",
+        "OPTIONS": {
+            "REMOTE": "default",
+            "MAX_ENTRIES": 10_000,
+            "MAX_BYTES": 16 * 2**20,
+            "LOCAL_TIMEOUT": 5,
+        },
+    },
+}
+
+# Token buckets checked before any password hashing on login, as
+# "<requests>/<period>" where the period is sec, min, hour or day
+RATELIMIT_BACKEND = "core.ratelimit.RedisTokenBucket"
+
+LOGIN_RATE_LIMITS = {
+    "email": os.environ.get("LOGIN_RATE_LIMIT_EMAIL", "10/min"),
+    "ip": os.environ.get("LOGIN_RATE_LIMIT_IP", "60/min"),
+}
+
+# Token buckets of every API endpoint per user ("user"), per client IP
+# for anonymous requests ("anon"), or per the view's throttle_scope
+API_RATE_LIMITS = {
+    "user": os.environ.get("API_RATE_LIMIT_USER", "20/s"),
+    "anon": os.environ.get("API_RATE_LIMIT_ANON", "5/s"),
+    "catalog-list": os.environ.get("API_RATE_LIMIT_CATALOG_LIST", "5/s"),
+}
+
+# Fraction of requests whose SQL queries are counted, see
+# core/middleware.py. Over-budget views are logged, or raise with "raise".
+QUERY_BUDGET_SAMPLE_RATE = float(
+    os.environ.get("QUERY_BUDGET_SAMPLE_RATE", 0)
+)
+QUERY_BUDGET_ACTION = os.environ.get("QUERY_BUDGET_ACTION", "log")
+
+# Stack sampling of requests, see core/middleware.py. Requests are
+# profiled when their X-Profile header equals PROFILING_TOKEN (unset
+# disables the header) or at PROFILING_SAMPLE_RATE.
+PROFILING_TOKEN = os.environ.get("PROFILING_TOKEN", "")
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", 0))
+PROFILING_INTERVAL = float(os.environ.get("PROFILING_INTERVAL", 0.005))
+PROFILING_DIR = os.environ.get("PROFILING_DIR", "/tmp/profiles")
@@ -0,0 +1,19 @@
+"""
+Development settings, used by manage.py and the test suite
+"""
+
+from app.settings.base import *  # noqa: F401,F403
+
+DEBUG = True
+
+# Count every request and fail loudly on N+1 regressions
+QUERY_BUDGET_SAMPLE_RATE = 1.0
+QUERY_BUDGET_ACTION = "raise"
+
+SERVER_TIMING_HEADER = True
+
+# Tests and local load runs shouldn't trip the API rate limits
+API_RATE_LIMITS = {}
+
+# Rebuild the schema on every restart while the code changes under it
+SCHEMA_CACHE_DIR = None
@@ -0,0 +1,55 @@
+"""
+Production settings, used by the WSGI/ASGI entrypoints and gunicorn
+"""
+
+import os
+
+from app.settings.base import *  # noqa: F401,F403
+from app.settings.base import DATABASES
+
+# Never read DEBUG from the environment here, see app/gunicorn.conf.py
+DEBUG = False
+
+SECRET_KEY = os.environ["DJANGO_SECRET_KEY"]
+
+# Names the prebuilt OpenAPI schema, see core/schema.py. Required so a new
+# release never serves the schema of the previous one.
+APP_VERSION = os.environ["APP_VERSION"]
+
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.environ.get("DJANGO_ALLOWED_HOSTS", "").split(",")
+    if host.strip()
+]
+
+# Keep connections open across requests, each worker thread holds one.
+# Size workers * threads below PostgreSQL max_connections.
+DATABASES = {
+    alias: {
+        **config,
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
+    }
+    for alias, config in DATABASES.items()
+}
+
+# Optional bounded connection pool per process, see
+# core/db/backends/postgresql_pool. Connections return to the pool at the
+# end of each request instead of staying pinned to a worker thread.
+if os.environ.get("DB_POOL") == "1":
+    DATABASES["default"].update(
+        {
+            "ENGINE": "core.db.backends.postgresql_pool",
+            "CONN_MAX_AGE": 0,
+            "POOL": {
+                "MAX_SIZE": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+                "TIMEOUT": float(os.environ.get("DB_POOL_TIMEOUT", 5)),
+                "IDLE_TIMEOUT": float(
+                    os.environ.get("DB_POOL_IDLE_TIMEOUT", 300)
+                ),
+                "CHECK_AFTER": float(
+                    os.environ.get("DB_POOL_CHECK_AFTER", 5)
+                ),
+            },
+        }
+    )
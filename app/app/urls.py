@@ -2,19 +2,18 @@
     app URL Configuration
 """
 
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-)
+from drf_spectacular.views import SpectacularSwaggerView
 from django.contrib import admin
 from django.urls import include, path
 from django.views.generic.base import RedirectView
 
+from core.schema import PrebuiltSchemaView
+
 
 urlpatterns = [
     path("", RedirectView.as_view(url="api/docs")),
     path("admin/", admin.site.urls),
-    path("api/schema", SpectacularAPIView.as_view(), name="api-schema"),
+    path("api/schema", PrebuiltSchemaView.as_view(), name="api-schema"),
     path(
         "api/docs/",
         SpectacularSwaggerView.as_view(url_name="api-schema"),
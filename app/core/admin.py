@@ -1,8 +1,22 @@
-from django.contrib import admin
+from decimal import Decimal
+
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.exceptions import ValidationError
+from django.db.models import F, Value
+from django.db.models.functions import Greatest, Least, Round
 from django.utils.translation import gettext_lazy as _
 
 from core import models
+from core.cache import bump_catalog_versions
+from core.pagination import EstimatedCountPaginator
+
+
+# Largest price the max_digits=6, decimal_places=0 column holds
+PRICE_MAX = Value(Decimal(999999))
 
 
 class UserAdmin(BaseUserAdmin):
@@ -59,4 +73,199 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
+class ProductActionForm(helpers.ActionForm):
+    # Extra inputs of the bulk catalog actions
+    percent = forms.DecimalField(
+        required=False,
+        max_digits=5,
+        decimal_places=2,
+        help_text=_("Reprice by this percent, negative for a discount"),
+    )
+    quantity = forms.IntegerField(
+        required=False,
+        min_value=1,
+        help_text=_("Add this many units to the stock"),
+    )
+
+
+def _bump_owners(queryset):
+    # Invalidate the cached API responses of the owners of these rows
+    bump_catalog_versions(
+        queryset.order_by().values_list("created_by", flat=True).distinct()
+    )
+
+
+class CatalogAdminMixin:
+    # Invalidate the owners' cached API responses on every admin write
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        owners = {form.instance.created_by_id}
+        if change and "created_by" in form.changed_data:
+            owners.add(form.initial["created_by"])
+        bump_catalog_versions(owners)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump_catalog_versions([obj.created_by_id])
+
+    def delete_queryset(self, request, queryset):
+        owners = []
+        if settings.RESPONSE_CACHE_TIMEOUT:
+            owners = list(
+                queryset.order_by()
+                .values_list("created_by", flat=True)
+                .distinct()
+            )
+        super().delete_queryset(request, queryset)
+        bump_catalog_versions(owners)
+
+
+def _action_value(modeladmin, request, name):
+    # Read an action form input, or tell the operator it is missing
+    field = modeladmin.action_form.base_fields[name]
+    try:
+        value = field.clean(request.POST.get(name))
+    except ValidationError:
+        value = None
+    if value is not None:
+        return value
+
+    modeladmin.message_user(
+        request,
+        _("Enter a valid %(name)s for this action.") % {"name": name},
+        messages.ERROR,
+    )
+    return None
+
+
+def _restock(modeladmin, request, stocks):
+    # Add the quantity to the stocks in a single UPDATE
+    quantity = _action_value(modeladmin, request, "quantity")
+    if quantity is None:
+        return
+
+    updated = stocks.update(quantity=F("quantity") + quantity)
+    _bump_owners(stocks)
+    modeladmin.message_user(
+        request,
+        _("Restocked %(count)d products.") % {"count": updated},
+        messages.SUCCESS,
+    )
+
+
+class ProductCategoryLinkInline(admin.TabularInline):
+    model = models.ProductCategoryLink
+    fields = ["productcategory"]
+    autocomplete_fields = ["productcategory"]
+    extra = 0
+
+
+class ProductAdmin(CatalogAdminMixin, admin.ModelAdmin):
+    # Define the admin pages for products. The changelist counts with an
+    # estimate past COUNT_ESTIMATE_THRESHOLD rows and skips the unfiltered
+    # total, so it stays fast on a catalog of millions of products. Owners,
+    # stock and categories come from one joined query and one prefetch per
+    # page, and bulk actions run as a single UPDATE.
+    ordering = ["-id"]
+    list_display = [
+        "name",
+        "price",
+        "stock_quantity",
+        "category_names",
+        "created_by",
+        "created_at",
+    ]
+    list_select_related = ["created_by"]
+    search_fields = ["name"]
+    raw_id_fields = ["created_by", "stock"]
+    inlines = [ProductCategoryLinkInline]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    action_form = ProductActionForm
+    actions = ["reprice", "restock"]
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(stock_quantity=F("product_stock__quantity"))
+            .prefetch_related("categories")
+        )
+
+    @admin.display(description=_("Stock"), ordering="stock_quantity")
+    def stock_quantity(self, obj):
+        return obj.stock_quantity
+
+    @admin.display(description=_("Categories"))
+    def category_names(self, obj):
+        return ", ".join(category.name for category in obj.categories.all())
+
+    @admin.action(description=_("Reprice selected products by a percent"))
+    def reprice(self, request, queryset):
+        percent = _action_value(self, request, "percent")
+        if percent is None:
+            return
+
+        # Rounded to whole units and kept within the price column
+        price = Round(F("price") * (1 + percent / 100))
+        updated = queryset.update(
+            price=Greatest(Least(price, PRICE_MAX), Value(Decimal(0)))
+        )
+        _bump_owners(queryset)
+        self.message_user(
+            request,
+            _("Repriced %(count)d products.") % {"count": updated},
+            messages.SUCCESS,
+        )
+
+    @admin.action(description=_("Restock selected products"))
+    def restock(self, request, queryset):
+        stocks = models.ProductStock.objects.filter(
+            product__in=queryset.values("pk")
+        )
+        _restock(self, request, stocks)
+
+    def save_formset(self, request, form, formset, change):
+        # Category links carry the owner of their product
+        links = formset.save(commit=False)
+        for link in formset.deleted_objects:
+            link.delete()
+        for link in links:
+            link.created_by_id = form.instance.created_by_id
+            link.save()
+
+
+class ProductCategoryAdmin(CatalogAdminMixin, admin.ModelAdmin):
+    # Define the admin pages for product categories, searched by the
+    # product pages' category autocomplete
+    ordering = ["name"]
+    list_display = ["name", "created_by", "created_at"]
+    list_select_related = ["created_by"]
+    search_fields = ["name"]
+    raw_id_fields = ["created_by"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class ProductStockAdmin(CatalogAdminMixin, admin.ModelAdmin):
+    # Define the admin pages for product stock
+    ordering = ["-id"]
+    list_display = ["product", "quantity", "created_by", "created_at"]
+    list_select_related = ["product", "created_by"]
+    search_fields = ["product__name"]
+    raw_id_fields = ["product", "created_by"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    action_form = ProductActionForm
+    actions = ["restock"]
+
+    @admin.action(description=_("Restock selected stock"))
+    def restock(self, request, queryset):
+        _restock(self, request, queryset)
+
+
 admin.site.register(models.User, UserAdmin)
+admin.site.register(models.Product, ProductAdmin)
+admin.site.register(models.ProductCategory, ProductCategoryAdmin)
+admin.site.register(models.ProductStock, ProductStockAdmin)
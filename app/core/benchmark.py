@@ -0,0 +1,42 @@
+"""
+Helpers shared by the benchmark management commands
+"""
+
+import math
+
+
+def percentile(values, pct):
+    # Return the nearest-rank percentile of a list of numbers
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    rank = max(int(math.ceil(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[rank]
+
+
+def summarize(latencies, elapsed, errors=0):
+    # Build a latency and throughput summary, latencies are in seconds
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(max(latencies) * 1000, 3) if count else 0.0,
+    }
+
+
+def format_summary(label, summary):
+    # Render a summary as a single human readable line
+    return (
+        f"{label:<24} {summary['throughput_rps']:>10.2f} req/s  "
+        f"p50 {summary['p50_ms']:>9.3f} ms  "
+        f"p95 {summary['p95_ms']:>9.3f} ms  "
+        f"p99 {summary['p99_ms']:>9.3f} ms  "
+        f"errors {summary['errors']}"
+    )
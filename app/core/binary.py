@@ -0,0 +1,59 @@
+"""
+MessagePack encoding of API data
+
+Responses and request bodies of the product and user endpoints can be
+MessagePack (application/msgpack) when the msgpack package is installed.
+Besides the types JSON has:
+
+- datetimes are MessagePack timestamps (extension type -1), in UTC
+- decimals, like product prices, are extension type 1 holding the exact
+  decimal as an ASCII string such as b"15000.00"
+- dates and times are ISO 8601 strings, as in JSON
+"""
+
+import datetime
+import decimal
+import uuid
+
+from django.utils import timezone
+from django.utils.functional import Promise
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+
+MEDIA_TYPE = "application/msgpack"
+DECIMAL_EXT = 1
+
+
+def _default(value):
+    if isinstance(value, datetime.datetime):
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return msgpack.Timestamp.from_datetime(value)
+    if isinstance(value, decimal.Decimal):
+        return msgpack.ExtType(DECIMAL_EXT, str(value).encode("ascii"))
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Promise)):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} as MessagePack")
+
+
+def _ext_hook(code, data):
+    if code == DECIMAL_EXT:
+        return decimal.Decimal(data.decode("ascii"))
+    return msgpack.ExtType(code, data)
+
+
+def packb(data):
+    return msgpack.packb(data, default=_default)
+
+
+def unpackb(content):
+    # Decode timestamps as aware UTC datetimes and decimals as Decimal
+    return msgpack.unpackb(content, ext_hook=_ext_hook, timestamp=3)
@@ -0,0 +1,178 @@
+"""
+Cached API responses
+
+List responses of the catalog viewsets are cached per user, keyed by a
+catalog version that every write through the API or admin replaces. An
+entry holds the rendered JSON in every encoding CompressionMiddleware
+offers, so a hit is served without queries, serialization or compression.
+
+Entries are filled by get_or_compute, which lets a single request
+recompute an expired value while concurrent ones wait for it or keep
+getting the stale copy, and refreshes hot values a little before they
+expire (probabilistic early expiration, "XFetch").
+"""
+
+import hashlib
+import math
+import random
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from core.compression import (
+    ENCODINGS,
+    MIN_LENGTH,
+    compress,
+    negotiate_encoding,
+)
+
+
+# Seconds a recomputation may hold its lock before another may start
+LOCK_TIMEOUT = 10
+
+# Seconds a request waits for another's computation of a missing value
+# before computing it itself
+LOCK_WAIT = 2.0
+LOCK_POLL = 0.02
+
+
+def _compute_and_store(key, compute, timeout, stale):
+    lock = f"{key}:lock"
+    try:
+        start = time.monotonic()
+        value = compute()
+        delta = time.monotonic() - start
+        cache.set(key, (value, time.time() + timeout, delta), timeout + stale)
+    finally:
+        cache.delete(lock)
+
+    return value
+
+
+def get_or_compute(key, compute, timeout, stale=None, beta=1.0):
+    # Return the cached value of key, computing it with compute() at most
+    # once at a time across processes. Values are fresh for timeout
+    # seconds and kept stale for stale more (default: timeout), served
+    # while one request recomputes. beta scales the early refresh, 0
+    # disables it.
+    stale = timeout if stale is None else stale
+    lock = f"{key}:lock"
+    entry = cache.get(key)
+    if entry is not None:
+        value, expires, delta = entry
+        # Refresh early with a probability growing as expiry nears and
+        # with the cost of the computation
+        early = -delta * beta * math.log(1 - random.random())
+        if time.time() + early < expires:
+            return value
+        if not cache.add(lock, 1, LOCK_TIMEOUT):
+            return value
+
+        return _compute_and_store(key, compute, timeout, stale)
+
+    if cache.add(lock, 1, LOCK_TIMEOUT):
+        return _compute_and_store(key, compute, timeout, stale)
+
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+
+    return compute()
+
+
+def catalog_version_key(user_id):
+    return f"catalog-version:{user_id}"
+
+
+def catalog_version(user_id):
+    # Return the version of a user's catalog, read through the near cache
+    # as every cached request needs it. A version is never reused, even
+    # when its key was evicted, so old entries can't come back.
+    near = caches["near"]
+    key = catalog_version_key(user_id)
+    version = near.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not near.add(key, version, None):
+            version = near.get(key) or version
+
+    return version
+
+
+def bump_catalog_versions(user_ids):
+    # Invalidate the cached responses of these users' catalogs. Nothing is
+    # cached without RESPONSE_CACHE_TIMEOUT, so writes skip the round trip.
+    if not settings.RESPONSE_CACHE_TIMEOUT:
+        return
+
+    versions = {
+        catalog_version_key(user_id): uuid.uuid4().hex
+        for user_id in user_ids
+    }
+    caches["near"].set_many(versions, None)
+
+
+def response_cache_key(request):
+    # Return the key of a request's cached response, per user, catalog
+    # version, path with query string and accepted media type
+    path = f"{request.get_full_path()}|{request.accepted_media_type}"
+    digest = hashlib.sha1(path.encode()).hexdigest()
+    version = catalog_version(request.user.pk)
+    return f"response:{request.user.pk}:{version}:{digest}"
+
+
+def response_entry(response):
+    # Build the cache entry of a rendered response
+    entry = {
+        "content_type": response["Content-Type"],
+        "identity": response.content,
+    }
+    if len(response.content) >= MIN_LENGTH:
+        for encoding in ENCODINGS:
+            entry[encoding] = compress(response.content, encoding)
+
+    return entry
+
+
+def cached_response(request, entry):
+    # Return the response of a cache entry in the encoding the client
+    # prefers
+    encoding = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+    if encoding in entry:
+        response = HttpResponse(entry[encoding])
+        response.headers["Content-Encoding"] = encoding
+    else:
+        response = HttpResponse(entry["identity"])
+
+    response.headers["Content-Type"] = entry["content_type"]
+    patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+    return response
+
+
+def cached_objects(user_id, name, ids):
+    # Return (key prefix, {id: data}) of the serialized objects of a
+    # user's catalog cached under its current version, or (None, {})
+    # without RESPONSE_CACHE_TIMEOUT
+    if not settings.RESPONSE_CACHE_TIMEOUT:
+        return None, {}
+
+    prefix = f"object:{name}:{user_id}:{catalog_version(user_id)}"
+    keys = {f"{prefix}:{pk}": pk for pk in ids}
+    found = cache.get_many(keys)
+    return prefix, {keys[key]: data for key, data in found.items()}
+
+
+def store_objects(prefix, objects):
+    # Cache serialized objects by id under a cached_objects prefix
+    if prefix is not None:
+        cache.set_many(
+            {f"{prefix}:{pk}": data for pk, data in objects.items()},
+            settings.RESPONSE_CACHE_TIMEOUT,
+        )
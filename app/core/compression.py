@@ -0,0 +1,82 @@
+"""
+Response compression shared by CompressionMiddleware and the response cache
+
+Brotli is used when the client accepts it and the brotli package is
+installed, gzip otherwise.
+"""
+
+import gzip
+import re
+import zlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+# Encodings in server preference order
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Bodies shorter than this gain nothing from compression
+MIN_LENGTH = 200
+
+COMPRESSIBLE_TYPE = re.compile(
+    r"^(text/|application/([\w.+-]*\+)?(json|xml|javascript|yaml)"
+    r"|application/vnd\.oai\.openapi)"
+)
+
+
+def negotiate_encoding(accept_encoding):
+    # Return the preferred encoding an Accept-Encoding header allows, or
+    # None for the identity encoding
+    qualities = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        match = re.search(r"q=([\d.]+)", params)
+        if match:
+            try:
+                q = float(match.group(1))
+            except ValueError:
+                q = 0.0
+        qualities[coding.strip().lower()] = q
+
+    for encoding in ENCODINGS:
+        if qualities.get(encoding, qualities.get("*", 0)) > 0:
+            return encoding
+
+    return None
+
+
+def is_compressible(response):
+    return bool(COMPRESSIBLE_TYPE.match(response.get("Content-Type", "")))
+
+
+def compress(content, encoding):
+    if encoding == "br":
+        return brotli.compress(content, quality=5)
+
+    return gzip.compress(content, compresslevel=6, mtime=0)
+
+
+def compress_stream(chunks, encoding):
+    # Compress an iterable of byte chunks, flushing after each chunk so
+    # streamed responses still reach the client as they are produced
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=5)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,80 @@
+"""
+PostgreSQL backend that checks connections out of a per-process pool
+
+Wraps the django-prometheus PostgreSQL engine, so query metrics keep
+working. Configure the pool with a "POOL" entry next to "ENGINE":
+
+    "POOL": {
+        "MAX_SIZE": 10,
+        "TIMEOUT": 5,
+        "IDLE_TIMEOUT": 300,
+        "CHECK_AFTER": 5,
+    }
+
+Connections idle for more than CHECK_AFTER seconds run a SELECT 1 before
+being handed out, and are replaced when it fails.
+
+Keep CONN_MAX_AGE at 0 so connections go back to the pool when Django
+closes them at the end of each request.
+"""
+
+from psycopg2 import extensions
+
+from django_prometheus.db.backends.postgresql import base
+
+from core.db.pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict.get("POOL", {}))
+
+    def get_new_connection(self, conn_params):
+        return self.pool.checkout(
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            ),
+            check=self._check_connection,
+        )
+
+    def _check_connection(self, connection):
+        # Report whether an idle connection still reaches the server
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            status = connection.info.transaction_status
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        except Exception:
+            return False
+
+        return True
+
+    def _close(self):
+        if self.connection is None:
+            return
+
+        with self.wrap_database_errors:
+            self.pool.release(
+                self.connection,
+                reusable=self._reset_connection(self.connection),
+            )
+
+    def _reset_connection(self, connection):
+        # Roll back leftover transactions, report whether the connection
+        # can be handed out again
+        if connection.closed:
+            return False
+
+        status = connection.info.transaction_status
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+
+        if status != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                connection.rollback()
+            except Exception:
+                return False
+
+        return True
@@ -0,0 +1,184 @@
+"""
+Bounded per-process database connection pool
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+from django.db.utils import OperationalError
+
+from core import metrics
+
+
+class PoolTimeout(OperationalError):
+    # No connection became available before the checkout timeout
+    pass
+
+
+class ConnectionPool:
+    # Thread-safe pool of raw DB-API connections for one database alias.
+    # Idle connections are reused LIFO so the hot ones stay warm and the
+    # cold ones age out past idle_timeout and get closed. Connections idle
+    # for longer than check_after seconds are checked before reuse, as the
+    # server or a proxy may have closed them in the meantime.
+
+    def __init__(
+        self,
+        alias,
+        max_size=10,
+        timeout=5.0,
+        idle_timeout=300.0,
+        check_after=5.0,
+    ):
+        self.alias = alias
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.check_after = check_after
+        self.pid = os.getpid()
+
+        self._condition = threading.Condition()
+        self._idle = deque()
+        self._size = 0
+
+        metrics.db_pool_max_size.labels(alias).set(max_size)
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def idle_count(self):
+        return len(self._idle)
+
+    def checkout(self, connect, check=None):
+        # Return an idle connection, or open one with `connect` when the
+        # pool has room, waiting up to `timeout` seconds otherwise. `check`
+        # tells whether a connection idle past check_after still works,
+        # dead ones are discarded.
+        start = time.monotonic()
+        deadline = start + self.timeout
+
+        while True:
+            connection, idle_since = self._take(deadline)
+            if (
+                connection is None
+                or check is None
+                or time.monotonic() - idle_since <= self.check_after
+                or check(connection)
+            ):
+                break
+
+            with self._condition:
+                self._discard(connection)
+                self._condition.notify()
+
+        if connection is None:
+            try:
+                connection = connect()
+            except Exception:
+                with self._condition:
+                    self._size -= 1
+                    self._condition.notify()
+                self._update_gauges()
+                raise
+
+        metrics.db_pool_wait_seconds.labels(self.alias).observe(
+            time.monotonic() - start
+        )
+        metrics.db_pool_checkouts_total.labels(self.alias).inc()
+        self._update_gauges()
+        return connection
+
+    def _take(self, deadline):
+        # Return (idle connection, idle since), or (None, None) after
+        # reserving a slot for a new one
+        with self._condition:
+            while True:
+                self._reap()
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, None
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    metrics.db_pool_checkout_timeouts_total.labels(
+                        self.alias
+                    ).inc()
+                    raise PoolTimeout(
+                        f"No connection available in the '{self.alias}' "
+                        f"pool after {self.timeout} seconds "
+                        f"(max size {self.max_size})"
+                    )
+                self._condition.wait(remaining)
+
+    def release(self, connection, reusable=True):
+        # Give a connection back, closing it when it can't be reused
+        with self._condition:
+            if reusable:
+                self._idle.append((connection, time.monotonic()))
+            else:
+                self._discard(connection)
+            self._reap()
+            self._condition.notify()
+
+        self._update_gauges()
+
+    def close_all(self):
+        # Close every idle connection, checked out ones are closed on release
+        with self._condition:
+            while self._idle:
+                connection, _ = self._idle.popleft()
+                self._discard(connection)
+            self._condition.notify_all()
+
+        self._update_gauges()
+
+    def _reap(self):
+        # Close connections idle for longer than idle_timeout, oldest first
+        threshold = time.monotonic() - self.idle_timeout
+        while self._idle and self._idle[0][1] < threshold:
+            connection, _ = self._idle.popleft()
+            self._discard(connection)
+
+    def _discard(self, connection):
+        self._size -= 1
+        metrics.db_pool_reaped_total.labels(self.alias).inc()
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _update_gauges(self):
+        idle = len(self._idle)
+        metrics.db_pool_connections.labels(self.alias, "idle").set(idle)
+        metrics.db_pool_connections.labels(self.alias, "in_use").set(
+            self._size - idle
+        )
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, options):
+    # Return the pool of this process for a database alias. Pools inherited
+    # through fork() are dropped, their sockets belong to the parent.
+    pid = os.getpid()
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None or pool.pid != pid:
+            pool = ConnectionPool(
+                alias,
+                max_size=int(options.get("MAX_SIZE", 10)),
+                timeout=float(options.get("TIMEOUT", 5)),
+                idle_timeout=float(options.get("IDLE_TIMEOUT", 300)),
+                check_after=float(options.get("CHECK_AFTER", 5)),
+            )
+            _pools[alias] = pool
+
+    return pool
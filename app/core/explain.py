@@ -0,0 +1,106 @@
+"""
+Helpers to inspect PostgreSQL EXPLAIN (FORMAT JSON) plans
+
+Used by the query plan tests to assert structural properties of the SQL
+the API generates, so index and queryset changes are checked against a
+seeded database instead of by eye.
+"""
+
+import json
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+SORT_NODES = ("Sort", "Incremental Sort")
+
+
+def explain(sql, params=None, using="default"):
+    # Return the JSON plan of a SQL statement
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+
+    return json.loads(plan) if isinstance(plan, str) else plan
+
+
+def table_rows(table, using="default"):
+    # The planner's row estimate for a table, summed over its partitions
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0) "
+            "FROM pg_class c WHERE c.oid = %s::regclass OR c.oid IN ("
+            "SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass)",
+            [table, table],
+        )
+        return int(cursor.fetchone()[0])
+
+
+def capture_plans(func, using="default"):
+    # Call func and return (sql, plan) for every SELECT it ran
+    connection = connections[using]
+    with CaptureQueriesContext(connection) as queries:
+        func()
+
+    return [
+        (query["sql"], explain(query["sql"], using=using))
+        for query in queries.captured_queries
+        if query["sql"].lstrip().upper().startswith("SELECT")
+    ]
+
+
+def plan_nodes(plan):
+    # Every node of a plan, depth first
+    nodes = [plan[0]["Plan"]] if isinstance(plan, list) else [plan]
+    found = []
+    while nodes:
+        node = nodes.pop()
+        found.append(node)
+        nodes.extend(reversed(node.get("Plans", [])))
+
+    return found
+
+
+def scanned_relations(plan):
+    # Names of every relation a plan reads from
+    return [
+        node["Relation Name"]
+        for node in plan_nodes(plan)
+        if "Relation Name" in node
+    ]
+
+
+def is_table(relation, table):
+    # Whether a relation is a table or one of its hash partitions
+    return relation == table or (
+        relation.startswith(f"{table}_p")
+        and relation[len(table) + 2:].isdigit()
+    )
+
+
+def reads_table(plan, table):
+    # Whether a plan reads a table or one of its partitions
+    return any(
+        is_table(relation, table) for relation in scanned_relations(plan)
+    )
+
+
+def seq_scans(plan, table):
+    # Sequential scan nodes over a table or its partitions
+    return [
+        node
+        for node in plan_nodes(plan)
+        if node["Node Type"] == "Seq Scan"
+        and is_table(node["Relation Name"], table)
+    ]
+
+
+def sort_nodes(plan):
+    return [
+        node for node in plan_nodes(plan) if node["Node Type"] in SORT_NODES
+    ]
+
+
+def estimated_rows(plan):
+    # Rows the planner expects the statement to return
+    return plan[0]["Plan"]["Plan Rows"]
@@ -0,0 +1,47 @@
+"""
+Password hashers whose cost comes from settings.PASSWORD_HASHER_COST
+
+They keep Django's algorithm names, so existing hashes still verify. When
+the preferred hasher or its cost changes, Django rehashes the password
+on the next successful login.
+"""
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+def _cost(name, default):
+    return int(settings.PASSWORD_HASHER_COST.get(name, default))
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return _cost("ARGON2_TIME_COST", 2)
+
+    @property
+    def memory_cost(self):
+        # In kibibytes
+        return _cost("ARGON2_MEMORY_COST", 102400)
+
+    @property
+    def parallelism(self):
+        return _cost("ARGON2_PARALLELISM", 8)
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    @property
+    def rounds(self):
+        return _cost("BCRYPT_ROUNDS", 12)
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return _cost("SCRYPT_WORK_FACTOR", 2**14)
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return _cost("PBKDF2_ITERATIONS", 390000)
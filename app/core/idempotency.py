@@ -0,0 +1,141 @@
+"""
+Idempotency keys for API writes
+
+A client retrying a write sends the same Idempotency-Key header. The
+first request with a key runs and its response is stored for
+IDEMPOTENCY_KEY_TTL seconds, per user. Retries get the stored response
+back, marked with Idempotent-Replayed, instead of running again. While
+the first is still running, retries get 409, and a key reused for a
+different request gets 422.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+
+MAX_KEY_LENGTH = 255
+IN_FLIGHT = "in_flight"
+DONE = "done"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotencyConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _(
+        "A request with this Idempotency-Key is still being processed."
+    )
+    default_code = "idempotency_conflict"
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = _(
+        "This Idempotency-Key was used for a different request."
+    )
+    default_code = "idempotency_key_reused"
+
+
+class Replay(Exception):
+    # Raised to answer a retry with the stored response
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+def record_key(user_id, key):
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f"idempotency:{user_id}:{digest}"
+
+
+def fingerprint(request):
+    # Identify the request a key was first used for
+    digest = hashlib.sha256()
+    for part in (request.method, request.get_full_path()):
+        digest.update(part.encode() + b"\0")
+    digest.update(request.body)
+    return digest.hexdigest()
+
+
+def begin(request):
+    # Claim the request's Idempotency-Key and return (record key,
+    # fingerprint), or None without a key. Raise Replay, or an
+    # APIException when the key is busy or was used differently.
+    key = request.META.get("HTTP_IDEMPOTENCY_KEY")
+    if not key:
+        return None
+    if len(key) > MAX_KEY_LENGTH:
+        raise ValidationError(
+            {"Idempotency-Key": [_("Keys are at most 255 characters.")]}
+        )
+
+    record = record_key(request.user.pk, key)
+    request_print = fingerprint(request)
+    in_flight = {"state": IN_FLIGHT, "fingerprint": request_print}
+    if cache.add(record, in_flight, settings.IDEMPOTENCY_LOCK_TIMEOUT):
+        return record, request_print
+
+    stored = cache.get(record)
+    if stored is None:
+        # Expired in between, claim it again
+        if cache.add(record, in_flight, settings.IDEMPOTENCY_LOCK_TIMEOUT):
+            return record, request_print
+        raise IdempotencyConflict()
+    if stored["fingerprint"] != request_print:
+        raise IdempotencyKeyReused()
+    if stored["state"] == IN_FLIGHT:
+        raise IdempotencyConflict()
+
+    raise Replay(replayed_response(stored))
+
+
+def replayed_response(stored):
+    response = HttpResponse(
+        stored["content"],
+        status=stored["status"],
+        content_type=stored["content_type"],
+    )
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
+def is_replay(response):
+    # Whether a response is a stored one sent back to a retry
+    return response.has_header(REPLAYED_HEADER)
+
+
+def finish(claim, response):
+    # Store the response of a claimed key, or release the key after a
+    # server error so the client can retry
+    record, request_print = claim
+    if response.status_code >= 500:
+        release(claim)
+        return
+
+    def store(rendered):
+        cache.set(
+            record,
+            {
+                "state": DONE,
+                "fingerprint": request_print,
+                "status": rendered.status_code,
+                "content": rendered.content,
+                "content_type": rendered.get("Content-Type"),
+            },
+            settings.IDEMPOTENCY_KEY_TTL,
+        )
+
+    if getattr(response, "is_rendered", True):
+        store(response)
+    else:
+        response.add_post_render_callback(store)
+
+
+def release(claim):
+    # Free a claimed key without storing a response
+    cache.delete(claim[0])
@@ -0,0 +1,223 @@
+"""
+Replay recorded API traffic against a running server with asyncio
+
+Traffic is a JSONL file, one request per line:
+
+    {"method": "GET", "path": "/api/product/products/", "user": "a@b.c"}
+    {"method": "POST", "path": "/api/user/token/", "body": {"email": ...}}
+
+With a rate, requests start on a fixed schedule whether or not earlier
+ones have finished (an open loop), and latency is measured from the
+scheduled start, so a slow server shows up as queueing instead of
+silently lowering the offered load. Without a rate each connection sends
+its next request as soon as the previous one completes.
+"""
+
+import asyncio
+import itertools
+import json
+import re
+import ssl
+
+
+def load_traffic(path):
+    # Read and validate the recorded requests of a JSONL file
+    entries = []
+    with open(path) as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+
+            try:
+                entry = json.loads(line)
+                if not entry["path"].startswith("/"):
+                    raise ValueError("path must start with /")
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                raise ValueError(f"{path}:{number}: invalid request ({e})")
+
+            entry["method"] = entry.get("method", "GET").upper()
+            entries.append(entry)
+
+    return entries
+
+
+def endpoint_label(method, path):
+    # Group requests by method and path with ids replaced
+    path = re.sub(r"/\d+(?=/|$)", "/{id}", path.split("?", 1)[0])
+    return f"{method} {path}"
+
+
+class HTTPConnection:
+    # Minimal HTTP/1.1 keep-alive client connection
+
+    def __init__(self, reader, writer, host):
+        self.reader = reader
+        self.writer = writer
+        self.host = host
+        self.closed = False
+
+    @classmethod
+    async def open(cls, host, port, use_ssl):
+        context = ssl.create_default_context() if use_ssl else None
+        reader, writer = await asyncio.open_connection(
+            host,
+            port,
+            ssl=context,
+        )
+        return cls(reader, writer, host)
+
+    async def request(self, method, path, headers, body=b""):
+        # Send a request and return the status after reading the body
+        lines = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host}",
+            f"Content-Length: {len(body)}",
+        ]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        head = "\r\n".join(lines) + "\r\n\r\n"
+        self.writer.write(head.encode("latin-1") + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by the server")
+        status = int(status_line.split()[1])
+
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        await self._read_body(method, status, response_headers)
+        if response_headers.get("connection", "").lower() == "close":
+            self.close()
+
+        return status
+
+    async def _read_body(self, method, status, headers):
+        if method == "HEAD" or status in (204, 304) or status < 200:
+            return
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    # Skip trailers up to the final empty line
+                    while (await self.reader.readline()) not in (
+                        b"\r\n",
+                        b"",
+                    ):
+                        pass
+                    return
+                await self.reader.readexactly(size + 2)
+
+        if "content-length" in headers:
+            await self.reader.readexactly(int(headers["content-length"]))
+            return
+
+        # The body runs until the server closes the connection
+        await self.reader.read()
+        self.close()
+
+    def close(self):
+        self.closed = True
+        self.writer.close()
+
+
+async def replay(
+    host,
+    port,
+    entries,
+    tokens=None,
+    rate=0,
+    concurrency=16,
+    total=None,
+    use_ssl=False,
+):
+    # Send total requests cycling through entries over at most concurrency
+    # connections. Return [(label, status or None, seconds)] and the
+    # elapsed time.
+    tokens = tokens or {}
+    total = total or len(entries)
+    loop = asyncio.get_running_loop()
+    idle = asyncio.LifoQueue()
+    for _ in range(concurrency):
+        idle.put_nowait(None)
+    results = []
+
+    async def send(entry, scheduled):
+        connection = await idle.get()
+        start = scheduled if scheduled is not None else loop.time()
+        status = None
+        try:
+            if connection is None:
+                connection = await HTTPConnection.open(host, port, use_ssl)
+            status = await connection.request(
+                entry["method"],
+                entry["path"],
+                _headers(entry, tokens),
+                _body(entry),
+            )
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+            if connection is not None:
+                connection.close()
+        finally:
+            if connection is not None and connection.closed:
+                connection = None
+            idle.put_nowait(connection)
+
+        results.append(
+            (
+                endpoint_label(entry["method"], entry["path"]),
+                status,
+                loop.time() - start,
+            )
+        )
+
+    requests = itertools.islice(itertools.cycle(entries), total)
+    start = loop.time()
+    if rate:
+        tasks = []
+        for index, entry in enumerate(requests):
+            scheduled = start + index / rate
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(send(entry, scheduled)))
+        await asyncio.gather(*tasks)
+    else:
+
+        async def worker():
+            for entry in requests:
+                await send(entry, None)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = loop.time() - start
+
+    while not idle.empty():
+        connection = idle.get_nowait()
+        if connection is not None:
+            connection.close()
+
+    return results, elapsed
+
+
+def _headers(entry, tokens):
+    headers = {"Accept": "application/json"}
+    if entry.get("body") is not None:
+        headers["Content-Type"] = "application/json"
+    token = tokens.get(entry.get("user"))
+    if token:
+        headers["Authorization"] = f"Token {token}"
+
+    return headers
+
+
+def _body(entry):
+    if entry.get("body") is None:
+        return b""
+
+    return json.dumps(entry["body"]).encode()
@@ -2,9 +2,20 @@
 Maids for miscellaneous purposes
 """
 
-from core.models import User, Product, ProductCategory, ProductStock
+import math
+from random import Random, randint
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from core.models import (
+    User,
+    Product,
+    ProductCategory,
+    ProductCategoryLink,
+    ProductStock,
+)
 from core.helper import create_user
-from random import randint
 
 
 def db_seed(with_deletion=False, total_data=10):
@@ -52,9 +63,9 @@ def db_seed(with_deletion=False, total_data=10):
             product.save()
 
             product.categories.add(
-                product_categories[randint(0, len(product_categories) - 1)]
+                product_categories[randint(0, len(product_categories) - 1)],
+                through_defaults={"created_by": user},
             )
-            product.save()
 
         print(f"Success create {total_data} products")
     except Exception as e:
@@ -79,3 +90,98 @@ def db_seed(with_deletion=False, total_data=10):
         print(f"Success create {len(products)} product stocks")
     except Exception as e:
         print("Product Stock bulk create failed:", str(e))
+
+
+def seed_catalog(
+    total_products,
+    products_per_user=100,
+    categories_per_user=10,
+    batch_size=5000,
+    seed=0,
+):
+    """
+    Bulk insert a reproducible catalog of total_products spread over
+    users, each product with a stock row and one category link. Rows are
+    inserted batch_size at a time, one transaction per batch of users.
+    """
+    rng = Random(seed)
+    password = make_password(None)
+    users_per_batch = max(batch_size // products_per_user, 1)
+    total_users = math.ceil(total_products / products_per_user)
+
+    for first in range(0, total_users, users_per_batch):
+        last = min(first + users_per_batch, total_users)
+        emails = [f"catalog{i}@example.com" for i in range(first, last)]
+
+        with transaction.atomic():
+            User.objects.bulk_create(
+                User(email=email, name=email, password=password)
+                for email in emails
+            )
+            user_ids = list(
+                User.objects.filter(email__in=emails)
+                .order_by("id")
+                .values_list("id", flat=True)
+            )
+
+            ProductCategory.objects.bulk_create(
+                (
+                    ProductCategory(
+                        created_by_id=user_id,
+                        name=f"Category {i}",
+                    )
+                    for user_id in user_ids
+                    for i in range(categories_per_user)
+                ),
+                batch_size=batch_size,
+            )
+            categories = {}
+            for category_id, user_id in (
+                ProductCategory.objects.filter(created_by_id__in=user_ids)
+                .order_by("id")
+                .values_list("id", "created_by_id")
+            ):
+                categories.setdefault(user_id, []).append(category_id)
+
+            products = []
+            for index, user_id in enumerate(user_ids, start=first):
+                offset = index * products_per_user
+                count = min(products_per_user, total_products - offset)
+                products.extend(
+                    Product(
+                        created_by_id=user_id,
+                        name=f"Product {offset + i}",
+                        description=f"Product {offset + i} description",
+                        price=rng.randint(1000, 100000),
+                    )
+                    for i in range(count)
+                )
+            Product.objects.bulk_create(products, batch_size=batch_size)
+
+            product_rows = (
+                Product.objects.filter(created_by_id__in=user_ids)
+                .order_by("id")
+                .values_list("id", "created_by_id")
+            )
+            stocks = []
+            links = []
+            for product_id, user_id in product_rows:
+                stocks.append(
+                    ProductStock(
+                        created_by_id=user_id,
+                        product_id=product_id,
+                        quantity=rng.randint(0, 1000),
+                    )
+                )
+                links.append(
+                    ProductCategoryLink(
+                        created_by_id=user_id,
+                        product_id=product_id,
+                        productcategory_id=rng.choice(categories[user_id]),
+                    )
+                )
+            ProductStock.objects.bulk_create(stocks, batch_size=batch_size)
+            ProductCategoryLink.objects.bulk_create(
+                links,
+                batch_size=batch_size,
+            )
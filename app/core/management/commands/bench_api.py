@@ -0,0 +1,320 @@
+"""
+Django command to benchmark every API endpoint against seeded catalogs
+"""
+
+import itertools
+import json
+import platform
+import subprocess
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.benchmark import format_summary, summarize
+from core.maids import seed_catalog
+from core.middleware import QueryCounter
+from core.models import Product, User
+from core.tokens import issue_tokens
+
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+PASSWORD = "benchmark-password"
+
+# Dev-only instrumentation would skew the numbers, and the rate limits
+# would reject a benchmark loop
+BENCH_SETTINGS = {
+    "QUERY_BUDGET_SAMPLE_RATE": 0,
+    "PROFILING_SAMPLE_RATE": 0,
+    "SERVER_TIMING_HEADER": False,
+    "SIGNED_TOKENS_ENABLED": True,
+    "RATELIMIT_BACKEND": "core.ratelimit.LocalTokenBucket",
+    "LOGIN_RATE_LIMITS": {"email": "1000000/s", "ip": "1000000/s"},
+    "API_RATE_LIMITS": {},
+}
+
+
+def parse_size(value):
+    # Accept 1k, 100k, 1m or a plain number of products
+    try:
+        return SIZES.get(value.lower()) or int(value)
+    except ValueError:
+        raise CommandError(f"Unknown catalog size {value}")
+
+
+def git_commit():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return result.stdout.strip()
+
+
+class Command(BaseCommand):
+    # Seed a test database with each catalog size and drive every product
+    # and user endpoint in-process through the full middleware stack. The
+    # catalog is spread over users, so per-user endpoints return the same
+    # rows at every size and the numbers show how the table size alone
+    # affects them. Results can be saved as JSON and compared to a
+    # previous run.
+    help = "Benchmark the API endpoints against seeded catalogs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size",
+            action="append",
+            help="Catalog size: 1k, 100k, 1m or a number (repeatable)",
+        )
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument(
+            "--products-per-user",
+            type=int,
+            default=100,
+            help="Catalog products owned by each seeded user",
+        )
+        parser.add_argument(
+            "--endpoint",
+            action="append",
+            help="Only endpoints whose name contains this text",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep the test database and reuse a seeded catalog",
+        )
+        parser.add_argument("--output", help="Write results as JSON")
+        parser.add_argument(
+            "--compare",
+            help="JSON results of a previous run to compare against",
+        )
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            help="Fail when an endpoint's p95 grew by more percent",
+        )
+
+    def handle(self, *args, **options):
+        sizes = [parse_size(size) for size in options["size"] or ["1k"]]
+        baseline = None
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                baseline = json.load(f)
+
+        setup_test_environment()
+        old_config = setup_databases(
+            verbosity=0,
+            interactive=False,
+            keepdb=options["keepdb"],
+        )
+        try:
+            with override_settings(**BENCH_SETTINGS):
+                results = {
+                    str(size): self._bench_size(size, options)
+                    for size in sizes
+                }
+        finally:
+            teardown_databases(old_config, 0, keepdb=options["keepdb"])
+            teardown_test_environment()
+
+        report = {
+            "commit": git_commit(),
+            "created_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "requests": options["requests"],
+            "products_per_user": options["products_per_user"],
+            "results": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(report, f, indent=2)
+
+        if baseline:
+            self._compare(baseline, report, options["max_regression"])
+
+    def _bench_size(self, size, options):
+        self._seed(size, options)
+        user = User.objects.order_by("id").first()
+        user.set_password(PASSWORD)
+        user.save()
+
+        self.stdout.write(f"\n{size} products")
+        results = {}
+        for name, request in self._plan(user, options):
+            if options["endpoint"] and not any(
+                text in name for text in options["endpoint"]
+            ):
+                continue
+
+            results[name] = self._measure(request, options)
+            self.stdout.write(
+                format_summary(name, results[name])
+                + f"  queries {results[name]['queries_per_request']}"
+            )
+
+        return results
+
+    def _seed(self, size, options):
+        if Product.objects.count() == size:
+            return
+
+        call_command("flush", interactive=False, verbosity=0)
+        start = time.perf_counter()
+        seed_catalog(size, products_per_user=options["products_per_user"])
+        self.stdout.write(
+            f"Seeded {size} products in {time.perf_counter() - start:.1f}s"
+        )
+
+    def _plan(self, user, options):
+        # Yield (endpoint name, callable making one request)
+        client = APIClient()
+        token, _ = Token.objects.get_or_create(user=user)
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        product = Product.objects.filter(created_by=user).first()
+        batch_ids = list(
+            Product.objects.filter(created_by=user)
+            .order_by("id")
+            .values_list("id", flat=True)[:50]
+        )
+        emails = (f"bench{i}@example.com" for i in itertools.count())
+        refresh = [issue_tokens(user)["refresh"]]
+
+        def rotate_refresh():
+            res = client.post(
+                reverse("user:token-refresh"),
+                {"refresh": refresh[0]},
+            )
+            refresh[0] = res.data.get("refresh", refresh[0])
+            return res
+
+        def get(url):
+            return lambda: client.get(url)
+
+        def get_each(urls):
+            # One sample of many requests, returning the last response
+            def request():
+                for url in urls:
+                    res = client.get(url)
+                return res
+
+            return request
+
+        yield "product-list", get(reverse("product:product-list"))
+        yield "product-list-filtered", get(
+            reverse("product:product-list")
+            + f"?categories={product.categories.first().id}"
+        )
+        yield "product-detail", get(
+            reverse("product:product-detail", args=[product.id])
+        )
+        yield f"product-detail-x{len(batch_ids)}", get_each(
+            [reverse("product:product-detail", args=[pk]) for pk in batch_ids]
+        )
+        yield f"product-batch-{len(batch_ids)}", get(
+            reverse("product:product-batch")
+            + "?ids="
+            + ",".join(str(pk) for pk in batch_ids)
+        )
+        yield "productcategory-list", get(
+            reverse("product:productcategory-list")
+        )
+        yield "productstock-list", get(reverse("product:productstock-list"))
+        yield "async-product-list", get(reverse("product:async-product-list"))
+        yield "async-product-detail", get(
+            reverse("product:async-product-detail", args=[product.id])
+        )
+        yield "async-productcategory-list", get(
+            reverse("product:async-productcategory-list")
+        )
+        yield "product-create", lambda: client.post(
+            reverse("product:product-list"),
+            {"name": "Bench", "price": 1000, "categories": [{"name": "B"}]},
+            format="json",
+        )
+        yield "user-me", get(reverse("user:me"))
+        yield "user-create", lambda: client.post(
+            reverse("user:create"),
+            {"email": next(emails), "password": PASSWORD, "name": "Bench"},
+        )
+        yield "user-token", lambda: client.post(
+            reverse("user:token"),
+            {"email": user.email, "password": PASSWORD},
+        )
+        yield "user-token-refresh", rotate_refresh
+        yield "user-token-revoke", lambda: client.post(
+            reverse("user:token-revoke"),
+            {"refresh": issue_tokens(user)["refresh"]},
+        )
+
+    def _measure(self, request, options):
+        for _ in range(options["warmup"]):
+            request()
+
+        counter = QueryCounter()
+        latencies = []
+        errors = 0
+        counter.install()
+        try:
+            start = time.perf_counter()
+            for _ in range(options["requests"]):
+                request_start = time.perf_counter()
+                response = request()
+                latencies.append(time.perf_counter() - request_start)
+                if response.status_code >= 400:
+                    errors += 1
+            elapsed = time.perf_counter() - start
+        finally:
+            counter.uninstall()
+
+        summary = summarize(latencies, elapsed, errors)
+        summary["queries_per_request"] = round(
+            counter.count / options["requests"], 2
+        )
+        return summary
+
+    def _compare(self, baseline, report, max_regression):
+        # Print the p95 and throughput change of every endpoint in both runs
+        self.stdout.write(f"\nCompared to {baseline.get('commit')}")
+        regressions = []
+        for size, endpoints in report["results"].items():
+            for name, current in endpoints.items():
+                previous = baseline["results"].get(size, {}).get(name)
+                if not previous or not previous["p95_ms"]:
+                    continue
+
+                p95 = (current["p95_ms"] / previous["p95_ms"] - 1) * 100
+                rps = (
+                    current["throughput_rps"] / previous["throughput_rps"] - 1
+                ) * 100
+                self.stdout.write(
+                    f"{size:>8} {name:<28} p95 {p95:>+7.1f}%"
+                    f"  throughput {rps:>+7.1f}%"
+                    f"  queries {previous['queries_per_request']}"
+                    f" -> {current['queries_per_request']}"
+                )
+                if max_regression is not None and p95 > max_regression:
+                    regressions.append(f"{size}/{name}")
+
+        if regressions:
+            raise CommandError(
+                "p95 regressed beyond the limit: " + ", ".join(regressions)
+            )
@@ -0,0 +1,176 @@
+"""
+Django command to compare sync WSGI and async ASGI read throughput
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from rest_framework.authtoken.models import Token
+
+from core.benchmark import format_summary, summarize
+
+
+class Command(BaseCommand):
+    # Drive the sync and async product list in-process with slow clients.
+    # WSGI requests hold one of --threads workers while the client reads the
+    # response, ASGI requests only hold a coroutine.
+    help = "Compare sync WSGI and async ASGI throughput with slow clients"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=200)
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=8,
+            help="Worker threads available to the WSGI handler",
+        )
+        parser.add_argument(
+            "--client-delay",
+            type=float,
+            default=0.05,
+            help="Seconds a client takes to read each response",
+        )
+        parser.add_argument("--email", default="ecommerce@example.com")
+        parser.add_argument(
+            "--sync-path", default="/api/product/products/"
+        )
+        parser.add_argument(
+            "--async-path", default="/api/product/async/products/"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(
+                f"User {options['email']} not found, run `manage.py seed`"
+            )
+        token, _ = Token.objects.get_or_create(user=user)
+        self.auth = f"Token {token.key}"
+
+        wsgi = self._run_wsgi(options)
+        self.stdout.write(format_summary("sync WSGI", wsgi))
+
+        asgi = asyncio.run(self._run_asgi(options))
+        self.stdout.write(format_summary("async ASGI", asgi))
+
+    def _run_wsgi(self, options):
+        application = get_wsgi_application()
+        delay = options["client_delay"]
+        workers = threading.BoundedSemaphore(options["threads"])
+
+        def one_request():
+            start = time.perf_counter()
+            # Requests beyond the worker count queue up like on a server
+            with workers:
+                return self._wsgi_request(application, options, delay, start)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            results = list(
+                pool.map(lambda _: one_request(), range(options["requests"]))
+            )
+        elapsed = time.perf_counter() - start
+
+        latencies = [latency for latency, _ in results]
+        errors = sum(1 for _, ok in results if not ok)
+        return summarize(latencies, elapsed, errors)
+
+    def _wsgi_request(self, application, options, delay, start):
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": options["sync_path"],
+            "QUERY_STRING": "",
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "HTTP_HOST": "localhost",
+            "HTTP_AUTHORIZATION": self.auth,
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "http",
+            "wsgi.input": BytesIO(),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        status = []
+
+        def start_response(status_line, headers, exc_info=None):
+            status.append(status_line)
+
+        body = application(environ, start_response)
+        try:
+            for _ in body:
+                pass
+            # The worker thread stays busy while the client reads
+            time.sleep(delay)
+        finally:
+            body.close()
+
+        return time.perf_counter() - start, status[0].startswith("200")
+
+    async def _run_asgi(self, options):
+        application = get_asgi_application()
+        delay = options["client_delay"]
+        semaphore = asyncio.Semaphore(options["concurrency"])
+
+        async def one_request():
+            async with semaphore:
+                start = time.perf_counter()
+                scope = {
+                    "type": "http",
+                    "asgi": {"version": "3.0"},
+                    "http_version": "1.1",
+                    "method": "GET",
+                    "scheme": "http",
+                    "path": options["async_path"],
+                    "raw_path": options["async_path"].encode(),
+                    "query_string": b"",
+                    "root_path": "",
+                    "headers": [
+                        (b"host", b"localhost"),
+                        (b"authorization", self.auth.encode()),
+                    ],
+                    "client": ("127.0.0.1", 0),
+                    "server": ("localhost", 80),
+                }
+                status = []
+                sent_request = False
+
+                async def receive():
+                    nonlocal sent_request
+                    if not sent_request:
+                        sent_request = True
+                        return {"type": "http.request", "body": b""}
+                    # Block like a client that never disconnects
+                    await asyncio.Event().wait()
+
+                async def send(message):
+                    if message["type"] == "http.response.start":
+                        status.append(message["status"])
+                    elif not message.get("more_body", False):
+                        # Only this coroutine waits on the slow client
+                        await asyncio.sleep(delay)
+
+                await application(scope, receive, send)
+                return time.perf_counter() - start, status[0] == 200
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(one_request() for _ in range(options["requests"]))
+        )
+        elapsed = time.perf_counter() - start
+
+        latencies = [latency for latency, _ in results]
+        errors = sum(1 for _, ok in results if not ok)
+        return summarize(latencies, elapsed, errors)
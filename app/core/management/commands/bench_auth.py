@@ -0,0 +1,75 @@
+"""
+Django command to compare DB token and signed token authentication
+"""
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from core.authentication import SignedTokenAuthentication
+from core.tokens import ACCESS, issue_tokens
+
+
+class Command(BaseCommand):
+    # Authenticate the same user repeatedly with each scheme on a single
+    # thread and report the cost per request and the queries it makes.
+    help = "Benchmark DB token vs signed token authentication"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--email",
+            default="bench@example.com",
+            help="User to authenticate as (created if missing)",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=5000,
+            help="Authentications per scheme",
+        )
+
+    # Signed tokens only authenticate when enabled
+    @override_settings(SIGNED_TOKENS_ENABLED=True)
+    def handle(self, *args, **options):
+        user, created = get_user_model().objects.get_or_create(
+            email=options["email"],
+        )
+        if created:
+            user.set_unusable_password()
+            user.save()
+
+        token, _ = Token.objects.get_or_create(user=user)
+        access = issue_tokens(user)[ACCESS]
+
+        schemes = (
+            ("token", TokenAuthentication(), f"Token {token.key}"),
+            ("signed", SignedTokenAuthentication(), f"Bearer {access}"),
+        )
+        factory = APIRequestFactory()
+        for label, backend, header in schemes:
+            request = factory.get("/", HTTP_AUTHORIZATION=header)
+            per_request, queries = self._measure(
+                backend,
+                request,
+                options["requests"],
+            )
+            self.stdout.write(
+                f"{label:<8} {per_request * 1e6:>10.1f} us/request"
+                f" {queries:>6.2f} queries/request"
+            )
+
+    def _measure(self, backend, request, requests):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for _ in range(requests):
+                backend.authenticate(request)
+            elapsed = time.perf_counter() - start
+
+        return elapsed / requests, len(queries) / requests
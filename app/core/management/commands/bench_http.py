@@ -0,0 +1,78 @@
+"""
+Django command to measure the throughput of a running API server
+"""
+
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import format_summary, summarize
+
+
+class Command(BaseCommand):
+    # Send GET requests over keep-alive connections, one per client thread.
+    # Run it once against `runserver` and once against gunicorn to compare
+    # the development and production serving profiles.
+    help = "Measure throughput and latency of a running API server"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "url",
+            nargs="?",
+            default="http://localhost:8000/api/product/products/",
+        )
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--token", help="Auth token sent with requests")
+
+    def handle(self, *args, **options):
+        url = urlsplit(options["url"])
+        if url.scheme not in ("http", "https"):
+            raise CommandError("Only http and https URLs are supported")
+
+        path = url.path or "/"
+        if url.query:
+            path = f"{path}?{url.query}"
+        headers = {}
+        if options["token"]:
+            headers["Authorization"] = f"Token {options['token']}"
+
+        connection_class = (
+            http.client.HTTPSConnection
+            if url.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        local = threading.local()
+
+        def one_request():
+            if not hasattr(local, "connection"):
+                local.connection = connection_class(url.netloc, timeout=30)
+
+            start = time.perf_counter()
+            try:
+                local.connection.request("GET", path, headers=headers)
+                response = local.connection.getresponse()
+                response.read()
+                ok = response.status < 400
+            except (OSError, http.client.HTTPException):
+                local.connection.close()
+                del local.connection
+                ok = False
+
+            return time.perf_counter() - start, ok
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            results = list(
+                pool.map(lambda _: one_request(), range(options["requests"]))
+            )
+        elapsed = time.perf_counter() - start
+
+        latencies = [latency for latency, _ in results]
+        errors = sum(1 for _, ok in results if not ok)
+        summary = summarize(latencies, elapsed, errors)
+        self.stdout.write(format_summary(options["url"], summary))
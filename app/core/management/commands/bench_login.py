@@ -0,0 +1,61 @@
+"""
+Django command to measure password checks per second per core
+"""
+
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+
+PASSWORD = "benchmark-password"
+
+
+class Command(BaseCommand):
+    # Verify one password repeatedly on a single thread for each hasher
+    # profile. A login costs one check, so this is the login ceiling of
+    # one core before any database or network work.
+    help = "Benchmark logins per second per core for each hasher profile"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile",
+            action="append",
+            choices=sorted(settings.PASSWORD_HASHER_PROFILES),
+            help="Profile to benchmark, repeatable (default: all)",
+        )
+        parser.add_argument(
+            "--seconds",
+            type=float,
+            default=3.0,
+            help="Time spent on each profile",
+        )
+
+    def handle(self, *args, **options):
+        profiles = options["profile"] or sorted(
+            settings.PASSWORD_HASHER_PROFILES
+        )
+        for profile in profiles:
+            path = settings.PASSWORD_HASHER_PROFILES[profile]
+            with override_settings(PASSWORD_HASHERS=[path]):
+                try:
+                    encoded = make_password(PASSWORD)
+                except ValueError as e:
+                    # The hasher's library is not installed
+                    self.stdout.write(f"{profile:<8} skipped: {e}")
+                    continue
+
+                rate = self._measure(encoded, options["seconds"])
+            self.stdout.write(f"{profile:<8} {rate:>10.2f} logins/s/core")
+
+    def _measure(self, encoded, seconds):
+        checks = 0
+        start = time.perf_counter()
+        deadline = start + seconds
+        while time.perf_counter() < deadline:
+            check_password(PASSWORD, encoded)
+            checks += 1
+
+        return checks / (time.perf_counter() - start)
@@ -0,0 +1,93 @@
+"""
+Django command to compare JSON and MessagePack product list payloads
+"""
+
+import gzip
+import json
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from core import binary
+from core.models import Product
+from core.renderers import MessagePackRenderer
+from product.serializers import ProductSerializer
+
+
+class Command(BaseCommand):
+    # Serialize, render and decode the same page of products repeatedly
+    # with each renderer and report the payload size and the cost of each
+    # step. The gzipped size is what CompressionMiddleware sends.
+    help = "Benchmark JSON vs MessagePack rendering of product lists"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--products",
+            type=int,
+            default=1000,
+            help="Products in the rendered list",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Rounds per renderer",
+        )
+
+    def handle(self, *args, **options):
+        if binary.msgpack is None:
+            raise CommandError("The msgpack package is not installed")
+
+        products = list(
+            Product.objects.select_related("product_stock")
+            .prefetch_related("categories")
+            .order_by("id")[: options["products"]]
+        )
+        if not products:
+            raise CommandError("No products, run the seed command first")
+
+        renderers = (
+            ("json", JSONRenderer(), json.loads),
+            ("msgpack", MessagePackRenderer(), binary.unpackb),
+        )
+        self.stdout.write(
+            f"{len(products)} products, {options['repeat']} rounds\n"
+            f"{'renderer':<9} {'bytes':>10} {'gzipped':>10}"
+            f" {'serialize':>12} {'encode':>12} {'decode':>12}"
+        )
+        for label, renderer, decode in renderers:
+            result = self._measure(
+                products, renderer, decode, options["repeat"]
+            )
+            self.stdout.write(
+                f"{label:<9} {result['bytes']:>10} {result['gzipped']:>10}"
+                f" {result['serialize'] * 1000:>9.2f} ms"
+                f" {result['encode'] * 1000:>9.2f} ms"
+                f" {result['decode'] * 1000:>9.2f} ms"
+            )
+
+    def _measure(self, products, renderer, decode, repeat):
+        # Return the payload sizes and the mean seconds of each step
+        request = SimpleNamespace(accepted_renderer=renderer)
+        totals = {"serialize": 0.0, "encode": 0.0, "decode": 0.0}
+        for _ in range(repeat):
+            start = time.perf_counter()
+            data = ProductSerializer(
+                products, many=True, context={"request": request}
+            ).data
+            serialized = time.perf_counter()
+            content = renderer.render(data)
+            encoded = time.perf_counter()
+            decode(content)
+            decoded = time.perf_counter()
+
+            totals["serialize"] += serialized - start
+            totals["encode"] += encoded - serialized
+            totals["decode"] += decoded - encoded
+
+        result = {step: total / repeat for step, total in totals.items()}
+        result["bytes"] = len(content)
+        result["gzipped"] = len(gzip.compress(content, compresslevel=6))
+        return result
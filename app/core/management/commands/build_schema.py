@@ -0,0 +1,22 @@
+"""
+Django command to prebuild the OpenAPI schema of this release
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.schema import build_schemas, schema_path
+
+
+class Command(BaseCommand):
+    # Render the schema in every served format into SCHEMA_CACHE_DIR, so
+    # workers of this APP_VERSION load it instead of generating it. Run at
+    # build or startup, before the server.
+    help = "Prebuild the OpenAPI schema served at /api/schema"
+
+    def handle(self, *args, **options):
+        if not settings.SCHEMA_CACHE_DIR:
+            raise CommandError("SCHEMA_CACHE_DIR is not set")
+
+        for fmt, content in build_schemas().items():
+            self.stdout.write(f"Wrote {schema_path(fmt)} ({len(content)} B)")
@@ -0,0 +1,137 @@
+"""
+Django command to replay recorded API traffic against a running server
+"""
+
+import asyncio
+import collections
+import json
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from core.benchmark import format_summary, summarize
+from core.loadgen import load_traffic, replay
+
+
+class Command(BaseCommand):
+    # Replay a JSONL file of recorded requests (method, path, user, body)
+    # with asyncio at a fixed --rate, or as fast as --concurrency
+    # connections allow. Users are sent as their DB token, looked up in
+    # the database the server uses or given with --tokens. See
+    # core/loadgen.py for the file format.
+    help = "Replay recorded API requests against a running server"
+
+    def add_arguments(self, parser):
+        parser.add_argument("traffic", help="JSONL file of recorded requests")
+        parser.add_argument(
+            "--url",
+            default="http://localhost:8000",
+            help="Base URL of the server",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=0,
+            help="Requests started per second (0: closed loop)",
+        )
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument(
+            "--requests",
+            type=int,
+            help="Requests sent, cycling through the file (default: once)",
+        )
+        parser.add_argument(
+            "--tokens",
+            help="JSON file mapping user emails to auth tokens",
+        )
+        parser.add_argument("--output", help="Write results as JSON")
+
+    def handle(self, *args, **options):
+        url = urlsplit(options["url"])
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise CommandError("Only http and https URLs are supported")
+
+        try:
+            entries = load_traffic(options["traffic"])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        if not entries:
+            raise CommandError("The traffic file has no requests")
+
+        results, elapsed = asyncio.run(
+            replay(
+                url.hostname,
+                url.port or (443 if url.scheme == "https" else 80),
+                entries,
+                tokens=self._tokens(entries, options["tokens"]),
+                rate=options["rate"],
+                concurrency=options["concurrency"],
+                total=options["requests"],
+                use_ssl=url.scheme == "https",
+            )
+        )
+
+        report = self._report(results, elapsed)
+        self.stdout.write(format_summary("total", report["total"]))
+        statuses = ", ".join(
+            f"{status}: {count}"
+            for status, count in sorted(report["statuses"].items())
+        )
+        self.stdout.write(
+            f"error rate {report['error_rate'] * 100:.2f}%  ({statuses})\n"
+        )
+        for label, summary in report["endpoints"].items():
+            self.stdout.write(format_summary(label, summary))
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(report, f, indent=2)
+
+    def _tokens(self, entries, path):
+        if path:
+            with open(path) as f:
+                return json.load(f)
+
+        emails = {entry["user"] for entry in entries if entry.get("user")}
+        users = get_user_model().objects.filter(email__in=emails)
+        missing = emails - {user.email for user in users}
+        if missing:
+            raise CommandError(f"Unknown users: {', '.join(sorted(missing))}")
+
+        return {
+            user.email: Token.objects.get_or_create(user=user)[0].key
+            for user in users
+        }
+
+    def _report(self, results, elapsed):
+        # Summaries overall and per endpoint; failed connections count
+        # as status "error"
+        statuses = collections.Counter(
+            "error" if status is None else str(status)
+            for _, status, _ in results
+        )
+        by_endpoint = collections.defaultdict(list)
+        for label, status, latency in results:
+            by_endpoint[label].append((status, latency))
+
+        def summary(rows):
+            errors = sum(
+                1 for status, _ in rows if status is None or status >= 400
+            )
+            return summarize([latency for _, latency in rows], elapsed, errors)
+
+        total = summary([(status, latency) for _, status, latency in results])
+        return {
+            "total": total,
+            "error_rate": round(total["errors"] / len(results), 4),
+            "statuses": dict(statuses),
+            "endpoints": {
+                label: summary(rows)
+                for label, rows in sorted(
+                    by_endpoint.items(),
+                    key=lambda item: -len(item[1]),
+                )
+            },
+        }
@@ -0,0 +1,136 @@
+"""
+Django command to hash partition the catalog tables by created_by
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.explain import capture_plans, reads_table
+from core.models import Product, ProductCategoryLink
+from core.partitioning import (
+    is_partitioned,
+    partition_sql,
+    partitioned_tables,
+    scanned_partitions,
+)
+from product.views import ProductViewSet
+
+
+VERIFY_PAGE_SIZE = 100
+
+
+class Command(BaseCommand):
+    # Convert the product, stock and product category link tables into
+    # hash partitioned tables, then check per-user queries prune
+    help = "Hash partition the catalog tables on created_by_id (PostgreSQL)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--partitions", type=int, default=16)
+        parser.add_argument("--database", default="default")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Print the SQL instead of running it",
+        )
+        parser.add_argument(
+            "--verify-only",
+            action="store_true",
+            help="Only check that per-user queries hit one partition",
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning requires PostgreSQL")
+        if options["partitions"] < 2:
+            raise CommandError("Use at least 2 partitions")
+
+        if not options["verify_only"]:
+            self._partition(connection, options)
+        if not options["dry_run"]:
+            self._verify(connection)
+
+    def _partition(self, connection, options):
+        quote_name = connection.ops.quote_name
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                for spec in partitioned_tables():
+                    if is_partitioned(cursor, spec["table"]):
+                        self.stdout.write(
+                            f"{spec['table']} is already partitioned"
+                        )
+                        continue
+
+                    statements = partition_sql(
+                        spec,
+                        options["partitions"],
+                        quote_name,
+                    )
+                    for statement in statements:
+                        if options["dry_run"]:
+                            self.stdout.write(f"{statement};")
+                        else:
+                            cursor.execute(statement)
+
+                    if not options["dry_run"]:
+                        cursor.execute(f"ANALYZE {quote_name(spec['table'])}")
+                        self.stdout.write(
+                            self.style.SUCCESS(
+                                f"Partitioned {spec['table']} into "
+                                f"{options['partitions']} partitions"
+                            )
+                        )
+
+    def _verify(self, connection):
+        # EXPLAIN the queries of a product list filtered by category, as
+        # ProductViewSet builds them, and check each partitioned table
+        # they read is pruned to one partition
+        product = (
+            Product.objects.using(connection.alias)
+            .select_related("created_by")
+            .order_by("id")
+            .first()
+        )
+        if product is None:
+            self.stdout.write("No products to verify pruning with")
+            return
+
+        owner = product.created_by
+        category_ids = (
+            ProductCategoryLink.objects.using(connection.alias)
+            .filter(created_by=owner)
+            .values_list("productcategory_id", flat=True)[:1]
+        )
+        params = {"categories": str(pk) for pk in category_ids}
+        request = Request(APIRequestFactory().get("/", params))
+        request.user = owner
+        view = ProductViewSet(request=request, action="list")
+        queryset = view.get_queryset().using(connection.alias)
+        # One page is enough to run the stock join, the category filter
+        # and the category link prefetch
+        plans = capture_plans(
+            lambda: list(queryset[:VERIFY_PAGE_SIZE]),
+            using=connection.alias,
+        )
+
+        for sql, plan in plans:
+            for spec in partitioned_tables():
+                table = spec["table"]
+                if not reads_table(plan, table):
+                    continue
+
+                partitions = scanned_partitions(plan, table)
+                if len(partitions) != 1:
+                    raise CommandError(
+                        f"Product list query on {table} scans "
+                        f"{len(partitions)} partitions: "
+                        f"{', '.join(partitions) or 'none'}\n{sql}"
+                    )
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Product list query on {table} is pruned to "
+                        f"{partitions[0]}"
+                    )
+                )
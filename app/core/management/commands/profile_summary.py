@@ -0,0 +1,66 @@
+"""
+Django command to summarize sampled request profiles
+"""
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiling import PHASES, read_folded, summarize
+
+
+class Command(BaseCommand):
+    # Merge the folded stack files written by ProfilingMiddleware and
+    # print the samples per phase and the hottest functions. --output
+    # writes the merged stacks for flamegraph.pl or speedscope.
+    help = "Summarize the top functions across sampled request profiles"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            default=settings.PROFILING_DIR,
+            help="Directory holding .folded profiles",
+        )
+        parser.add_argument(
+            "--view",
+            help="Only profiles of view names containing this text",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=20,
+            help="Functions listed",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the merged folded stacks to this file",
+        )
+
+    def handle(self, *args, **options):
+        paths = sorted(Path(options["dir"]).glob("*.folded"))
+        if options["view"]:
+            view = options["view"].replace(":", "_")
+            paths = [path for path in paths if view in path.name]
+        if not paths:
+            raise CommandError(f"No profiles found in {options['dir']}")
+
+        stacks = read_folded(paths)
+        phases, own, total = summarize(stacks)
+        samples = sum(phases.values())
+
+        self.stdout.write(f"{len(paths)} profiles, {samples} samples")
+        for phase in PHASES:
+            share = phases[phase] / samples * 100
+            self.stdout.write(f"  {phase:<10} {share:>6.1f}%")
+
+        for title, counter in (("self", own), ("total", total)):
+            self.stdout.write(f"\nTop functions by {title} samples")
+            for name, count in counter.most_common(options["limit"]):
+                share = count / samples * 100
+                self.stdout.write(f"  {share:>6.1f}% {count:>7} {name}")
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
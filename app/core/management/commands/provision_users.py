@@ -0,0 +1,95 @@
+"""
+Django command to bulk provision users from a CSV file
+"""
+
+import csv
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    # Read rows of email,name,password and insert them in batches with
+    # bulk_create, one INSERT per batch instead of one per user. Existing
+    # emails are skipped. Passwords exported from another Django install
+    # can be imported as-is with --hashed; otherwise they are hashed on a
+    # thread pool, since the hashers release the GIL. Empty passwords
+    # become unusable passwords.
+    help = "Bulk provision users from a CSV file of email,name,password"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file with a header row")
+        parser.add_argument(
+            "--hashed",
+            action="store_true",
+            help="Passwords are already hashed (Django encoded format)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Users inserted per query",
+        )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=os.cpu_count(),
+            help="Threads hashing plain text passwords",
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        before = User.objects.count()
+
+        with open(options["path"], newline="") as f, ThreadPoolExecutor(
+            options["jobs"]
+        ) as executor:
+            rows = csv.DictReader(f)
+            if "email" not in (rows.fieldnames or []):
+                raise CommandError("The CSV header has no email column")
+
+            while True:
+                batch = list(islice(rows, options["batch_size"]))
+                if not batch:
+                    break
+
+                passwords = self._passwords(batch, options, executor)
+                User.objects.bulk_create(
+                    [
+                        User(
+                            email=User.objects.normalize_email(row["email"]),
+                            name=row.get("name") or "",
+                            password=password,
+                        )
+                        for row, password in zip(batch, passwords)
+                    ],
+                    ignore_conflicts=True,
+                )
+
+        created = User.objects.count() - before
+        self.stdout.write(self.style.SUCCESS(f"Provisioned {created} users"))
+
+    def _passwords(self, batch, options, executor):
+        passwords = [row.get("password") or None for row in batch]
+        if not options["hashed"]:
+            return list(executor.map(make_password, passwords))
+
+        encoded = []
+        for row, password in zip(batch, passwords):
+            if password is None:
+                encoded.append(make_password(None))
+                continue
+
+            try:
+                identify_hasher(password)
+            except ValueError:
+                raise CommandError(
+                    f"{row['email']}: password is not a known hash"
+                )
+            encoded.append(password)
+
+        return encoded
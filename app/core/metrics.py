@@ -0,0 +1,114 @@
+"""
+Prometheus metrics exported next to the django-prometheus ones
+"""
+
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import Counter, Gauge, Histogram
+
+
+db_pool_connections = Gauge(
+    "django_db_pool_connections",
+    "Open pooled connections by database and state (idle or in_use).",
+    ["alias", "state"],
+    namespace=NAMESPACE,
+)
+
+db_pool_max_size = Gauge(
+    "django_db_pool_max_size",
+    "Maximum pooled connections per process by database.",
+    ["alias"],
+    namespace=NAMESPACE,
+)
+
+db_pool_checkouts_total = Counter(
+    "django_db_pool_checkouts_total",
+    "Counter of connections checked out of the pool by database.",
+    ["alias"],
+    namespace=NAMESPACE,
+)
+
+db_pool_checkout_timeouts_total = Counter(
+    "django_db_pool_checkout_timeouts_total",
+    "Counter of checkouts that gave up waiting for a free connection.",
+    ["alias"],
+    namespace=NAMESPACE,
+)
+
+db_pool_reaped_total = Counter(
+    "django_db_pool_reaped_total",
+    "Counter of idle or broken pooled connections closed by database.",
+    ["alias"],
+    namespace=NAMESPACE,
+)
+
+db_pool_wait_seconds = Histogram(
+    "django_db_pool_wait_seconds",
+    "Time spent waiting to check a connection out of the pool.",
+    ["alias"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10),
+    namespace=NAMESPACE,
+)
+
+http_request_queries = Histogram(
+    "django_http_request_queries",
+    "SQL queries per sampled request by view and action.",
+    ["view", "action"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 250),
+    namespace=NAMESPACE,
+)
+
+http_request_db_seconds = Histogram(
+    "django_http_request_db_seconds",
+    "Time spent in SQL queries per sampled request by view and action.",
+    ["view", "action"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+    namespace=NAMESPACE,
+)
+
+http_query_budget_exceeded_total = Counter(
+    "django_http_query_budget_exceeded_total",
+    "Counter of sampled requests over their view's query budget.",
+    ["view", "action"],
+    namespace=NAMESPACE,
+)
+
+http_request_phase_seconds = Histogram(
+    "django_http_request_phase_seconds",
+    "Time spent per request phase (auth, queryset, serialize, render) by "
+    "view and action.",
+    ["view", "action", "phase"],
+    buckets=(
+        0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1
+    ),
+    namespace=NAMESPACE,
+)
+
+cache_requests_total = Counter(
+    "django_cache_near_requests_total",
+    "Counter of near cache lookups by cache, tier (local or remote) and "
+    "result (hit or miss).",
+    ["cache", "tier", "result"],
+    namespace=NAMESPACE,
+)
+
+cache_bytes = Gauge(
+    "django_cache_near_bytes",
+    "Memory used per near cache tier: the process LRU (local) or the "
+    "Redis server (remote).",
+    ["cache", "tier"],
+    namespace=NAMESPACE,
+)
+
+cache_entries = Gauge(
+    "django_cache_near_entries",
+    "Entries held per near cache tier.",
+    ["cache", "tier"],
+    namespace=NAMESPACE,
+)
+
+http_throttled_total = Counter(
+    "django_http_throttled_total",
+    "Counter of requests rejected by a rate limit by view and action.",
+    ["view", "action"],
+    namespace=NAMESPACE,
+)
@@ -0,0 +1,248 @@
+"""
+Middleware shared by the API
+"""
+
+import asyncio
+import hmac
+import logging
+import random
+import sys
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from core import metrics
+from core.compression import (
+    MIN_LENGTH,
+    compress,
+    compress_stream,
+    is_compressible,
+    negotiate_encoding,
+)
+from core.profiling import StackSampler, write_folded
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    # execute_wrapper counting queries and the time spent in them
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+    def install(self):
+        for connection in connections.all():
+            connection.execute_wrappers.append(self)
+
+    def uninstall(self):
+        for connection in connections.all():
+            if self in connection.execute_wrappers:
+                connection.execute_wrappers.remove(self)
+
+
+def query_budget(view_func, action):
+    # Return the budget a view declares for an action, if any. Views set
+    # query_budget to an int, or to a dict keyed by action.
+    view = getattr(view_func, "cls", view_func)
+    budget = getattr(view, "query_budget", None)
+    if isinstance(budget, dict):
+        return budget.get(action)
+
+    return budget
+
+
+class QueryBudgetMiddleware:
+    # Count the SQL queries and DB time of a sampled fraction of requests
+    # (QUERY_BUDGET_SAMPLE_RATE) and export them per view and action. A
+    # sampled request over its view's query_budget is logged or raises,
+    # per QUERY_BUDGET_ACTION. Unsampled requests only cost one random().
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Mark the instance as a coroutine function, like
+            # django.utils.deprecation.MiddlewareMixin does
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        if not self._sampled():
+            return self.get_response(request)
+
+        counter = QueryCounter()
+        counter.install()
+        try:
+            response = self.get_response(request)
+        finally:
+            counter.uninstall()
+
+        self._record(request, counter)
+        return response
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+
+        # Async views run their ORM calls on the request's thread
+        # sensitive thread, so the wrappers are installed there
+        counter = QueryCounter()
+        await sync_to_async(counter.install)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(counter.uninstall)()
+
+        self._record(request, counter)
+        return response
+
+    def _sampled(self):
+        rate = settings.QUERY_BUDGET_SAMPLE_RATE
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def _record(self, request, counter):
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            view, action, budget = "<unresolved>", "", None
+        else:
+            actions = getattr(match.func, "actions", None) or {}
+            method = request.method.lower()
+            view = match.view_name
+            action = actions.get(method, method)
+            budget = query_budget(match.func, action)
+
+        metrics.http_request_queries.labels(view, action).observe(
+            counter.count
+        )
+        metrics.http_request_db_seconds.labels(view, action).observe(
+            counter.duration
+        )
+
+        if budget is None or counter.count <= budget:
+            return
+
+        metrics.http_query_budget_exceeded_total.labels(view, action).inc()
+        msg = (
+            f"{view} ({action}) made {counter.count} queries,"
+            f" its budget is {budget}"
+        )
+        if settings.QUERY_BUDGET_ACTION == "raise":
+            raise QueryBudgetExceeded(msg)
+
+        logger.warning(msg)
+
+
+class ProfilingMiddleware:
+    # Sample the stacks of a request when it sends an X-Profile header
+    # matching PROFILING_TOKEN, or for a PROFILING_SAMPLE_RATE fraction of
+    # requests. Stacks are written as folded files to PROFILING_DIR and
+    # named in the X-Profile-Id response header; profile_summary merges
+    # them. Async requests hop between threads and are not profiled.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.get_response(request)
+
+        if not self._profiled(request):
+            return self.get_response(request)
+
+        sampler = StackSampler(
+            threading.get_ident(),
+            sys._getframe(),
+            settings.PROFILING_INTERVAL,
+        )
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+
+        if sampler.stacks:
+            match = getattr(request, "resolver_match", None)
+            label = match.view_name if match else "unresolved"
+            response["X-Profile-Id"] = write_folded(
+                settings.PROFILING_DIR,
+                label,
+                sampler.stacks,
+            )
+
+        return response
+
+    def _profiled(self, request):
+        token = settings.PROFILING_TOKEN
+        header = request.META.get("HTTP_X_PROFILE")
+        if token and header and hmac.compare_digest(header, token):
+            return True
+
+        rate = settings.PROFILING_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    # Compress text and JSON responses with brotli or gzip, whichever the
+    # client prefers, streaming ones chunk by chunk. Responses that already
+    # carry a Content-Encoding, like precompressed cache entries, pass
+    # through untouched.
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding") or not is_compressible(
+            response
+        ):
+            return response
+
+        if not response.streaming and len(response.content) < MIN_LENGTH:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate_encoding(
+            request.META.get("HTTP_ACCEPT_ENCODING", "")
+        )
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding
+            )
+            del response.headers["Content-Length"]
+        else:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+
+        # The representation changed, so a strong ETag no longer holds
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def backfill_created_by(apps, schema_editor):
+    # Copy the owner of each product onto its category links
+    Product = apps.get_model("core", "Product")
+    ProductCategoryLink = apps.get_model("core", "ProductCategoryLink")
+    ProductCategoryLink.objects.using(schema_editor.connection.alias).update(
+        created_by=Subquery(
+            Product.objects.filter(pk=OuterRef("product_id")).values(
+                "created_by"
+            )[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0011_productstock_product'),
+    ]
+
+    operations = [
+        # Adopt the auto-created join table as an explicit through model,
+        # nothing changes in the database until created_by is added
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ProductCategoryLink',
+                    fields=[
+                        ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                        ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.product')),
+                        ('productcategory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.productcategory')),
+                    ],
+                    options={
+                        'db_table': 'core_product_categories',
+                        'unique_together': {('product', 'productcategory')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='product',
+                    name='categories',
+                    field=models.ManyToManyField(through='core.ProductCategoryLink', to='core.productcategory'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='productcategorylink',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='product_category_link_created_by', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_created_by, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.1.13 on 2026-10-19 02:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_productcategorylink"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["created_by", "id"],
+                name="product_created_by_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="productcategory",
+            index=models.Index(
+                fields=["created_by", "name"],
+                name="category_created_by_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="productstock",
+            index=models.Index(
+                fields=["created_by", "quantity"],
+                name="stock_created_by_qty_idx",
+            ),
+        ),
+    ]
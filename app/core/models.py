@@ -29,15 +29,97 @@ class UserManager(BaseUserManager):
 
     def create_superuser(self, email, password):
         # Create, save and return a new superuser
-        user = self.create_user(email, password)
-        user.is_staff = True
-        user.is_superuser = True
-        user.save(using=self._db)
+        return self.create_user(
+            email,
+            password,
+            is_staff=True,
+            is_superuser=True,
+        )
 
-        return user
 
+class DirtyFieldsMixin:
+    # Remember the column values an instance was loaded or last saved
+    # with, so save() on an existing row UPDATEs only the columns that
+    # changed and skips the query when none did. Explicit update_fields
+    # are left alone, and instances that were never loaded or saved
+    # (e.g. built with a known pk) fall back to a full save. Unlike a full
+    # save, a dirty save of an instance whose row was deleted raises
+    # DatabaseError instead of inserting it again; pass force_insert=True
+    # to re-create it. Catching the error to retry would mark an enclosing
+    # atomic block for rollback.
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_fields()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._snapshot_fields()
+
+    def _snapshot_fields(self, update_fields=None):
+        # Deferred fields are not in __dict__ and are never dirty. After a
+        # save of given update_fields only those columns are clean.
+        fields = self._meta.concrete_fields
+        loaded = getattr(self, "_loaded_values", None)
+        if update_fields is not None and loaded is not None:
+            names = set(update_fields)
+            fields = [
+                field
+                for field in fields
+                if field.name in names or field.attname in names
+            ]
+        else:
+            loaded = self._loaded_values = {}
+
+        loaded.update(
+            {
+                field.attname: self.__dict__[field.attname]
+                for field in fields
+                if field.attname in self.__dict__
+            }
+        )
+
+    def get_dirty_fields(self):
+        # Return the changed field names, or None when unknown. A cleared
+        # or reassigned pk (e.g. copying a row) needs a full save.
+        loaded = getattr(self, "_loaded_values", None)
+        if loaded is None:
+            return None
+        pk_name = self._meta.pk.attname
+        if self.pk is None or self.pk != loaded.get(pk_name):
+            return None
 
-class User(AbstractBaseUser, PermissionsMixin):
+        dirty = []
+        for field in self._meta.concrete_fields:
+            if field.primary_key or field.attname not in loaded:
+                continue
+            if getattr(field, "auto_now", False):
+                # Set in pre_save on every save
+                dirty.append(field.name)
+            elif getattr(self, field.attname) != loaded[field.attname]:
+                dirty.append(field.name)
+
+        return dirty
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and not args
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            dirty = self.get_dirty_fields()
+            if dirty is not None:
+                # An empty list makes Django skip the save entirely
+                kwargs["update_fields"] = dirty
+
+        super().save(*args, **kwargs)
+        self._snapshot_fields(kwargs.get("update_fields"))
+
+
+class User(DirtyFieldsMixin, AbstractBaseUser, PermissionsMixin):
     # User in the system
     email = models.EmailField(max_length=255, unique=True)
     name = models.CharField(max_length=255)
@@ -49,7 +131,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
 
 
-class Product(ExportModelOperationsMixin("product"), models.Model):
+class Product(
+    DirtyFieldsMixin, ExportModelOperationsMixin("product"), models.Model
+):
     # Product object
     id = models.AutoField(primary_key=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -61,7 +145,10 @@ class Product(ExportModelOperationsMixin("product"), models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     price = models.DecimalField(max_digits=6, decimal_places=0)
-    categories = models.ManyToManyField("ProductCategory")
+    categories = models.ManyToManyField(
+        "ProductCategory",
+        through="ProductCategoryLink",
+    )
     stock = models.OneToOneField(
         "ProductStock",
         null=True,
@@ -70,19 +157,34 @@ class Product(ExportModelOperationsMixin("product"), models.Model):
         related_name="product_stock",
     )
 
+    class Meta:
+        indexes = [
+            # Per-user lists ordered by -id
+            models.Index(
+                fields=["created_by", "id"],
+                name="product_created_by_id_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
     def stock_count(self):
+        # Reads the stock_quantity annotation of product/queries.py, else
+        # the reverse one-to-one, so select_related("product_stock") on
+        # the queryset avoids a query per product
+        if hasattr(self, "stock_quantity"):
+            return self.stock_quantity
         try:
-            product_stock = ProductStock.objects.get(product=self.pk)
-            return product_stock.quantity
+            return self.product_stock.quantity
         except ProductStock.DoesNotExist:
             return 0
 
 
 class ProductCategory(
-    ExportModelOperationsMixin("product_category"), models.Model
+    DirtyFieldsMixin,
+    ExportModelOperationsMixin("product_category"),
+    models.Model,
 ):
     # Product category object
     id = models.AutoField(primary_key=True)
@@ -94,12 +196,23 @@ class ProductCategory(
     )
     name = models.CharField(max_length=255)
 
+    class Meta:
+        indexes = [
+            # Per-user lists ordered by -name
+            models.Index(
+                fields=["created_by", "name"],
+                name="category_created_by_name_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
 
 class ProductStock(
-    ExportModelOperationsMixin("product_category"), models.Model
+    DirtyFieldsMixin,
+    ExportModelOperationsMixin("product_category"),
+    models.Model,
 ):
     # Product stock object
     id = models.AutoField(primary_key=True)
@@ -118,5 +231,36 @@ class ProductStock(
     )
     quantity = models.IntegerField()
 
+    class Meta:
+        indexes = [
+            # Per-user lists ordered by -quantity
+            models.Index(
+                fields=["created_by", "quantity"],
+                name="stock_created_by_qty_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.product.name
+
+
+class ProductCategoryLink(DirtyFieldsMixin, models.Model):
+    # Link between a product and a category. Carries created_by like the
+    # product it belongs to, so the table can be partitioned by owner.
+    id = models.BigAutoField(primary_key=True)
+    product = models.ForeignKey("Product", on_delete=models.CASCADE)
+    productcategory = models.ForeignKey(
+        "ProductCategory",
+        on_delete=models.CASCADE,
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="product_category_link_created_by",
+    )
+
+    class Meta:
+        db_table = "core_product_categories"
+        unique_together = [["product", "productcategory"]]
@@ -0,0 +1,400 @@
+"""
+Two-tier cache: a per-process LRU in front of a shared cache
+
+NearCache is a cache backend keeping recently read values of a remote
+cache (the Redis "default" one) in process memory, bounded by MAX_ENTRIES
+and MAX_BYTES. Writes go to the remote cache and are announced on a
+broker; every process drops its local copy of the keys written by the
+others. Local copies also expire after LOCAL_TIMEOUT seconds, which bounds
+staleness when an invalidation is lost, or sooner when the value was
+written with a shorter timeout. Writes store the expiry next to the value
+for that. Meant for tiny, hot values such as token lookups and catalog
+versions.
+
+    CACHES["near"] = {
+        "BACKEND": "core.nearcache.NearCache",
+        "LOCATION": "near",
+        "OPTIONS": {"REMOTE": "default", "MAX_BYTES": 16 * 2**20},
+    }
+
+RedisBroker uses Redis pub/sub on the remote cache's server, LocalBroker
+delivers in-process for tests.
+"""
+
+import collections
+import logging
+import os
+import pickle
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.module_loading import import_string
+
+from core import metrics
+
+
+logger = logging.getLogger(__name__)
+
+ALL_KEYS = "*"
+# Suffix of the remote key holding the expiry of a value, as a Unix time
+EXPIRES_SUFFIX = ":expires"
+
+
+class LocalBroker:
+    # Deliver invalidations to the subscribers of this process, for tests
+    _subscribers = collections.defaultdict(list)
+
+    def __init__(self, remote):
+        pass
+
+    def publish(self, channel, message):
+        for callback in list(self._subscribers[channel]):
+            callback(message)
+
+    def subscribe(self, channel, callback, on_error):
+        self._subscribers[channel].append(callback)
+
+
+class RedisBroker:
+    # Deliver invalidations over Redis pub/sub on the remote cache's server
+
+    def __init__(self, remote):
+        self.client = remote._cache.get_client(write=True)
+
+    def publish(self, channel, message):
+        self.client.publish(channel, message)
+
+    def subscribe(self, channel, callback, on_error):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(
+            **{channel: lambda message: callback(message["data"].decode())}
+        )
+
+        def exception_handler(e, pubsub, thread):
+            # Messages may have been lost while disconnected
+            logger.warning("Near cache invalidations interrupted: %s", e)
+            on_error()
+            time.sleep(1)
+
+        pubsub.run_in_thread(
+            sleep_time=1,
+            daemon=True,
+            exception_handler=exception_handler,
+        )
+
+
+class LocalStore:
+    # The LRU of a process, shared by the cache instances of its threads
+
+    def __init__(self, name, max_entries, max_bytes):
+        self.name = name
+        self.sender = str(os.getpid())
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = collections.OrderedDict()
+        self.bytes = 0
+        # Bumped on every invalidation, so a value read from the remote
+        # cache before one isn't stored after it
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            data, expires = entry
+            if expires < time.monotonic():
+                self._pop(key)
+                return None
+            self.entries.move_to_end(key)
+            return data
+
+    def put(self, key, data, timeout, generation):
+        with self.lock:
+            if generation != self.generation or len(data) > self.max_bytes:
+                return
+            self._pop(key)
+            self.entries[key] = (data, time.monotonic() + timeout)
+            self.bytes += len(data)
+            while (
+                len(self.entries) > self.max_entries
+                or self.bytes > self.max_bytes
+            ):
+                self._pop(next(iter(self.entries)))
+            self._export()
+
+    def invalidate(self, key):
+        with self.lock:
+            self.generation += 1
+            if key == ALL_KEYS:
+                self.entries.clear()
+                self.bytes = 0
+            else:
+                self._pop(key)
+            self._export()
+
+    def _pop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= len(entry[0])
+
+    def _export(self):
+        metrics.cache_bytes.labels(self.name, "local").set(self.bytes)
+        metrics.cache_entries.labels(self.name, "local").set(
+            len(self.entries)
+        )
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class NearCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.name = location or "near"
+        self.remote = caches[options.get("REMOTE", "default")]
+        self.local_timeout = options.get("LOCAL_TIMEOUT", 5)
+        self.channel = f"nearcache:{self.name}"
+        self.broker = import_string(
+            options.get("BROKER", "core.nearcache.RedisBroker")
+        )(self.remote)
+        self.store = self._get_store(options.get("MAX_BYTES", 16 * 2**20))
+
+    def _get_store(self, max_bytes):
+        # One store and subscription per process, also after a fork
+        key = (self.name, os.getpid())
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                store = LocalStore(self.name, self._max_entries, max_bytes)
+                self.broker.subscribe(
+                    self.channel,
+                    lambda message: self._on_message(store, message),
+                    lambda: store.invalidate(ALL_KEYS),
+                )
+                metrics.cache_bytes.labels(self.name, "remote").set_function(
+                    self._remote_bytes
+                )
+                _stores[key] = store
+
+        return store
+
+    def _on_message(self, store, message):
+        sender, _, key = message.partition("|")
+        if sender != store.sender:
+            store.invalidate(key)
+
+    def _remote_bytes(self):
+        try:
+            client = self.remote._cache.get_client()
+            return client.info("memory")["used_memory"]
+        except Exception:
+            return float("nan")
+
+    def _invalidate(self, keys):
+        # Drop local copies here and announce the keys to other processes
+        for key in keys:
+            self.store.invalidate(key)
+            self.broker.publish(self.channel, f"{self.store.sender}|{key}")
+
+    def _record(self, tier, hit):
+        metrics.cache_requests_total.labels(
+            self.name, tier, "hit" if hit else "miss"
+        ).inc()
+
+    def _local_get(self, key):
+        data = self.store.get(key)
+        self._record("local", data is not None)
+        return data
+
+    def _keep(self, key, value, expires, generation):
+        # Keep a local copy no longer than the remote one lives
+        timeout = self.local_timeout
+        if expires is not None:
+            timeout = min(timeout, expires - time.time())
+        if timeout <= 0:
+            return
+
+        self.store.put(
+            key,
+            pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+            timeout,
+            generation,
+        )
+
+    def _expires(self, timeout):
+        return None if timeout is None else time.time() + timeout
+
+    def _with_expires(self, data, timeout):
+        # The remote entries of data, with the expiry of each value
+        expires = self._expires(timeout)
+        return {
+            **data,
+            **{f"{key}{EXPIRES_SUFFIX}": expires for key in data},
+        }
+
+    def _found(self, key, found, default, version, generation):
+        # Keep and return the remote value of key from a get_many result
+        self._record("remote", key in found)
+        if key not in found:
+            return default
+
+        self._keep(
+            self.make_and_validate_key(key, version),
+            found[key],
+            found.get(f"{key}{EXPIRES_SUFFIX}"),
+            generation,
+        )
+        return found[key]
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_and_validate_key(key, version)
+        data = self._local_get(local_key)
+        if data is not None:
+            return pickle.loads(data)
+
+        generation = self.store.generation
+        found = self.remote.get_many(
+            [key, f"{key}{EXPIRES_SUFFIX}"],
+            version=version,
+        )
+        return self._found(key, found, default, version, generation)
+
+    async def aget(self, key, default=None, version=None):
+        # Local hits don't need a thread
+        local_key = self.make_and_validate_key(key, version)
+        data = self._local_get(local_key)
+        if data is not None:
+            return pickle.loads(data)
+
+        generation = self.store.generation
+        found = await self.remote.aget_many(
+            [key, f"{key}{EXPIRES_SUFFIX}"],
+            version=version,
+        )
+        return self._found(key, found, default, version, generation)
+
+    def get_many(self, keys, version=None):
+        found = {}
+        misses = []
+        for key in keys:
+            data = self._local_get(self.make_and_validate_key(key, version))
+            if data is None:
+                misses.append(key)
+            else:
+                found[key] = pickle.loads(data)
+
+        if misses:
+            generation = self.store.generation
+            remote = self.remote.get_many(
+                misses + [f"{key}{EXPIRES_SUFFIX}" for key in misses],
+                version=version,
+            )
+            for key in misses:
+                missing = object()
+                value = self._found(key, remote, missing, version, generation)
+                if value is not missing:
+                    found[key] = value
+
+        return found
+
+    def has_key(self, key, version=None):
+        local_key = self.make_and_validate_key(key, version)
+        if self.store.get(local_key) is not None:
+            return True
+
+        return self.remote.has_key(key, version=version)  # noqa: W601
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        added = self.remote.add(key, value, timeout, version=version)
+        if added:
+            # Until the expiry lands, readers keep LOCAL_TIMEOUT copies
+            self.remote.set(
+                f"{key}{EXPIRES_SUFFIX}",
+                self._expires(timeout),
+                timeout,
+                version=version,
+            )
+            self._invalidate([self.make_and_validate_key(key, version)])
+        return added
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        self.remote.set_many(
+            self._with_expires({key: value}, timeout),
+            timeout,
+            version=version,
+        )
+        self._invalidate([self.make_and_validate_key(key, version)])
+
+    async def aset(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        await self.remote.aset_many(
+            self._with_expires({key: value}, timeout),
+            timeout,
+            version=version,
+        )
+        # Publishing is blocking network IO, keep it off the event loop
+        await sync_to_async(self._invalidate)(
+            [self.make_and_validate_key(key, version)]
+        )
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        failed = self.remote.set_many(
+            self._with_expires(data, timeout),
+            timeout,
+            version=version,
+        )
+        self._invalidate(
+            [self.make_and_validate_key(key, version) for key in data]
+        )
+        return [key for key in failed if key in data]
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        touched = self.remote.touch(key, timeout, version=version)
+        if touched:
+            self.remote.set(
+                f"{key}{EXPIRES_SUFFIX}",
+                self._expires(timeout),
+                timeout,
+                version=version,
+            )
+        return touched
+
+    def delete(self, key, version=None):
+        deleted = self.remote.delete(key, version=version)
+        self.remote.delete(f"{key}{EXPIRES_SUFFIX}", version=version)
+        self._invalidate([self.make_and_validate_key(key, version)])
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self.remote.delete_many(
+            [*keys, *(f"{key}{EXPIRES_SUFFIX}" for key in keys)],
+            version=version,
+        )
+        self._invalidate(
+            [self.make_and_validate_key(key, version) for key in keys]
+        )
+
+    def incr(self, key, delta=1, version=None):
+        value = self.remote.incr(key, delta, version=version)
+        self._invalidate([self.make_and_validate_key(key, version)])
+        return value
+
+    def clear(self):
+        self.remote.clear()
+        self._invalidate([ALL_KEYS])
+
+    def _timeout(self, timeout):
+        # Pass this cache's default timeout on to the remote cache
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
@@ -0,0 +1,140 @@
+"""
+Pagination with estimated counts for large querysets
+
+Counting every matching row is the slowest part of paging through a big
+catalog. Counts below COUNT_ESTIMATE_THRESHOLD are exact, from a count
+that stops at the threshold. Above it the count is an estimate on
+PostgreSQL (pg_class for whole tables, the planner's row estimate
+otherwise, and never less than the threshold), until an exact count made
+in the background lands in the cache for COUNT_CACHE_TIMEOUT seconds.
+"""
+
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+
+from core.explain import estimated_rows, explain, table_rows
+
+
+def count_cache_key(queryset):
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.sha1(
+        f"{queryset.db}:{sql}:{params}".encode()
+    ).hexdigest()
+    return f"count:{digest}"
+
+
+def planner_estimate(queryset):
+    # PostgreSQL's estimate of the rows a queryset returns, None elsewhere
+    if connections[queryset.db].vendor != "postgresql":
+        return None
+
+    if not queryset.query.where and not queryset.query.distinct:
+        return table_rows(queryset.model._meta.db_table, using=queryset.db)
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    return estimated_rows(explain(sql, params, using=queryset.db))
+
+
+def refresh_count(queryset, key):
+    # Cache the exact count, counting once at a time per query
+    lock = f"{key}:lock"
+    if not cache.add(lock, 1, settings.COUNT_CACHE_TIMEOUT):
+        return
+
+    def count():
+        try:
+            cache.set(key, queryset.count(), settings.COUNT_CACHE_TIMEOUT)
+        finally:
+            cache.delete(lock)
+
+    def count_in_thread():
+        try:
+            count()
+        finally:
+            connections.close_all()
+
+    if settings.COUNT_REFRESH_IN_BACKGROUND:
+        threading.Thread(target=count_in_thread, daemon=True).start()
+    else:
+        count()
+
+
+def estimated_count(queryset):
+    # Return (count, exact). A cached count may be up to
+    # COUNT_CACHE_TIMEOUT seconds old, so it is not reported as exact.
+    key = count_cache_key(queryset)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached, False
+
+    # One bounded COUNT settles small lists, such as most per-user ones,
+    # without asking the planner
+    threshold = settings.COUNT_ESTIMATE_THRESHOLD
+    bounded = queryset.order_by()[:threshold].count()
+    if bounded < threshold:
+        return bounded, True
+
+    estimate = planner_estimate(queryset)
+    if estimate is None:
+        return queryset.count(), True
+
+    # The bounded count already found threshold rows, so an estimate below
+    # it is known to be short and the threshold is the better guess
+    refresh_count(queryset.order_by(), key)
+    return max(estimate, threshold), False
+
+
+class EstimatedCountPaginator(Paginator):
+    # Paginator counting with estimated_count. An estimate may be short of
+    # the real count, so pages past it are served rather than rejected.
+    count_is_exact = True
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+
+        count, self.count_is_exact = estimated_count(self.object_list)
+        return count
+
+    def page(self, number):
+        if self.count and self.count_is_exact:
+            return super().page(number)
+
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+
+        bottom = (number - 1) * self.per_page
+        object_list = self.object_list[bottom:bottom + self.per_page]
+        return self._get_page(object_list, number, self)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    # Pages only when the client asks for ?page_size=N, so responses stay
+    # plain lists otherwise
+    django_paginator_class = EstimatedCountPaginator
+    page_size = None
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data["count_is_exact"] = self.page.paginator.count_is_exact
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema["properties"]["count_is_exact"] = {"type": "boolean"}
+        return schema
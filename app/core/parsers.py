@@ -0,0 +1,19 @@
+"""
+Parsers shared by the API
+"""
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from core import binary
+
+
+class MessagePackParser(BaseParser):
+    # Parse MessagePack request bodies, see core/binary.py
+    media_type = binary.MEDIA_TYPE
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return binary.unpackb(stream.read())
+        except Exception as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
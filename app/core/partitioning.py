@@ -0,0 +1,139 @@
+"""
+PostgreSQL hash partitioning of the catalog tables by created_by_id
+
+Every catalog query is scoped to the requesting user, so partitioning on
+created_by_id lets PostgreSQL prune each query down to one partition.
+
+A partitioned table can only enforce uniqueness on column sets that
+include the partition key. The primary keys become (id, created_by_id),
+and foreign keys that point at product or stock ids are dropped.
+Django's delete collector still cascades those relations.
+"""
+
+from django.contrib.auth import get_user_model
+
+from core.explain import scanned_relations
+
+from core.models import (
+    Product,
+    ProductCategory,
+    ProductCategoryLink,
+    ProductStock,
+)
+
+
+PARTITION_KEY = "created_by_id"
+
+
+def partitioned_tables():
+    # Tables to partition, with the unique column sets, indexes and
+    # foreign keys to recreate on each of them
+    user_table = get_user_model()._meta.db_table
+    category_table = ProductCategory._meta.db_table
+
+    return [
+        {
+            "table": Product._meta.db_table,
+            "primary_key": ["id", PARTITION_KEY],
+            "unique": [["stock_id", PARTITION_KEY]],
+            "indexes": [[PARTITION_KEY, "id"]],
+            "foreign_keys": [(PARTITION_KEY, user_table)],
+        },
+        {
+            "table": ProductStock._meta.db_table,
+            "primary_key": ["id", PARTITION_KEY],
+            "unique": [["product_id", PARTITION_KEY]],
+            "indexes": [[PARTITION_KEY, "quantity"]],
+            "foreign_keys": [(PARTITION_KEY, user_table)],
+        },
+        {
+            "table": ProductCategoryLink._meta.db_table,
+            # created_by_id may be NULL for links added outside the API,
+            # so this table gets a unique index instead of a primary key
+            "primary_key": None,
+            "unique": [["product_id", "productcategory_id", PARTITION_KEY]],
+            "indexes": [[PARTITION_KEY, "product_id"], ["productcategory_id"]],
+            "foreign_keys": [
+                (PARTITION_KEY, user_table),
+                ("productcategory_id", category_table),
+            ],
+        },
+    ]
+
+
+def partition_sql(spec, partitions, quote_name):
+    # Statements converting one table into a hash partitioned table
+    table = spec["table"]
+    old = f"{table}_unpartitioned"
+    sequence = f"{table}_id_partitioned_seq"
+    q = quote_name
+
+    statements = [
+        f"LOCK TABLE {q(table)} IN ACCESS EXCLUSIVE MODE",
+        f"ALTER TABLE {q(table)} RENAME TO {q(old)}",
+        f"CREATE TABLE {q(table)} (LIKE {q(old)} INCLUDING STORAGE) "
+        f"PARTITION BY HASH ({q(PARTITION_KEY)})",
+    ]
+    for remainder in range(partitions):
+        statements.append(
+            f"CREATE TABLE {q(f'{table}_p{remainder}')} "
+            f"PARTITION OF {q(table)} "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        )
+
+    statements += [
+        f"INSERT INTO {q(table)} SELECT * FROM {q(old)}",
+        f"CREATE SEQUENCE {q(sequence)} OWNED BY {q(table)}.{q('id')}",
+        f"SELECT setval('{sequence}', "
+        f"COALESCE((SELECT MAX({q('id')}) FROM {q(table)}), 0) + 1, false)",
+        f"ALTER TABLE {q(table)} ALTER COLUMN {q('id')} "
+        f"SET DEFAULT nextval('{sequence}')",
+    ]
+
+    if spec["primary_key"]:
+        columns = ", ".join(q(column) for column in spec["primary_key"])
+        statements.append(
+            f"ALTER TABLE {q(table)} ADD PRIMARY KEY ({columns})"
+        )
+    for number, unique in enumerate(spec["unique"]):
+        columns = ", ".join(q(column) for column in unique)
+        statements.append(
+            f"CREATE UNIQUE INDEX {q(f'{table}_part_uniq{number}')} "
+            f"ON {q(table)} ({columns})"
+        )
+    for number, index in enumerate(spec["indexes"]):
+        columns = ", ".join(q(column) for column in index)
+        statements.append(
+            f"CREATE INDEX {q(f'{table}_part_idx{number}')} "
+            f"ON {q(table)} ({columns})"
+        )
+    for column, target in spec["foreign_keys"]:
+        statements.append(
+            f"ALTER TABLE {q(table)} "
+            f"ADD CONSTRAINT {q(f'{table}_{column}_part_fk')} "
+            f"FOREIGN KEY ({q(column)}) REFERENCES {q(target)} ({q('id')}) "
+            f"DEFERRABLE INITIALLY DEFERRED"
+        )
+
+    # CASCADE drops the foreign keys other tables had on the old ids
+    statements.append(f"DROP TABLE {q(old)} CASCADE")
+    return statements
+
+
+def is_partitioned(cursor, table):
+    cursor.execute(
+        "SELECT 1 FROM pg_partitioned_table p "
+        "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = %s",
+        [table],
+    )
+    return cursor.fetchone() is not None
+
+
+def scanned_partitions(plan, table):
+    # Partitions of a table that a plan reads from
+    prefix = f"{table}_p"
+    return sorted(
+        relation
+        for relation in scanned_relations(plan)
+        if relation.startswith(prefix) and relation[len(prefix):].isdigit()
+    )
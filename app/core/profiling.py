@@ -0,0 +1,113 @@
+"""
+In-process stack sampling profiler
+
+A sampler thread snapshots the stack of one request's thread at a fixed
+interval. Identical stacks are counted and written in the folded format
+("frame;frame;frame count" per line) read by flamegraph.pl, speedscope
+and inferno. Each stack starts with the request phase it was sampled in:
+view, serialize or render.
+"""
+
+import collections
+import os
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+
+PHASES = ("view", "serialize", "render")
+
+
+def frame_name(frame):
+    # module.function, e.g. rest_framework.serializers.to_representation
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+
+
+def phase_of(names):
+    # Classify a stack by the outermost DRF render or serializer frame
+    for name in names:
+        if name.startswith("rest_framework.renderers.") and name.endswith(
+            ".render"
+        ):
+            return "render"
+        if name.endswith(".to_representation"):
+            return "serialize"
+
+    return "view"
+
+
+class StackSampler(threading.Thread):
+    # Sample the stack of thread_id below the root frame every interval
+    # seconds until stop() is called
+
+    def __init__(self, thread_id, root, interval):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.root = root
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self._fold(frame)] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+    def _fold(self, frame):
+        names = []
+        while frame is not None and frame is not self.root:
+            names.append(frame_name(frame))
+            frame = frame.f_back
+        names.reverse()
+
+        return ";".join([phase_of(names)] + names)
+
+
+def write_folded(directory, label, stacks):
+    # Write counted stacks to a new file and return its name
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r"[^\w.-]+", "_", label)
+    name = f"{int(time.time() * 1000)}-{os.getpid()}-{slug}.folded"
+    with open(directory / name, "w") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+    return name
+
+
+def read_folded(paths):
+    # Merge folded files into one Counter of stacks
+    stacks = collections.Counter()
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                if stack:
+                    stacks[stack] += int(count)
+
+    return stacks
+
+
+def summarize(stacks):
+    # Return samples per phase, and per function the samples where it is
+    # the leaf (self) and where it is anywhere on the stack (total)
+    phases = collections.Counter()
+    own = collections.Counter()
+    total = collections.Counter()
+    for stack, count in stacks.items():
+        phase, *names = stack.split(";")
+        phases[phase] += count
+        if names:
+            own[names[-1]] += count
+        for name in set(names):
+            total[name] += count
+
+    return phases, own, total
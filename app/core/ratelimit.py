@@ -0,0 +1,113 @@
+"""
+Token bucket rate limiting
+
+A bucket holds up to `capacity` tokens and refills at `rate` tokens per
+second. Each request takes one token and is rejected when the bucket is
+empty. The Redis implementation does the whole check in a single atomic
+Lua call, so it is shared by every worker. The local one keeps buckets
+in process memory for tests and single-process setups.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    # Turn "<requests>/<period>" into (capacity, tokens per second)
+    requests, period = rate.split("/")
+    capacity = int(requests)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+class LocalTokenBucket:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def consume(self, key, capacity, rate, tokens=1):
+        # Take tokens from a bucket, return (allowed, seconds to wait)
+        now = time.monotonic()
+        with self._lock:
+            available, updated_at = self._buckets.get(key, (capacity, now))
+            available = min(
+                capacity,
+                available + max(0.0, now - updated_at) * rate,
+            )
+            if available >= tokens:
+                self._buckets[key] = (available - tokens, now)
+                return True, 0.0
+
+            self._buckets[key] = (available, now)
+            return False, (tokens - available) / rate
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class RedisTokenBucket:
+    # Buckets are hashes of (tokens, ts) that expire once they would be
+    # full again. The script uses the Redis clock so workers never
+    # disagree about elapsed time.
+    SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+
+local allowed = 0
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+    allowed = 1
+else
+    wait = (requested - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(wait)}
+"""
+
+    def __init__(self, url=None):
+        import redis
+
+        self._client = redis.Redis.from_url(url or settings.REDIS_URL)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    def consume(self, key, capacity, rate, tokens=1):
+        # Take tokens from a bucket, return (allowed, seconds to wait)
+        allowed, wait = self._script(
+            keys=[f"ratelimit:{key}"],
+            args=[capacity, rate, tokens],
+        )
+        return bool(allowed), float(wait)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_token_bucket():
+    # Process-wide bucket store selected by settings.RATELIMIT_BACKEND
+    path = settings.RATELIMIT_BACKEND
+    bucket = _buckets.get(path)
+    if bucket is None:
+        with _buckets_lock:
+            bucket = _buckets.get(path)
+            if bucket is None:
+                bucket = _buckets[path] = import_string(path)()
+
+    return bucket
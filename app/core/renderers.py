@@ -0,0 +1,66 @@
+"""
+Renderers shared by the API
+"""
+
+import time
+
+from django.conf import settings
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from core import binary, metrics
+
+
+def server_timing(timings):
+    # Format phase durations in seconds as a Server-Timing header value
+    return ", ".join(
+        f"{phase};dur={seconds * 1000:.2f}"
+        for phase, seconds in timings.items()
+    )
+
+
+class TimedRendererMixin:
+    # Time rendering for views using PhaseTimingMixin and, with
+    # SERVER_TIMING_HEADER, report every phase in a Server-Timing header.
+    # Other views render exactly like the base renderer.
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        start = time.perf_counter()
+        content = super().render(data, accepted_media_type, renderer_context)
+
+        response = (renderer_context or {}).get("response")
+        timings = getattr(response, "phase_timings", None)
+        if timings is None:
+            return content
+
+        timings["render"] = time.perf_counter() - start
+        metrics.http_request_phase_seconds.labels(
+            *response.phase_labels, "render"
+        ).observe(timings["render"])
+
+        if settings.SERVER_TIMING_HEADER:
+            response["Server-Timing"] = server_timing(timings)
+
+        return content
+
+
+class TimedJSONRenderer(TimedRendererMixin, JSONRenderer):
+    pass
+
+
+class MessagePackRenderer(BaseRenderer):
+    # Render MessagePack, see core/binary.py. Serializers using
+    # NativeValuesMixin leave decimals and datetimes to it.
+    media_type = binary.MEDIA_TYPE
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+    native_values = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return binary.packb(data)
+
+
+class TimedMessagePackRenderer(TimedRendererMixin, MessagePackRenderer):
+    pass
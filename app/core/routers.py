@@ -0,0 +1,60 @@
+"""
+Database routers
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+
+_read_alias = ContextVar("read_alias", default=None)
+
+
+def current_read_alias():
+    # Database alias reads are sent to, None means the primary
+    return _read_alias.get()
+
+
+@contextmanager
+def read_from(alias):
+    # Send reads inside the block to the given alias
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def pin_cache_key(user_id):
+    return f"db-pin:{user_id}"
+
+
+def pin_to_primary(user):
+    # Keep reads of a user on the primary right after they wrote
+    cache.set(pin_cache_key(user.pk), 1, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user):
+    return cache.get(pin_cache_key(user.pk)) is not None
+
+
+class PrimaryReplicaRouter:
+    # Writes always go to the primary. Reads go to the replica only inside
+    # read_from(), which the catalog viewsets use for list and retrieve.
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # Explicit, otherwise Django would write back to the database an
+        # instance was read from
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != settings.REPLICA_DATABASE
@@ -0,0 +1,169 @@
+"""
+Prebuilt OpenAPI schema
+
+Generating the schema introspects every viewset and serializer, which
+takes hundreds of milliseconds. It is built once per APP_VERSION (by the
+build_schema command at startup, or by the first request), kept on disk
+in SCHEMA_CACHE_DIR and in memory, and served as ready-made bytes, gzipped
+when the client accepts it, with an ETag.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from drf_spectacular.extensions import OpenApiAuthenticationExtension
+from drf_spectacular.renderers import (
+    OpenApiJsonRenderer,
+    OpenApiYamlRenderer,
+)
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+
+RENDERERS = {
+    "yaml": OpenApiYamlRenderer,
+    "json": OpenApiJsonRenderer,
+}
+
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+_schemas = {}
+_lock = threading.Lock()
+
+
+class SignedTokenScheme(OpenApiAuthenticationExtension):
+    # Document core.authentication.SignedTokenAuthentication
+    target_class = "core.authentication.SignedTokenAuthentication"
+    name = "signedTokenAuth"
+
+    def get_security_definition(self, auto_schema):
+        return {"type": "http", "scheme": "bearer"}
+
+
+class PrebuiltSchema:
+    # A rendered schema with its gzipped bytes and the ETags of both. The
+    # two encodings are different bytes, so they get different strong
+    # ETags.
+
+    def __init__(self, content):
+        self.content = content
+        self.gzipped = gzip.compress(content, mtime=0)
+        digest = hashlib.sha256(content).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+
+
+def render_schemas():
+    # Generate the schema and render it in every served format
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return {
+        fmt: renderer().render(schema, renderer_context={})
+        for fmt, renderer in RENDERERS.items()
+    }
+
+
+def schema_path(fmt):
+    return Path(settings.SCHEMA_CACHE_DIR) / (
+        f"openapi-{settings.APP_VERSION}.{fmt}"
+    )
+
+
+def write_schemas(contents):
+    # Write atomically so workers starting together never read a partial
+    # file
+    Path(settings.SCHEMA_CACHE_DIR).mkdir(parents=True, exist_ok=True)
+    for fmt, content in contents.items():
+        path = schema_path(fmt)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(content)
+        os.replace(tmp, path)
+
+
+def read_schemas():
+    # Return the schemas on disk for this version, or None
+    try:
+        return {fmt: schema_path(fmt).read_bytes() for fmt in RENDERERS}
+    except OSError:
+        return None
+
+
+def build_schemas():
+    # Render the schemas and store them on disk when a directory is set
+    contents = render_schemas()
+    if settings.SCHEMA_CACHE_DIR:
+        write_schemas(contents)
+
+    return contents
+
+
+def get_schema(fmt):
+    # Return the PrebuiltSchema of a format, building it at most once per
+    # process and version
+    version = settings.APP_VERSION
+    with _lock:
+        if version not in _schemas:
+            contents = None
+            if settings.SCHEMA_CACHE_DIR:
+                contents = read_schemas()
+            if contents is None:
+                contents = render_schemas()
+                try:
+                    if settings.SCHEMA_CACHE_DIR:
+                        write_schemas(contents)
+                except OSError:
+                    # Serving from memory still works without the disk copy
+                    pass
+
+            _schemas.clear()
+            _schemas[version] = {
+                fmt: PrebuiltSchema(content)
+                for fmt, content in contents.items()
+            }
+
+        return _schemas[version][fmt]
+
+
+def clear_schemas():
+    with _lock:
+        _schemas.clear()
+
+
+class PrebuiltSchemaView(SpectacularAPIView):
+    # SpectacularAPIView serving the prebuilt schema in the negotiated
+    # format instead of generating it per request
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        schema = get_schema(renderer.format)
+        accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        gzipped = bool(ACCEPTS_GZIP.search(accept_encoding))
+        etag = schema.gzip_etag if gzipped else schema.etag
+
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH", "")
+        if etag in parse_etags(if_none_match) or if_none_match == "*":
+            response = HttpResponseNotModified()
+        else:
+            content_type = request.accepted_media_type
+            if renderer.charset:
+                content_type += f"; charset={renderer.charset}"
+            response = HttpResponse(
+                schema.gzipped if gzipped else schema.content,
+                content_type=content_type,
+            )
+            if gzipped:
+                response["Content-Encoding"] = "gzip"
+
+        response["ETag"] = etag
+        response["Vary"] = "Accept, Accept-Encoding"
+        response["Cache-Control"] = "no-cache"
+        return response
@@ -0,0 +1,27 @@
+"""
+Serializer helpers shared by the API
+"""
+
+from rest_framework import serializers
+
+
+class NativeValuesMixin:
+    # Leave decimals and datetimes as Python objects when the response is
+    # rendered by a renderer with native_values, which encodes them in
+    # its own types (see core/binary.py). Nested serializers need the mixin
+    # too.
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        renderer = getattr(request, "accepted_renderer", None)
+        if not getattr(renderer, "native_values", False):
+            return fields
+
+        for field in fields.values():
+            if isinstance(field, serializers.DecimalField):
+                field.coerce_to_string = False
+            elif isinstance(field, serializers.DateTimeField):
+                field.format = None
+
+        return fields
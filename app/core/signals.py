@@ -0,0 +1,56 @@
+"""
+Signal receivers keeping cached lookups and denormalized columns in step
+with the database
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models import OuterRef, Subquery
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from core.authentication import invalidate_token_cache
+from core.models import Product, ProductCategoryLink
+
+
+# User changes that decide whether a cached token still authenticates
+AUTH_FIELDS = {"is_active", "password"}
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    invalidate_token_cache([instance.key])
+
+
+@receiver(post_save, sender=get_user_model())
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Dirty saves pass their update_fields, so most saves skip the query
+    if created or (
+        update_fields is not None and not AUTH_FIELDS & set(update_fields)
+    ):
+        return
+
+    invalidate_token_cache(
+        Token.objects.filter(user=instance).values_list("key", flat=True)
+    )
+
+
+@receiver(m2m_changed, sender=ProductCategoryLink)
+def categories_added(sender, instance, action, reverse, pk_set, **kwargs):
+    # Links added without through_defaults get the owner of their product,
+    # so owner scoped link queries (product/queries.py) still find them
+    if action != "post_add" or not pk_set:
+        return
+
+    links = ProductCategoryLink.objects.filter(created_by=None)
+    if reverse:
+        links = links.filter(productcategory=instance, product__in=pk_set)
+    else:
+        links = links.filter(product=instance, productcategory__in=pk_set)
+    links.update(
+        created_by=Subquery(
+            Product.objects.filter(pk=OuterRef("product_id")).values(
+                "created_by"
+            )[:1]
+        )
+    )
@@ -6,6 +6,16 @@ from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.test import Client
+from django.contrib.admin import helpers
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import (
+    Product,
+    ProductCategory,
+    ProductCategoryLink,
+    ProductStock,
+)
 
 
 class AdminSiteTests(TestCase):
@@ -47,3 +57,151 @@ class AdminSiteTests(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+    def test_products_list(self):
+        # Test the product changelist works with the estimated paginator
+        product = Product.objects.create(
+            created_by=self.user,
+            name="Sample product",
+            price=1000,
+        )
+        url = reverse("admin:core_product_changelist")
+        res = self.client.get(url)
+
+        self.assertContains(res, product.name)
+        self.assertContains(res, "1 product")
+
+    def _create_products(self, count):
+        category = ProductCategory.objects.create(
+            created_by=self.user,
+            name="Floral",
+        )
+        products = []
+        for i in range(count):
+            product = Product.objects.create(
+                created_by=self.user,
+                name=f"Product {i}",
+                price=1000,
+            )
+            product.categories.add(
+                category,
+                through_defaults={"created_by": self.user},
+            )
+            ProductStock.objects.create(
+                created_by=self.user,
+                product=product,
+                quantity=5,
+            )
+            products.append(product)
+
+        return products
+
+    def test_products_list_queries(self):
+        # Test the changelist queries don't grow with the products listed
+        url = reverse("admin:core_product_changelist")
+        self._create_products(2)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+        self._create_products(5)
+        with CaptureQueriesContext(connection) as more:
+            res = self.client.get(url)
+
+        self.assertContains(res, "Floral")
+        self.assertEqual(
+            len(few.captured_queries),
+            len(more.captured_queries),
+        )
+
+    def test_catalog_pages(self):
+        # Test the category and stock pages work
+        product = self._create_products(1)[0]
+        urls = [
+            reverse("admin:core_productcategory_changelist"),
+            reverse("admin:core_productstock_changelist"),
+            reverse("admin:core_product_change", args=[product.id]),
+            reverse("admin:core_product_add"),
+        ]
+        for url in urls:
+            res = self.client.get(url)
+
+            self.assertEqual(res.status_code, 200, url)
+
+    def test_reprice_action(self):
+        # Test repricing updates every selected product in one query
+        products = self._create_products(3)
+        url = reverse("admin:core_product_changelist")
+        payload = {
+            "action": "reprice",
+            "percent": "-12.5",
+            helpers.ACTION_CHECKBOX_NAME: [p.id for p in products[:2]],
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(url, payload)
+
+        self.assertEqual(res.status_code, 302)
+        updates = [
+            q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")
+        ]
+        self.assertEqual(len(updates), 1)
+        prices = Product.objects.order_by("id").values_list("price", flat=True)
+        self.assertEqual(list(prices), [875, 875, 1000])
+
+    def test_restock_action(self):
+        # Test restocking adds to the stock of the selected products
+        products = self._create_products(2)
+        url = reverse("admin:core_product_changelist")
+        payload = {
+            "action": "restock",
+            "quantity": "10",
+            helpers.ACTION_CHECKBOX_NAME: [products[0].id],
+        }
+        self.client.post(url, payload)
+
+        quantities = ProductStock.objects.order_by("id").values_list(
+            "quantity",
+            flat=True,
+        )
+        self.assertEqual(list(quantities), [15, 5])
+
+    def test_restock_action_needs_quantity(self):
+        # Test actions without their input change nothing
+        products = self._create_products(1)
+        url = reverse("admin:core_productstock_changelist")
+        payload = {
+            "action": "restock",
+            helpers.ACTION_CHECKBOX_NAME: [products[0].product_stock.id],
+        }
+        res = self.client.post(url, payload, follow=True)
+
+        self.assertContains(res, "Enter a valid quantity")
+        self.assertEqual(ProductStock.objects.get().quantity, 5)
+
+    def test_add_product_category_link(self):
+        # Test categories added inline get the product's owner
+        product = self._create_products(1)[0]
+        category = ProductCategory.objects.create(
+            created_by=self.user,
+            name="Woody",
+        )
+        link = ProductCategoryLink.objects.get()
+        prefix = "productcategorylink_set"
+        url = reverse("admin:core_product_change", args=[product.id])
+        payload = {
+            "created_by": self.user.id,
+            "name": product.name,
+            "description": "",
+            "price": "1000",
+            "stock": "",
+            f"{prefix}-TOTAL_FORMS": "2",
+            f"{prefix}-INITIAL_FORMS": "1",
+            f"{prefix}-0-id": link.id,
+            f"{prefix}-0-product": product.id,
+            f"{prefix}-0-productcategory": link.productcategory_id,
+            f"{prefix}-1-product": product.id,
+            f"{prefix}-1-productcategory": category.id,
+        }
+        res = self.client.post(url, payload)
+
+        self.assertEqual(res.status_code, 302)
+        link = ProductCategoryLink.objects.get(productcategory=category)
+        self.assertEqual(link.created_by, self.user)
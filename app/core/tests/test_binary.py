@@ -0,0 +1,145 @@
+"""
+Test MessagePack rendering and parsing
+"""
+
+import datetime
+import decimal
+from unittest import skipIf
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import binary
+from core.helper import create_user
+from core.models import Product
+
+
+PRODUCTS_URL = reverse("product:product-list")
+BATCH_URL = reverse("product:product-batch")
+CREATE_USER_URL = reverse("user:create")
+MSGPACK = binary.MEDIA_TYPE
+
+
+@skipIf(binary.msgpack is None, "msgpack is not installed")
+class EncodingTests(SimpleTestCase):
+    def test_round_trip(self):
+        # Test decimals and datetimes decode to equal values
+        moment = datetime.datetime(
+            2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc
+        )
+        data = {"price": decimal.Decimal("15000.50"), "at": moment}
+
+        decoded = binary.unpackb(binary.packb(data))
+
+        self.assertEqual(decoded, data)
+        self.assertIsInstance(decoded["price"], decimal.Decimal)
+
+    def test_naive_datetime_in_current_timezone(self):
+        # Test naive datetimes are taken in the current time zone
+        moment = datetime.datetime(2024, 5, 1, 12, 0)
+
+        decoded = binary.unpackb(binary.packb(moment))
+
+        self.assertEqual(decoded, timezone.make_aware(moment))
+
+    def test_dates_as_strings(self):
+        # Test dates and times are ISO 8601 strings like in JSON
+        data = [datetime.date(2024, 5, 1), datetime.time(12, 30)]
+
+        self.assertEqual(
+            binary.unpackb(binary.packb(data)), ["2024-05-01", "12:30:00"]
+        )
+
+
+@skipIf(binary.msgpack is None, "msgpack is not installed")
+class MessagePackAPITests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user(email="user@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.product = Product.objects.create(
+            created_by=self.user, name="Perfume", price=15000
+        )
+
+    def test_list_as_msgpack(self):
+        # Test prices and datetimes keep their types in MessagePack
+        res = self.client.get(PRODUCTS_URL, HTTP_ACCEPT=MSGPACK)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Content-Type"], MSGPACK)
+        item = binary.unpackb(res.content)[0]
+        self.assertEqual(item["price"], decimal.Decimal("15000"))
+        self.assertIsInstance(item["price"], decimal.Decimal)
+        self.assertEqual(item["created_at"], self.product.created_at)
+
+    def test_json_stays_default(self):
+        # Test clients not asking for MessagePack still get JSON
+        res = self.client.get(PRODUCTS_URL)
+
+        self.assertEqual(res["Content-Type"], "application/json")
+        self.assertEqual(res.json()[0]["price"], "15000")
+
+    def test_create_from_msgpack(self):
+        # Test a MessagePack body with a decimal price creates a product
+        body = binary.packb(
+            {
+                "name": "Binary",
+                "price": decimal.Decimal("2500"),
+                "categories": [{"name": "Men"}],
+            }
+        )
+        res = self.client.post(
+            PRODUCTS_URL,
+            body,
+            content_type=MSGPACK,
+            HTTP_ACCEPT=MSGPACK,
+        )
+
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(binary.unpackb(res.content)["name"], "Binary")
+        product = Product.objects.get(name="Binary")
+        self.assertEqual(product.price, 2500)
+        self.assertEqual(product.categories.get().name, "Men")
+
+    def test_malformed_body(self):
+        # Test an undecodable body is a 400
+        res = self.client.post(
+            PRODUCTS_URL, b"\xc1", content_type=MSGPACK
+        )
+
+        self.assertEqual(res.status_code, 400)
+
+    def test_user_endpoint(self):
+        # Test the user endpoints accept MessagePack too
+        body = binary.packb(
+            {
+                "email": "new@example.com",
+                "password": "testpass123",
+                "name": "New",
+            }
+        )
+        res = APIClient().post(
+            CREATE_USER_URL,
+            body,
+            content_type=MSGPACK,
+            HTTP_ACCEPT=MSGPACK,
+        )
+
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(
+            binary.unpackb(res.content)["email"], "new@example.com"
+        )
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=60)
+    def test_batch_cache_per_format(self):
+        # Test cached MessagePack values are never rendered as JSON
+        params = {"ids": str(self.product.id)}
+        self.client.get(BATCH_URL, params, HTTP_ACCEPT=MSGPACK)
+
+        res = self.client.get(BATCH_URL, params)
+
+        self.assertEqual(res.json()[0]["price"], "15000")
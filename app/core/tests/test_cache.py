@@ -0,0 +1,88 @@
+"""
+Test the single-flight cache population
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from core.cache import get_or_compute
+
+
+class SlowQuery:
+    # Stand-in for a heavy catalog query, counting how often it runs
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            calls = self.calls
+        time.sleep(0.05)
+        return f"result {calls}"
+
+
+class GetOrComputeTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.query = SlowQuery()
+
+    def burst(self, requests=100):
+        # Run get_or_compute from many threads at once
+        start = threading.Barrier(requests)
+
+        def request():
+            start.wait()
+            return get_or_compute("catalog", self.query, 60, beta=0)
+
+        with ThreadPoolExecutor(requests) as pool:
+            futures = [pool.submit(request) for _ in range(requests)]
+        return [future.result() for future in futures]
+
+    def test_cold_burst_computes_once(self):
+        # Test concurrent misses wait for a single computation
+        results = self.burst()
+
+        self.assertEqual(self.query.calls, 1)
+        self.assertEqual(set(results), {"result 1"})
+
+    def test_expired_burst_computes_once(self):
+        # Test one request recomputes an expired value, the others get the
+        # stale one meanwhile
+        self.burst()
+        value, _, delta = cache.get("catalog")
+        cache.set("catalog", (value, time.time() - 1, delta), 60)
+
+        results = self.burst()
+
+        self.assertEqual(self.query.calls, 2)
+        self.assertEqual(set(results), {"result 1", "result 2"})
+        self.assertEqual(get_or_compute("catalog", self.query, 60), "result 2")
+
+    def test_fresh_value_cached(self):
+        # Test fresh values are served without computing
+        get_or_compute("catalog", self.query, 60, beta=0)
+        get_or_compute("catalog", self.query, 60, beta=0)
+
+        self.assertEqual(self.query.calls, 1)
+
+    @patch("core.cache.random.random", return_value=0.999999)
+    def test_early_refresh(self, _):
+        # Test a value close to expiry is refreshed before it expires
+        get_or_compute("catalog", self.query, 60)
+        value, _, delta = cache.get("catalog")
+        cache.set("catalog", (value, time.time() + 0.1, delta), 60)
+
+        self.assertEqual(get_or_compute("catalog", self.query, 60), "result 2")
+
+    @patch("core.cache.LOCK_WAIT", 0.05)
+    def test_stuck_lock(self):
+        # Test a request stops waiting for a lock whose holder died
+        cache.add("catalog:lock", 1, 60)
+
+        self.assertEqual(get_or_compute("catalog", self.query, 60), "result 1")
@@ -2,13 +2,20 @@
 Test custom Django management commands.
 """
 
+import csv
+import os
+import tempfile
+from io import StringIO
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2Error
 
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
 
 
 @patch("core.management.commands.wait_for_db.Command.check")
@@ -33,3 +40,54 @@ class CommandTest(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=["default"])
+
+
+class ProvisionUsersTests(TestCase):
+
+    def provision(self, rows, *args):
+        # Write rows to a temporary CSV and provision users from it
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".csv", newline="", delete=False
+        ) as f:
+            writer = csv.writer(f)
+            writer.writerow(["email", "name", "password"])
+            writer.writerows(rows)
+        self.addCleanup(os.remove, f.name)
+
+        call_command("provision_users", f.name, *args, stdout=StringIO())
+
+    def test_provision_users(self):
+        # test users are inserted in batches and duplicates skipped
+        get_user_model().objects.create_user(email="taken@example.com")
+
+        self.provision(
+            [
+                ["user1@example.com", "User 1", "pass12345"],
+                ["user2@example.com", "User 2", ""],
+                ["taken@example.com", "Taken", "pass12345"],
+            ],
+            "--batch-size",
+            "2",
+        )
+
+        users = get_user_model().objects.order_by("email")
+        self.assertEqual(users.count(), 3)
+        self.assertTrue(users.get(name="User 1").check_password("pass12345"))
+        self.assertFalse(users.get(name="User 2").has_usable_password())
+
+    def test_provision_users_hashed(self):
+        # test pre-hashed passwords are stored as-is
+        encoded = make_password("pass12345")
+
+        self.provision([["user@example.com", "User", encoded]], "--hashed")
+
+        user = get_user_model().objects.get(email="user@example.com")
+        self.assertEqual(user.password, encoded)
+
+    def test_provision_users_rejects_plain_text_as_hashed(self):
+        # test --hashed refuses passwords that are not encoded hashes
+        with self.assertRaises(CommandError):
+            self.provision(
+                [["user@example.com", "User", "pass12345"]],
+                "--hashed",
+            )
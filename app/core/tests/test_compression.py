@@ -0,0 +1,82 @@
+"""
+Test response compression
+"""
+
+import gzip
+import json
+
+import brotli
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from core.compression import negotiate_encoding
+from core.middleware import CompressionMiddleware
+
+
+PAYLOAD = json.dumps([{"name": "Product", "price": 1000}] * 50).encode()
+
+
+class NegotiateEncodingTests(SimpleTestCase):
+    def test_negotiate_encoding(self):
+        # Test brotli is preferred and q=0 refuses an encoding
+        self.assertEqual(negotiate_encoding("gzip, deflate, br"), "br")
+        self.assertEqual(negotiate_encoding("gzip, br;q=0"), "gzip")
+        self.assertEqual(negotiate_encoding("*"), "br")
+        self.assertIsNone(negotiate_encoding("identity"))
+        self.assertIsNone(negotiate_encoding(""))
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def process(self, response, accept_encoding):
+        request = self.factory.get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_compress_json(self):
+        # Test JSON bodies are compressed in the negotiated encoding
+        response = HttpResponse(PAYLOAD, content_type="application/json")
+        response["ETag"] = '"abc"'
+        res = self.process(response, "gzip")
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(res["Vary"], "Accept-Encoding")
+        self.assertEqual(res["ETag"], 'W/"abc"')
+        self.assertEqual(gzip.decompress(res.content), PAYLOAD)
+
+        response = HttpResponse(PAYLOAD, content_type="application/json")
+        res = self.process(response, "gzip, br")
+
+        self.assertEqual(res["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(res.content), PAYLOAD)
+
+    def test_compress_stream(self):
+        # Test streamed bodies are compressed chunk by chunk
+        chunks = [PAYLOAD[i:i + 100] for i in range(0, len(PAYLOAD), 100)]
+        response = StreamingHttpResponse(
+            iter(chunks),
+            content_type="application/json",
+        )
+        res = self.process(response, "gzip")
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertFalse(res.has_header("Content-Length"))
+        self.assertEqual(
+            gzip.decompress(b"".join(res.streaming_content)),
+            PAYLOAD,
+        )
+
+    def test_skip_uncompressible(self):
+        # Test small, binary and already encoded bodies pass through
+        small = HttpResponse(b"{}", content_type="application/json")
+        image = HttpResponse(PAYLOAD, content_type="image/png")
+        encoded = HttpResponse(PAYLOAD, content_type="application/json")
+        encoded["Content-Encoding"] = "br"
+
+        for response in (small, image, encoded):
+            content = response.content
+            res = self.process(response, "gzip")
+
+            self.assertEqual(res.content, content)
+            self.assertNotEqual(res.get("Content-Encoding"), "gzip")
@@ -0,0 +1,58 @@
+"""
+Test the EXPLAIN plan helpers
+"""
+
+from django.test import SimpleTestCase
+
+from core.explain import (
+    estimated_rows,
+    reads_table,
+    scanned_relations,
+    seq_scans,
+    sort_nodes,
+)
+
+
+PLAN = [
+    {
+        "Plan": {
+            "Node Type": "Sort",
+            "Plan Rows": 100,
+            "Plans": [
+                {
+                    "Node Type": "Nested Loop",
+                    "Plans": [
+                        {
+                            "Node Type": "Index Scan",
+                            "Relation Name": "core_product_p3",
+                        },
+                        {
+                            "Node Type": "Seq Scan",
+                            "Relation Name": "core_productstock",
+                        },
+                    ],
+                }
+            ],
+        }
+    }
+]
+
+
+class ExplainTests(SimpleTestCase):
+    def test_scanned_relations(self):
+        self.assertEqual(
+            scanned_relations(PLAN),
+            ["core_product_p3", "core_productstock"],
+        )
+
+    def test_reads_table_matches_partitions(self):
+        self.assertTrue(reads_table(PLAN, "core_product"))
+        self.assertFalse(reads_table(PLAN, "core_productcategory"))
+
+    def test_seq_scans(self):
+        self.assertEqual(seq_scans(PLAN, "core_product"), [])
+        self.assertEqual(len(seq_scans(PLAN, "core_productstock")), 1)
+
+    def test_sort_nodes_and_estimate(self):
+        self.assertEqual(len(sort_nodes(PLAN)), 1)
+        self.assertEqual(estimated_rows(PLAN), 100)
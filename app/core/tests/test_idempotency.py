@@ -0,0 +1,126 @@
+"""
+Test idempotency keys on the product write endpoints
+"""
+
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.helper import create_user
+from core.models import Product, ProductStock
+from product.serializers import ProductDetailSerializer
+
+
+PRODUCTS_URL = reverse("product:product-list")
+PAYLOAD = {"name": "Sample product", "price": 1000}
+
+
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user(email="user@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, key, payload=PAYLOAD, client=None):
+        return (client or self.client).post(
+            PRODUCTS_URL,
+            payload,
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replays_response(self):
+        # Test a retried create runs once and gets the same response
+        first = self.post("key-1")
+        retry = self.post("key-1")
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.content, first.content)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Product.objects.count(), 1)
+
+    @override_settings(REPLICA_DATABASE="default")
+    @patch("core.views.pin_to_primary")
+    @patch("core.views.bump_catalog_versions")
+    def test_replay_skips_write_side_effects(self, bump, pin):
+        # Test a replayed create neither invalidates cached lists nor pins
+        # the user's reads to the primary again
+        self.post("key-1")
+        retry = self.post("key-1")
+
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        bump.assert_called_once_with([self.user.pk])
+        pin.assert_called_once_with(self.user)
+
+    def test_keys_per_user(self):
+        # Test users don't share keys
+        other = APIClient()
+        other.force_authenticate(create_user(email="other@example.com"))
+        self.post("key-1")
+        res = self.post("key-1", client=other)
+
+        self.assertFalse(res.has_header("Idempotent-Replayed"))
+        self.assertEqual(Product.objects.count(), 2)
+
+    def test_key_reused_for_other_request(self):
+        # Test a key sent with another body is rejected
+        self.post("key-1")
+        res = self.post("key-1", {"name": "Other", "price": 5})
+
+        self.assertEqual(res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Product.objects.count(), 1)
+
+    def test_in_flight_conflict(self):
+        # Test a duplicate of a request still running is refused
+        duplicates = []
+        create = ProductDetailSerializer.create
+
+        def create_and_retry(serializer, validated_data):
+            duplicates.append(self.post("key-1"))
+            return create(serializer, validated_data)
+
+        with patch.object(ProductDetailSerializer, "create", create_and_retry):
+            first = self.post("key-1")
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(duplicates[0].status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Product.objects.count(), 1)
+
+    def test_server_error_releases_key(self):
+        # Test a failed request can be retried with its key
+        with patch(
+            "product.serializers.ProductDetailSerializer.create",
+            side_effect=RuntimeError,
+        ), self.assertRaises(RuntimeError):
+            self.post("key-1")
+
+        res = self.post("key-1")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(res.has_header("Idempotent-Replayed"))
+
+    def test_stock_update(self):
+        # Test retried stock updates are replayed
+        product = Product.objects.create(created_by=self.user, **PAYLOAD)
+        stock = ProductStock.objects.create(
+            created_by=self.user,
+            product=product,
+            quantity=5,
+        )
+        url = reverse("product:productstock-detail", args=[stock.id])
+        for _ in range(2):
+            res = self.client.patch(
+                url,
+                {"quantity": 7},
+                format="json",
+                HTTP_IDEMPOTENCY_KEY="stock-1",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Idempotent-Replayed"], "true")
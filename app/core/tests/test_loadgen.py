@@ -0,0 +1,107 @@
+"""
+Test the traffic replay client
+"""
+
+import asyncio
+import json
+import tempfile
+
+from django.test import SimpleTestCase
+
+from core.loadgen import endpoint_label, load_traffic, replay
+
+
+async def serve(handler):
+    # Start a local HTTP server answering every request with handler
+    async def on_connection(reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode().split("\r\n")
+                headers = dict(
+                    line.lower().split(": ", 1) for line in lines[1:] if line
+                )
+                body = await reader.readexactly(
+                    int(headers["content-length"])
+                )
+                writer.write(handler(lines[0], headers, body))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.CancelledError):
+            writer.close()
+
+    return await asyncio.start_server(on_connection, "127.0.0.1", 0)
+
+
+class LoadgenTests(SimpleTestCase):
+    def test_load_traffic(self):
+        # Test recorded requests are read and validated
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl") as f:
+            f.write('{"path": "/api/user/me/", "user": "a@example.com"}\n')
+            f.write("\n")
+            f.write('{"method": "post", "path": "/api/user/create/"}\n')
+            f.flush()
+
+            entries = load_traffic(f.name)
+
+        self.assertEqual(
+            [entry["method"] for entry in entries],
+            ["GET", "POST"],
+        )
+
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl") as f:
+            f.write('{"method": "GET"}\n')
+            f.flush()
+
+            with self.assertRaises(ValueError):
+                load_traffic(f.name)
+
+    def test_endpoint_label(self):
+        # Test ids and query strings are grouped
+        self.assertEqual(
+            endpoint_label("GET", "/api/product/products/12/?x=1"),
+            "GET /api/product/products/{id}/",
+        )
+
+    def test_replay(self):
+        # Test requests reach the server with auth and bodies over
+        # keep-alive connections, and statuses are reported
+        seen = []
+
+        def handler(request_line, headers, body):
+            seen.append((request_line, headers.get("authorization"), body))
+            if request_line.startswith("POST"):
+                return (
+                    b"HTTP/1.1 201 Created\r\nTransfer-Encoding: chunked"
+                    b"\r\n\r\n2\r\n{}\r\n0\r\n\r\n"
+                )
+            return b"HTTP/1.1 404 Not Found\r\nContent-Length: 2\r\n\r\n{}"
+
+        async def run():
+            server = await serve(handler)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                return await replay(
+                    "127.0.0.1",
+                    port,
+                    [
+                        {"method": "GET", "path": "/a/", "user": "u"},
+                        {"method": "POST", "path": "/b/", "body": {"x": 1}},
+                    ],
+                    tokens={"u": "key"},
+                    rate=200,
+                    concurrency=2,
+                    total=6,
+                )
+
+        results, elapsed = asyncio.run(run())
+
+        self.assertEqual(
+            sorted(status for _, status, _ in results),
+            [201, 201, 201, 404, 404, 404],
+        )
+        self.assertIn(("GET /a/ HTTP/1.1", "token key", b""), seen)
+        self.assertIn(
+            ("POST /b/ HTTP/1.1", None, json.dumps({"x": 1}).encode()),
+            seen,
+        )
+        self.assertGreaterEqual(elapsed, 5 / 200)
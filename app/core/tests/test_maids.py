@@ -0,0 +1,46 @@
+"""
+Test the database seeders
+"""
+
+from django.db.models import F
+from django.test import TestCase
+
+from core.maids import seed_catalog
+from core.models import (
+    Product,
+    ProductCategory,
+    ProductCategoryLink,
+    ProductStock,
+    User,
+)
+
+
+class SeedCatalogTests(TestCase):
+    def test_seed_catalog(self):
+        # Test products are spread over users with stock and a category
+        seed_catalog(250, products_per_user=100, batch_size=150)
+
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(Product.objects.count(), 250)
+        self.assertEqual(ProductCategory.objects.count(), 30)
+        self.assertEqual(ProductStock.objects.count(), 250)
+        self.assertEqual(ProductCategoryLink.objects.count(), 250)
+        self.assertFalse(
+            ProductCategoryLink.objects.exclude(
+                productcategory__created_by=F("product__created_by")
+            ).exists()
+        )
+
+    def test_seed_catalog_reproducible(self):
+        # Test the same seed produces the same catalog
+        seed_catalog(20, products_per_user=10)
+        prices = list(Product.objects.order_by("id").values_list("price"))
+        Product.objects.all().delete()
+        User.objects.all().delete()
+
+        seed_catalog(20, products_per_user=10)
+
+        self.assertEqual(
+            list(Product.objects.order_by("id").values_list("price")),
+            prices,
+        )
@@ -0,0 +1,109 @@
+"""
+Test the query budget middleware
+"""
+
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from rest_framework.test import APIClient
+
+from core.helper import create_user
+from core.middleware import QueryBudgetExceeded
+from core.models import Product
+from product.views import ProductViewSet
+
+
+PRODUCTS_URL = reverse("product:product-list")
+ASYNC_PRODUCTS_URL = reverse("product:async-product-list")
+
+
+def observed_requests(view, action):
+    # Return how many requests the query histogram has seen for a view
+    return (
+        REGISTRY.get_sample_value(
+            "django_http_request_queries_count",
+            {"view": view, "action": action},
+        )
+        or 0
+    )
+
+
+@override_settings(QUERY_BUDGET_SAMPLE_RATE=1.0, QUERY_BUDGET_ACTION="raise")
+class QueryBudgetMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for i in range(3):
+            Product.objects.create(
+                created_by=self.user,
+                name=f"Product {i}",
+                price=1000,
+            )
+
+    def test_list_within_budget_is_observed(self):
+        # Test sampled requests are exported per view and action
+        before = observed_requests("product:product-list", "list")
+
+        res = self.client.get(PRODUCTS_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            observed_requests("product:product-list", "list"),
+            before + 1,
+        )
+
+    def test_over_budget_raises(self):
+        # Test an endpoint over its declared budget raises
+        with patch.object(ProductViewSet, "query_budget", {"list": 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(PRODUCTS_URL)
+
+    @override_settings(QUERY_BUDGET_ACTION="log")
+    def test_over_budget_logs(self):
+        # Test the log action only warns
+        with patch.object(ProductViewSet, "query_budget", {"list": 1}):
+            with self.assertLogs("core.middleware", "WARNING"):
+                res = self.client.get(PRODUCTS_URL)
+
+        self.assertEqual(res.status_code, 200)
+
+    @override_settings(QUERY_BUDGET_SAMPLE_RATE=0)
+    def test_unsampled_requests_not_counted(self):
+        # Test requests are not counted when sampling is off
+        before = observed_requests("product:product-list", "list")
+
+        with patch.object(ProductViewSet, "query_budget", {"list": 0}):
+            res = self.client.get(PRODUCTS_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            observed_requests("product:product-list", "list"),
+            before,
+        )
+
+    async def test_async_view_queries_counted(self):
+        # Test queries of async views are counted too
+        before = observed_requests("product:async-product-list", "get")
+        before_sum = REGISTRY.get_sample_value(
+            "django_http_request_queries_sum",
+            {"view": "product:async-product-list", "action": "get"},
+        )
+
+        await self.async_client.get(
+            ASYNC_PRODUCTS_URL,
+            authorization="Token invalid",
+        )
+
+        self.assertEqual(
+            observed_requests("product:async-product-list", "get"),
+            before + 1,
+        )
+        after_sum = REGISTRY.get_sample_value(
+            "django_http_request_queries_sum",
+            {"view": "product:async-product-list", "action": "get"},
+        )
+        self.assertEqual(after_sum - (before_sum or 0), 1)
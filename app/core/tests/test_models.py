@@ -3,7 +3,9 @@ Test for models
 """
 
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
+from django.db import connection
 
 from core import models
 from core.helper import create_user, get_time_in_utc
@@ -83,10 +85,11 @@ class ModelTests(TestCase):
 
     def test_create_superuser(self):
         # Test creating superuser
-        user = get_user_model().objects.create_superuser(
-            "test@example.com",
-            "test123",
-        )
+        with self.assertNumQueries(1):
+            user = get_user_model().objects.create_superuser(
+                "test@example.com",
+                "test123",
+            )
 
         self.assertTrue(user.is_superuser)
         self.assertTrue(user.is_staff)
@@ -104,6 +107,16 @@ class ModelTests(TestCase):
 
         self.assertEqual(str(product), product.name)
 
+    def test_category_link_gets_product_owner(self):
+        # Test links added without through_defaults carry the product owner
+        product = create_product()
+        product_category = create_product_category()
+
+        product.categories.add(product_category)
+
+        link = models.ProductCategoryLink.objects.get(product=product)
+        self.assertEqual(link.created_by_id, product.created_by_id)
+
     def test_create_stock(self):
         # Test creating a product category is successful
         user = create_user()
@@ -117,3 +130,61 @@ class ModelTests(TestCase):
 
         self.assertEqual(str(product_stock), product.name)
         self.assertEqual(product_stock.quantity, 10)
+
+    def test_save_updates_changed_columns_only(self):
+        # Test saving a loaded product writes only the changed column
+        product = models.Product.objects.get(pk=create_product().pk)
+        product.name = "Renamed"
+
+        with CaptureQueriesContext(connection) as queries:
+            product.save()
+
+        self.assertEqual(len(queries.captured_queries), 1)
+        sql = queries.captured_queries[0]["sql"]
+        self.assertIn('"name"', sql)
+        self.assertNotIn('"description"', sql)
+        product.refresh_from_db()
+        self.assertEqual(product.name, "Renamed")
+
+    def test_save_unchanged_skips_query(self):
+        # Test saving an unchanged instance makes no query
+        product = create_product()
+        product.price = 15000
+
+        with self.assertNumQueries(0):
+            product.save()
+
+    def test_save_update_fields_keeps_others_dirty(self):
+        # Test columns left out of update_fields are still saved later
+        user = get_user_model().objects.get(pk=create_user().pk)
+        user.name = "Changed"
+        user.is_staff = True
+
+        user.save(update_fields=["is_staff"])
+        user.save()
+
+        user.refresh_from_db()
+        self.assertEqual(user.name, "Changed")
+        self.assertTrue(user.is_staff)
+
+    def test_save_copy_with_cleared_pk(self):
+        # Test clearing the pk of a loaded instance inserts a copy
+        product = models.Product.objects.get(pk=create_product().pk)
+        original_pk = product.pk
+        product.pk = None
+
+        product.save()
+
+        self.assertIsNotNone(product.pk)
+        self.assertNotEqual(product.pk, original_pk)
+        self.assertEqual(models.Product.objects.count(), 2)
+
+    def test_save_with_new_pk(self):
+        # Test assigning a new pk to a loaded instance inserts that row
+        product = models.Product.objects.get(pk=create_product().pk)
+        new_pk = product.pk + 100
+        product.pk = new_pk
+
+        product.save()
+
+        self.assertTrue(models.Product.objects.filter(pk=new_pk).exists())
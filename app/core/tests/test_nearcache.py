@@ -0,0 +1,144 @@
+"""
+Test the two-tier near cache
+"""
+
+import threading
+import time
+import uuid
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from prometheus_client import REGISTRY
+
+from core.nearcache import NearCache
+
+
+class NearCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.name = f"near-{uuid.uuid4().hex}"
+
+    def worker(self, pid, **options):
+        # A near cache as seen by the worker process pid
+        options.setdefault("BROKER", "core.nearcache.LocalBroker")
+        with patch("core.nearcache.os.getpid", return_value=pid):
+            return NearCache(self.name, {"OPTIONS": options})
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, {"cache": self.name, **labels})
+
+    def test_local_hits(self):
+        # Test repeated reads are served from process memory
+        near = self.worker(1)
+        near.set("categories", ["Floral", "Woody"])
+
+        with patch.object(
+            near.remote,
+            "get_many",
+            wraps=near.remote.get_many,
+        ) as get_many:
+            for _ in range(3):
+                self.assertEqual(near.get("categories"), ["Floral", "Woody"])
+
+        get_many.assert_called_once()
+        self.assertEqual(
+            self.sample(
+                "django_cache_near_requests_total",
+                tier="local",
+                result="hit",
+            ),
+            2,
+        )
+
+    def test_invalidated_across_workers(self):
+        # Test a write in one worker drops the copies of the others
+        first, second = self.worker(1), self.worker(2)
+        first.set("user", "old")
+        self.assertEqual(second.get("user"), "old")
+
+        first.set("user", "new")
+        self.assertEqual(second.get("user"), "new")
+
+        first.delete("user")
+        self.assertIsNone(second.get("user"))
+
+    def test_async_set_publishes_off_the_loop(self):
+        # Test aset doesn't block the event loop on the broker
+        near = self.worker(1)
+        threads = {}
+
+        def publish(channel, message):
+            threads["publish"] = threading.current_thread()
+
+        async def set_value():
+            threads["loop"] = threading.current_thread()
+            await near.aset("user", "new")
+
+        with patch.object(near.broker, "publish", publish):
+            async_to_sync(set_value)()
+
+        self.assertIsNot(threads["publish"], threads["loop"])
+        self.assertEqual(near.get("user"), "new")
+
+    def test_bounded_lru(self):
+        # Test the least recently used entries are evicted past the limits
+        near = self.worker(1, MAX_ENTRIES=2, MAX_BYTES=10_000)
+        near.set_many({"a": 1, "b": 2, "c": 3})
+        near.get("a")
+        near.get("b")
+        near.get("a")
+        near.get("c")
+
+        self.assertEqual(list(near.store.entries), [":1:a", ":1:c"])
+        self.assertEqual(
+            self.sample("django_cache_near_entries", tier="local"),
+            2,
+        )
+        self.assertEqual(
+            self.sample("django_cache_near_bytes", tier="local"),
+            near.store.bytes,
+        )
+
+    def test_memory_cap(self):
+        # Test values larger than the memory cap stay remote only
+        near = self.worker(1, MAX_BYTES=100)
+        near.set("big", "x" * 200)
+
+        self.assertEqual(near.get("big"), "x" * 200)
+        self.assertEqual(near.store.bytes, 0)
+
+    def test_no_stale_copy_after_invalidation(self):
+        # Test a value read before a concurrent write is not kept locally
+        first, second = self.worker(1), self.worker(2)
+        first.set("user", "old")
+        remote_get_many = second.remote.get_many
+
+        def get_then_write(*args, **kwargs):
+            found = remote_get_many(*args, **kwargs)
+            first.set("user", "new")
+            return found
+
+        with patch.object(
+            second.remote,
+            "get_many",
+            side_effect=get_then_write,
+        ):
+            self.assertEqual(second.get("user"), "old")
+
+        self.assertEqual(second.get("user"), "new")
+
+    def test_local_copy_capped_at_write_timeout(self):
+        # Test values written with a timeout shorter than LOCAL_TIMEOUT
+        # are not served locally after they expire remotely
+        first, second = self.worker(1), self.worker(2, LOCAL_TIMEOUT=60)
+        first.set("user", "short", 1)
+        first.set("version", "long", None)
+        self.assertEqual(second.get("user"), "short")
+        self.assertEqual(second.get("version"), "long")
+
+        later = time.monotonic() + 2
+        with patch("core.nearcache.time.monotonic", return_value=later):
+            self.assertIsNone(second.store.get(":1:user"))
+            self.assertIsNotNone(second.store.get(":1:version"))
@@ -0,0 +1,100 @@
+"""
+Test the estimated count pagination
+"""
+
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.maids import seed_catalog
+from core.models import Product, User
+from core.pagination import EstimatedCountPaginator, estimated_count
+
+
+@override_settings(
+    COUNT_ESTIMATE_THRESHOLD=10,
+    COUNT_REFRESH_IN_BACKGROUND=False,
+)
+class EstimatedCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seed_catalog(25, products_per_user=25)
+
+    def test_exact_without_estimate(self):
+        # Test databases without planner estimates count exactly
+        self.assertEqual(estimated_count(Product.objects.all()), (25, True))
+
+    @patch("core.pagination.planner_estimate", return_value=5)
+    def test_estimate_below_threshold(self, _):
+        # Test estimates short of the bounded count report the threshold
+        # while the exact count is cached
+        queryset = Product.objects.all()
+
+        self.assertEqual(estimated_count(queryset), (10, False))
+        with self.assertNumQueries(0):
+            self.assertEqual(estimated_count(queryset), (25, False))
+
+    @patch("core.pagination.planner_estimate")
+    def test_small_count_skips_planner(self, planner_estimate):
+        # Test counts below the threshold take a single query
+        ids = Product.objects.order_by("id").values_list("id", flat=True)
+        queryset = Product.objects.filter(id__in=list(ids[:5]))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(estimated_count(queryset), (5, True))
+        planner_estimate.assert_not_called()
+
+    @patch("core.pagination.planner_estimate", return_value=20)
+    def test_estimate_then_cached_count(self, _):
+        # Test large estimates are returned while the exact count is cached
+        queryset = Product.objects.order_by("-id")
+
+        self.assertEqual(estimated_count(queryset), (20, False))
+        with self.assertNumQueries(0):
+            self.assertEqual(estimated_count(queryset), (25, False))
+
+    @patch("core.pagination.planner_estimate", return_value=20)
+    def test_pages_past_estimate(self, _):
+        # Test pages beyond an underestimated count are still served
+        paginator = EstimatedCountPaginator(Product.objects.order_by("id"), 10)
+
+        self.assertEqual(paginator.count, 20)
+        self.assertFalse(paginator.count_is_exact)
+        self.assertEqual(len(paginator.page(3)), 5)
+
+
+class PaginatedListApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("user@example.com", "pass1234")
+        for i in range(3):
+            Product.objects.create(
+                created_by=self.user,
+                name=f"Product {i}",
+                price=1000,
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_list_unpaginated_by_default(self):
+        # Test lists stay plain without page_size
+        res = self.client.get(reverse("product:product-list"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 3)
+
+    def test_list_paginated(self):
+        # Test page_size pages the list with its count
+        res = self.client.get(
+            reverse("product:product-list"),
+            {"page_size": 2, "page": 2},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 3)
+        self.assertTrue(res.data["count_is_exact"])
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertIsNone(res.data["next"])
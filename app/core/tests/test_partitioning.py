@@ -0,0 +1,138 @@
+"""
+Test catalog table partitioning
+"""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from core.helper import create_user
+from core.models import Product, ProductCategory, ProductStock
+from core.partitioning import (
+    partition_sql,
+    partitioned_tables,
+    scanned_partitions,
+)
+
+
+def quote_name(name):
+    return f'"{name}"'
+
+
+class PartitionSqlTests(SimpleTestCase):
+    def setUp(self):
+        self.specs = {spec["table"]: spec for spec in partitioned_tables()}
+
+    def test_catalog_tables_partitioned(self):
+        # Test products, stocks and category links are partitioned
+        self.assertEqual(
+            sorted(self.specs),
+            [
+                "core_product",
+                "core_product_categories",
+                "core_productstock",
+            ],
+        )
+
+    def test_hash_partitions_created(self):
+        # Test one partition is created per remainder
+        sql = partition_sql(self.specs["core_product"], 4, quote_name)
+
+        self.assertIn(
+            'CREATE TABLE "core_product" (LIKE "core_product_unpartitioned" '
+            'INCLUDING STORAGE) PARTITION BY HASH ("created_by_id")',
+            sql,
+        )
+        for remainder in range(4):
+            self.assertIn(
+                f'CREATE TABLE "core_product_p{remainder}" PARTITION OF '
+                f'"core_product" FOR VALUES WITH (MODULUS 4, '
+                f"REMAINDER {remainder})",
+                sql,
+            )
+
+    def test_primary_key_includes_partition_key(self):
+        # Test the primary key is extended with created_by_id
+        sql = partition_sql(self.specs["core_productstock"], 2, quote_name)
+
+        self.assertIn(
+            'ALTER TABLE "core_productstock" ADD PRIMARY KEY '
+            '("id", "created_by_id")',
+            sql,
+        )
+        self.assertEqual(
+            sql[-1],
+            'DROP TABLE "core_productstock_unpartitioned" CASCADE',
+        )
+
+    def test_scanned_partitions(self):
+        # Test partitions are read from an EXPLAIN plan
+        plan = [
+            {
+                "Plan": {
+                    "Node Type": "Append",
+                    "Plans": [
+                        {
+                            "Node Type": "Seq Scan",
+                            "Relation Name": "core_product_p3",
+                        },
+                        {
+                            "Node Type": "Index Scan",
+                            "Relation Name": "core_productcategory",
+                        },
+                    ],
+                }
+            }
+        ]
+
+        self.assertEqual(
+            scanned_partitions(plan, "core_product"),
+            ["core_product_p3"],
+        )
+
+
+class PartitionCommandTests(TestCase):
+    def test_requires_postgresql(self):
+        # Test the command refuses to run on other databases
+        if connection.vendor == "postgresql":
+            self.skipTest("Runs against PostgreSQL")
+
+        with self.assertRaises(CommandError):
+            call_command("partition_catalog")
+
+    def test_per_user_query_pruned(self):
+        # Test a per-user product query reads a single partition
+        if connection.vendor != "postgresql":
+            self.skipTest("Partitioning requires PostgreSQL")
+
+        user = create_user(email="seller@example.com")
+        category = ProductCategory.objects.create(created_by=user, name="Men")
+        product = Product.objects.create(
+            created_by=user,
+            name="Product",
+            price=15000,
+        )
+        product.categories.add(
+            category,
+            through_defaults={"created_by": user},
+        )
+        ProductStock.objects.create(
+            created_by=user,
+            product=product,
+            quantity=3,
+        )
+        out = StringIO()
+
+        call_command("partition_catalog", partitions=4, stdout=out)
+
+        self.assertEqual(Product.objects.filter(created_by=user).count(), 1)
+        # The list query and the category link prefetch
+        for table in (
+            "core_product",
+            "core_productstock",
+            "core_product_categories",
+        ):
+            self.assertIn(f"query on {table} is pruned", out.getvalue())
@@ -0,0 +1,68 @@
+"""
+Test the per-phase timing of API views
+"""
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.helper import create_user
+from core.models import Product
+
+
+PRODUCTS_URL = reverse("product:product-list")
+
+
+def observed_phase(phase):
+    # Return how many product list requests timed a phase
+    return (
+        REGISTRY.get_sample_value(
+            "django_http_request_phase_seconds_count",
+            {"view": "product:product-list", "action": "list", "phase": phase},
+        )
+        or 0
+    )
+
+
+class PhaseTimingTests(TestCase):
+    def setUp(self):
+        user = create_user()
+        Product.objects.create(created_by=user, name="Product", price=1000)
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user)}"
+        )
+
+    def test_phases_exported(self):
+        # Test every phase of a list request is observed
+        phases = ("auth", "queryset", "serialize", "render")
+        before = {phase: observed_phase(phase) for phase in phases}
+
+        res = self.client.get(PRODUCTS_URL)
+
+        self.assertEqual(res.status_code, 200)
+        for phase in phases:
+            self.assertEqual(observed_phase(phase), before[phase] + 1)
+
+    @override_settings(SERVER_TIMING_HEADER=True)
+    def test_server_timing_header(self):
+        # Test the phases are returned in a Server-Timing header
+        res = self.client.get(PRODUCTS_URL)
+
+        entries = [
+            entry.split(";")[0] for entry in res["Server-Timing"].split(", ")
+        ]
+        self.assertEqual(
+            entries,
+            ["auth", "queryset", "serialize", "render"],
+        )
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_server_timing_header_disabled(self):
+        # Test the header is only sent when enabled
+        res = self.client.get(PRODUCTS_URL)
+
+        self.assertNotIn("Server-Timing", res)
@@ -0,0 +1,143 @@
+"""
+Test the database connection pool
+"""
+
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from prometheus_client import REGISTRY
+
+from core.db.pool import ConnectionPool, PoolTimeout, get_pool
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def sample(name, alias):
+    # Read a pool metric value for an alias
+    value = REGISTRY.get_sample_value(name, {"alias": alias})
+    return value or 0
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def test_connection_reused(self):
+        # Test a released connection is handed out again
+        pool = ConnectionPool("reuse", max_size=2)
+        connection = pool.checkout(FakeConnection)
+        pool.release(connection)
+
+        self.assertIs(pool.checkout(FakeConnection), connection)
+        self.assertEqual(pool.size, 1)
+
+    def test_checkout_times_out_when_exhausted(self):
+        # Test checkout gives up once every connection is in use
+        pool = ConnectionPool("exhausted", max_size=1, timeout=0.01)
+        pool.checkout(FakeConnection)
+        before = sample(
+            "django_db_pool_checkout_timeouts_total",
+            "exhausted",
+        )
+
+        with self.assertRaises(PoolTimeout):
+            pool.checkout(FakeConnection)
+
+        self.assertEqual(
+            sample("django_db_pool_checkout_timeouts_total", "exhausted"),
+            before + 1,
+        )
+
+    def test_unusable_connection_discarded(self):
+        # Test a broken connection is closed and frees its slot
+        pool = ConnectionPool("broken", max_size=1)
+        connection = pool.checkout(FakeConnection)
+        pool.release(connection, reusable=False)
+
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.size, 0)
+        self.assertIsNot(pool.checkout(FakeConnection), connection)
+
+    def test_idle_connections_reaped(self):
+        # Test connections idle past the timeout are closed
+        pool = ConnectionPool("idle", max_size=2, idle_timeout=30)
+        with patch("core.db.pool.time.monotonic", return_value=100):
+            connection = pool.checkout(FakeConnection)
+            pool.release(connection)
+
+        with patch("core.db.pool.time.monotonic", return_value=200):
+            fresh = pool.checkout(FakeConnection)
+
+        self.assertTrue(connection.closed)
+        self.assertIsNot(fresh, connection)
+        self.assertEqual(pool.size, 1)
+
+    def test_dead_idle_connection_replaced(self):
+        # Test a connection idle past check_after is checked and replaced
+        # when the check fails
+        pool = ConnectionPool("dead", max_size=1, check_after=5)
+        with patch("core.db.pool.time.monotonic", return_value=100):
+            connection = pool.checkout(FakeConnection)
+            pool.release(connection)
+
+        with patch("core.db.pool.time.monotonic", return_value=110):
+            fresh = pool.checkout(FakeConnection, check=lambda c: False)
+
+        self.assertTrue(connection.closed)
+        self.assertIsNot(fresh, connection)
+        self.assertEqual(pool.size, 1)
+
+    def test_recent_idle_connection_not_checked(self):
+        # Test connections idle for a short time skip the check
+        pool = ConnectionPool("recent", max_size=1, check_after=5)
+        connection = pool.checkout(FakeConnection)
+        pool.release(connection)
+
+        def check(connection):
+            raise AssertionError("checked")
+
+        self.assertIs(pool.checkout(FakeConnection, check=check), connection)
+
+    def test_failed_connect_frees_slot(self):
+        # Test a failing connect does not leak pool capacity
+        pool = ConnectionPool("failing", max_size=1)
+
+        def connect():
+            raise OSError("connection refused")
+
+        with self.assertRaises(OSError):
+            pool.checkout(connect)
+
+        self.assertEqual(pool.size, 0)
+
+    def test_metrics_exported(self):
+        # Test checkouts and pool size are exported
+        pool = ConnectionPool("metrics", max_size=3)
+        before = sample("django_db_pool_checkouts_total", "metrics")
+        pool.checkout(FakeConnection)
+
+        self.assertEqual(
+            sample("django_db_pool_checkouts_total", "metrics"),
+            before + 1,
+        )
+        self.assertEqual(sample("django_db_pool_max_size", "metrics"), 3)
+        self.assertEqual(
+            REGISTRY.get_sample_value(
+                "django_db_pool_connections",
+                {"alias": "metrics", "state": "in_use"},
+            ),
+            1,
+        )
+
+    def test_pool_recreated_after_fork(self):
+        # Test a pool inherited from another process is not reused
+        pool = get_pool("forked", {"MAX_SIZE": 4})
+        self.assertIs(get_pool("forked", {}), pool)
+
+        with patch("core.db.pool.os.getpid", return_value=pool.pid + 1):
+            child_pool = get_pool("forked", {})
+
+        self.assertIsNot(child_pool, pool)
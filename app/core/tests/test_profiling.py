@@ -0,0 +1,128 @@
+"""
+Test the sampling profiler middleware and profile summaries
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.helper import create_user
+from core.profiling import StackSampler, phase_of, summarize
+from product.views import ProductViewSet
+
+
+PRODUCTS_URL = reverse("product:product-list")
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        time.sleep(0.001)
+
+
+class StackSamplerTests(SimpleTestCase):
+    def test_sampler_folds_stacks_below_root(self):
+        # Test stacks are counted from the root frame down
+        sampler = StackSampler(
+            threading.get_ident(),
+            sys._getframe(),
+            0.001,
+        )
+        sampler.start()
+        busy_wait(0.05)
+        sampler.stop()
+
+        self.assertTrue(sampler.stacks)
+        stack = sampler.stacks.most_common(1)[0][0]
+        self.assertTrue(stack.startswith("view;"))
+        self.assertIn("busy_wait", stack)
+        self.assertNotIn("test_sampler_folds_stacks_below_root", stack)
+
+    def test_phase_of(self):
+        # Test stacks are classified by DRF render and serializer frames
+        self.assertEqual(
+            phase_of(["a.dispatch", "rest_framework.renderers.render"]),
+            "render",
+        )
+        self.assertEqual(
+            phase_of(["a.list", "rest_framework.fields.to_representation"]),
+            "serialize",
+        )
+        self.assertEqual(phase_of(["a.list"]), "view")
+
+    def test_summarize(self):
+        # Test self and total samples per function
+        phases, own, total = summarize(
+            {"view;a;b": 3, "render;a;c": 1, "view;a": 2}
+        )
+
+        self.assertEqual(phases, {"view": 5, "render": 1})
+        self.assertEqual(own, {"b": 3, "c": 1, "a": 2})
+        self.assertEqual(total["a"], 6)
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        user = create_user()
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user)}"
+        )
+
+    def get_slow_list(self, **headers):
+        # Request the product list, made slow enough to be sampled
+        original = ProductViewSet.list
+
+        def slow_list(view, request, *args, **kwargs):
+            busy_wait(0.05)
+            return original(view, request, *args, **kwargs)
+
+        with patch.object(ProductViewSet, "list", slow_list):
+            return self.client.get(PRODUCTS_URL, **headers)
+
+    def test_profile_written_for_token_header(self):
+        # Test a matching X-Profile header writes a profile to summarize
+        with override_settings(
+            PROFILING_TOKEN="secret",
+            PROFILING_DIR=self.dir.name,
+            PROFILING_INTERVAL=0.001,
+        ):
+            res = self.get_slow_list(HTTP_X_PROFILE="secret")
+
+        self.assertIn(res["X-Profile-Id"], os.listdir(self.dir.name))
+        self.assertIn("product_product-list", res["X-Profile-Id"])
+
+        out = StringIO()
+        call_command(
+            "profile_summary",
+            "--dir",
+            self.dir.name,
+            "--view",
+            "product:product-list",
+            stdout=out,
+        )
+        self.assertIn("slow_list", out.getvalue())
+
+    def test_wrong_token_not_profiled(self):
+        # Test requests without the right token are not profiled
+        with override_settings(
+            PROFILING_TOKEN="secret",
+            PROFILING_DIR=self.dir.name,
+        ):
+            res = self.get_slow_list(HTTP_X_PROFILE="guess")
+
+        self.assertNotIn("X-Profile-Id", res)
+        self.assertEqual(os.listdir(self.dir.name), [])
@@ -0,0 +1,55 @@
+"""
+Test token bucket rate limiting
+"""
+
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from core.ratelimit import LocalTokenBucket, parse_rate
+
+
+class ParseRateTests(SimpleTestCase):
+    def test_parse_rate(self):
+        # Test rates are turned into capacity and refill per second
+        self.assertEqual(parse_rate("10/min"), (10, 10 / 60))
+        self.assertEqual(parse_rate("5/s"), (5, 5))
+        self.assertEqual(parse_rate("24/day"), (24, 24 / 86400))
+
+
+@patch("core.ratelimit.time.monotonic")
+class LocalTokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        self.bucket = LocalTokenBucket()
+
+    def test_burst_up_to_capacity(self, monotonic):
+        # Test a full bucket allows a burst of capacity requests
+        monotonic.return_value = 100
+        results = [self.bucket.consume("key", 3, 1)[0] for _ in range(4)]
+
+        self.assertEqual(results, [True, True, True, False])
+
+    def test_wait_until_refilled(self, monotonic):
+        # Test an empty bucket reports how long until the next token
+        monotonic.return_value = 100
+        self.bucket.consume("key", 1, 0.5)
+
+        allowed, wait = self.bucket.consume("key", 1, 0.5)
+
+        self.assertFalse(allowed)
+        self.assertEqual(wait, 2)
+
+    def test_refills_over_time(self, monotonic):
+        # Test tokens come back at the refill rate
+        monotonic.return_value = 100
+        self.bucket.consume("key", 1, 0.5)
+
+        monotonic.return_value = 102
+        self.assertTrue(self.bucket.consume("key", 1, 0.5)[0])
+
+    def test_keys_independent(self, monotonic):
+        # Test buckets are kept per key
+        monotonic.return_value = 100
+        self.bucket.consume("first", 1, 1)
+
+        self.assertTrue(self.bucket.consume("second", 1, 1)[0])
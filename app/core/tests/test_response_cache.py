@@ -0,0 +1,178 @@
+"""
+Test the cached catalog list responses
+"""
+
+import gzip
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.cache import catalog_version
+from core.helper import create_user
+from core.models import Product
+
+
+PRODUCTS_URL = reverse("product:product-list")
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=60)
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user(email="user@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for i in range(10):
+            Product.objects.create(
+                created_by=self.user,
+                name=f"Product {i}",
+                price=1000,
+            )
+
+    def test_list_served_from_cache(self):
+        # Test a repeated list runs no queries and returns the same body
+        res = self.client.get(PRODUCTS_URL)
+        with self.assertNumQueries(0):
+            cached = self.client.get(PRODUCTS_URL)
+
+        self.assertEqual(cached.status_code, 200)
+        self.assertEqual(cached.content, res.content)
+        self.assertEqual(cached["Content-Type"], res["Content-Type"])
+
+    def test_cached_compressed(self):
+        # Test hits are served in the stored compressed encoding
+        res = self.client.get(PRODUCTS_URL)
+        cached = self.client.get(PRODUCTS_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(cached["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(cached.content), res.content)
+
+    def test_cache_per_user(self):
+        # Test users never see each other's cached lists
+        self.client.get(PRODUCTS_URL)
+        other = APIClient()
+        other.force_authenticate(create_user(email="other@example.com"))
+
+        res = other.get(PRODUCTS_URL)
+
+        self.assertEqual(res.json(), [])
+
+    def test_write_invalidates(self):
+        # Test a write through the API replaces the cached lists
+        self.client.get(PRODUCTS_URL)
+        self.client.post(
+            PRODUCTS_URL,
+            {"name": "New product", "price": 500},
+            format="json",
+        )
+
+        res = self.client.get(PRODUCTS_URL)
+
+        self.assertEqual(len(res.json()), 11)
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=0)
+    def test_cache_disabled(self):
+        # Test nothing is cached without a timeout
+        self.client.get(PRODUCTS_URL)
+        Product.objects.create(created_by=self.user, name="New", price=1)
+
+        res = self.client.get(PRODUCTS_URL)
+
+        self.assertEqual(len(res.json()), 11)
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=0)
+    def test_cache_disabled_skips_invalidation(self):
+        # Test writes don't bump catalog versions nobody caches under
+        version = catalog_version(self.user.pk)
+        self.client.post(
+            PRODUCTS_URL,
+            {"name": "New product", "price": 500},
+            format="json",
+        )
+
+        self.assertEqual(catalog_version(self.user.pk), version)
+
+    def test_admin_action_invalidates(self):
+        # Test bulk admin updates replace the owners' cached lists
+        self.client.get(PRODUCTS_URL)
+        admin = create_user(email="admin@example.com", is_superuser=True)
+        self.client.force_login(admin)
+        self.client.post(
+            reverse("admin:core_product_changelist"),
+            {
+                "action": "reprice",
+                "percent": "10",
+                "_selected_action": list(
+                    Product.objects.values_list("id", flat=True)
+                ),
+            },
+        )
+
+        res = self.client.get(PRODUCTS_URL)
+
+        self.assertEqual(res.json()[0]["price"], "1100")
+
+
+# Threads use their own connections, so the data has to be committed
+@override_settings(RESPONSE_CACHE_TIMEOUT=60, API_RATE_LIMITS={})
+class ResponseCacheBurstTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user(email="user@example.com")
+        for i in range(10):
+            Product.objects.create(
+                created_by=self.user,
+                name=f"Product {i}",
+                price=1000,
+            )
+        self.product_selects = 0
+        self.lock = threading.Lock()
+
+    def count_product_selects(self, execute, sql, params, many, context):
+        if sql.startswith("SELECT") and 'FROM "core_product"' in sql:
+            with self.lock:
+                self.product_selects += 1
+        return execute(sql, params, many, context)
+
+    def burst(self, requests=100):
+        # Send concurrent list requests, return their status codes
+        start = threading.Barrier(requests)
+
+        def request():
+            client = APIClient()
+            client.force_authenticate(self.user)
+            try:
+                with connection.execute_wrapper(self.count_product_selects):
+                    start.wait()
+                    return client.get(PRODUCTS_URL).status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(requests) as pool:
+            futures = [pool.submit(request) for _ in range(requests)]
+        return [future.result() for future in futures]
+
+    def test_cold_burst_queries_once(self):
+        # Test concurrent misses of one key run the product query once
+        self.assertEqual(set(self.burst()), {200})
+        self.assertEqual(self.product_selects, 1)
+
+    def test_expired_burst_queries_once(self):
+        # Test one request refreshes an expired list while the others get
+        # the stale one
+        self.burst()
+        self.product_selects = 0
+        now = time.time
+
+        # Past the 60s freshness, within the stale window
+        with patch("time.time", lambda: now() + 90):
+            self.assertEqual(set(self.burst()), {200})
+
+        self.assertEqual(self.product_selects, 1)
@@ -0,0 +1,117 @@
+"""
+Test read replica routing
+"""
+
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.helper import create_user
+from core.models import Product
+from core.routers import (
+    PrimaryReplicaRouter,
+    current_read_alias,
+    is_pinned_to_primary,
+    read_from,
+)
+from product.views import ProductViewSet
+
+
+PRODUCTS_URL = reverse("product:product-list")
+
+
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads_default_to_primary(self):
+        # Test reads use the default routing outside read_from
+        self.assertIsNone(self.router.db_for_read(Product))
+
+    def test_reads_inside_read_from(self):
+        # Test reads go to the selected alias inside read_from
+        with read_from("replica"):
+            self.assertEqual(self.router.db_for_read(Product), "replica")
+
+        self.assertIsNone(self.router.db_for_read(Product))
+
+    def test_writes_go_to_primary(self):
+        # Test writes never follow the read alias
+        with read_from("replica"):
+            self.assertEqual(self.router.db_for_write(Product), "default")
+
+    @override_settings(REPLICA_DATABASE="replica")
+    def test_replica_not_migrated(self):
+        # Test migrations only run against the primary
+        self.assertFalse(self.router.allow_migrate("replica", "core"))
+        self.assertTrue(self.router.allow_migrate("default", "core"))
+
+
+# The primary doubles as the replica so the test data stays visible
+@override_settings(REPLICA_DATABASE="default", REPLICA_PIN_SECONDS=5)
+class ReplicaReadMixinTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user(email="user@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.read_aliases = []
+        get_queryset = ProductViewSet.get_queryset
+
+        def recording_get_queryset(view):
+            self.read_aliases.append(current_read_alias())
+            return get_queryset(view)
+
+        patcher = patch.object(
+            ProductViewSet,
+            "get_queryset",
+            recording_get_queryset,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_list_reads_from_replica(self):
+        # Test list actions are served from the replica
+        res = self.client.get(PRODUCTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.read_aliases, ["default"])
+        self.assertIsNone(current_read_alias())
+
+    def test_write_pins_reads_to_primary(self):
+        # Test a user reads from the primary right after writing
+        payload = {"name": "Sample product", "price": 15000}
+        res = self.client.post(PRODUCTS_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(is_pinned_to_primary(self.user))
+
+        self.read_aliases.clear()
+        res = self.client.get(PRODUCTS_URL)
+
+        self.assertEqual(self.read_aliases, [None])
+        self.assertEqual(len(res.data), 1)
+
+    def test_failed_write_does_not_pin(self):
+        # Test rejected writes keep reads on the replica
+        res = self.client.post(PRODUCTS_URL, {"name": ""})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(is_pinned_to_primary(self.user))
+
+    def test_unhandled_error_leaves_replica(self):
+        # Test a request failing with a 500 doesn't leave the thread on
+        # the replica
+        self.client.raise_request_exception = False
+        res = self.client.get(PRODUCTS_URL, {"categories": "abc"})
+
+        self.assertEqual(
+            res.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+        self.assertEqual(self.read_aliases, ["default"])
+        self.assertIsNone(current_read_alias())
@@ -0,0 +1,103 @@
+"""
+Test the prebuilt OpenAPI schema
+"""
+
+import gzip
+import json
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import schema
+
+
+class PrebuiltSchemaTests(TestCase):
+    def setUp(self):
+        schema.clear_schemas()
+        self.addCleanup(schema.clear_schemas)
+        self.url = reverse("api-schema")
+
+    def test_schema_formats(self):
+        # Test YAML by default and JSON on request
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        self.assertIn(b"openapi: 3", res.content)
+        self.assertEqual(
+            res["Content-Type"],
+            "application/vnd.oai.openapi; charset=utf-8",
+        )
+
+        res = self.client.get(self.url, {"format": "json"})
+        paths = json.loads(res.content)["paths"]
+        self.assertIn("/api/product/products/", paths)
+
+    def test_schema_generated_once(self):
+        # Test the schema is rendered on the first request only
+        with patch(
+            "core.schema.render_schemas",
+            wraps=schema.render_schemas,
+        ) as render:
+            self.client.get(self.url)
+            self.client.get(self.url, HTTP_ACCEPT="application/json")
+
+        render.assert_called_once()
+
+    def test_schema_etag_and_gzip(self):
+        # Test revalidation and compressed bytes
+        res = self.client.get(self.url)
+        etag = res["ETag"]
+
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+
+        compressed = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        self.assertNotEqual(compressed["ETag"], etag)
+        self.assertEqual(
+            gzip.decompress(compressed.content),
+            self.client.get(self.url).content,
+        )
+
+    def test_etag_per_encoding(self):
+        # Test a validator only revalidates the encoding it was sent with
+        identity_etag = self.client.get(self.url)["ETag"]
+        gzip_etag = self.client.get(
+            self.url,
+            HTTP_ACCEPT_ENCODING="gzip",
+        )["ETag"]
+
+        res = self.client.get(
+            self.url,
+            HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_IF_NONE_MATCH=identity_etag,
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Content-Encoding"], "gzip")
+
+        res = self.client.get(
+            self.url,
+            HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_IF_NONE_MATCH=gzip_etag,
+        )
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res["ETag"], gzip_etag)
+
+    def test_build_schema_command(self):
+        # Test the built files are served per APP_VERSION
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            SCHEMA_CACHE_DIR=directory,
+            APP_VERSION="1.2.3",
+        ):
+            call_command("build_schema", stdout=StringIO())
+            with patch("core.schema.render_schemas") as render:
+                res = self.client.get(self.url)
+
+            render.assert_not_called()
+            self.assertEqual(
+                res.content,
+                (schema.schema_path("yaml")).read_bytes(),
+            )
@@ -0,0 +1,75 @@
+"""
+Test the production settings profile
+"""
+
+import importlib
+import os
+import sys
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+
+PRODUCTION_ENV = {
+    "DJANGO_SECRET_KEY": "production-secret",
+    "DJANGO_ALLOWED_HOSTS": "api.example.com, admin.example.com",
+    "APP_VERSION": "1.2.3",
+}
+
+
+def load_production_settings():
+    # Import a fresh copy of the production settings module
+    sys.modules.pop("app.settings.production", None)
+    return importlib.import_module("app.settings.production")
+
+
+class ProductionSettingsTests(SimpleTestCase):
+    def tearDown(self):
+        sys.modules.pop("app.settings.production", None)
+
+    @patch.dict(os.environ, PRODUCTION_ENV)
+    def test_debug_disabled(self):
+        # Test production never runs with DEBUG
+        settings = load_production_settings()
+
+        self.assertFalse(settings.DEBUG)
+        self.assertEqual(settings.SECRET_KEY, "production-secret")
+        self.assertEqual(
+            settings.ALLOWED_HOSTS,
+            ["api.example.com", "admin.example.com"],
+        )
+
+    @patch.dict(os.environ, PRODUCTION_ENV)
+    def test_persistent_connections(self):
+        # Test connections are reused and health checked
+        settings = load_production_settings()
+        default = settings.DATABASES["default"]
+
+        self.assertEqual(default["CONN_MAX_AGE"], 60)
+        self.assertTrue(default["CONN_HEALTH_CHECKS"])
+
+    @patch.dict(os.environ, PRODUCTION_ENV)
+    def test_base_settings_untouched(self):
+        # Test loading production does not leak into the shared base
+        load_production_settings()
+        base = importlib.import_module("app.settings.base")
+
+        self.assertEqual(base.DATABASES["default"]["CONN_MAX_AGE"], 0)
+        self.assertNotIn("CONN_HEALTH_CHECKS", base.DATABASES["default"])
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_secret_key_required(self):
+        # Test production refuses to load without a secret key
+        with self.assertRaises(KeyError):
+            load_production_settings()
+
+    def test_app_version_required(self):
+        # Test production refuses to load without a release version
+        env = {
+            key: value
+            for key, value in PRODUCTION_ENV.items()
+            if key != "APP_VERSION"
+        }
+        with patch.dict(os.environ, env, clear=True):
+            with self.assertRaises(KeyError):
+                load_production_settings()
@@ -0,0 +1,73 @@
+"""
+Test the API token bucket throttle
+"""
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.helper import create_user
+from core.ratelimit import get_token_bucket
+
+
+PRODUCTS_URL = reverse("product:product-list")
+ME_URL = reverse("user:me")
+
+
+def throttled(view, action):
+    return (
+        REGISTRY.get_sample_value(
+            "django_http_throttled_total",
+            {"view": view, "action": action},
+        )
+        or 0
+    )
+
+
+@override_settings(
+    RATELIMIT_BACKEND="core.ratelimit.LocalTokenBucket",
+    API_RATE_LIMITS={"user": "3/min", "catalog-list": "2/min"},
+)
+class TokenBucketThrottleTests(TestCase):
+    def setUp(self):
+        get_token_bucket().clear()
+        self.addCleanup(get_token_bucket().clear)
+        self.user = create_user(email="user@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_scope_limit(self):
+        # Test the list's own scope limits it, with a Retry-After
+        before = throttled("product:product-list", "list")
+        for _ in range(2):
+            res = self.client.get(PRODUCTS_URL)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(PRODUCTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res["Retry-After"], "30")
+        self.assertEqual(
+            throttled("product:product-list", "list"),
+            before + 1,
+        )
+
+    def test_limits_per_user_and_endpoint(self):
+        # Test other users and endpoints have their own buckets
+        for _ in range(3):
+            self.client.get(PRODUCTS_URL)
+        other = APIClient()
+        other.force_authenticate(create_user(email="other@example.com"))
+
+        self.assertEqual(other.get(PRODUCTS_URL).status_code, 200)
+        for _ in range(3):
+            self.assertEqual(self.client.get(ME_URL).status_code, 200)
+        self.assertEqual(self.client.get(ME_URL).status_code, 429)
+
+    @override_settings(API_RATE_LIMITS={})
+    def test_no_rate(self):
+        # Test endpoints without a rate are not limited
+        for _ in range(5):
+            self.assertEqual(self.client.get(ME_URL).status_code, 200)
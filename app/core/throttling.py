@@ -0,0 +1,95 @@
+"""
+API throttles backed by the token buckets in core.ratelimit
+"""
+
+from collections.abc import Mapping
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from core import metrics
+from core.ratelimit import get_token_bucket, parse_rate
+from core.views import view_labels
+
+
+class LoginRateThrottle(BaseThrottle):
+    # Limit token requests per email and per client IP. Throttles run
+    # before the serializer, so rejected bursts never reach the hasher.
+
+    def allow_request(self, request, view):
+        if request.method != "POST":
+            return True
+
+        bucket = get_token_bucket()
+        self.wait_seconds = 0.0
+        allowed = True
+
+        for scope, ident in self._identities(request):
+            capacity, rate = parse_rate(settings.LOGIN_RATE_LIMITS[scope])
+            scope_allowed, wait = bucket.consume(
+                f"login:{scope}:{ident}",
+                capacity,
+                rate,
+            )
+            if not scope_allowed:
+                allowed = False
+                self.wait_seconds = max(self.wait_seconds, wait)
+
+        if not allowed:
+            metrics.http_throttled_total.labels(
+                *view_labels(request, view)
+            ).inc()
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+    def _identities(self, request):
+        yield "ip", self.get_ident(request)
+
+        # Any JSON body parses, the serializer rejects non-objects later
+        if not isinstance(request.data, Mapping):
+            return
+        email = request.data.get("email")
+        if isinstance(email, str) and email:
+            yield "email", email.strip().lower()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    # Limit every endpoint per user, or per client IP when anonymous, with
+    # a single token bucket check. The rate is API_RATE_LIMITS of the
+    # view's throttle_scope if it has one (a scope, or a dict keyed by
+    # action), else of "user" or "anon"; a missing rate disables the
+    # limit. Rejections are counted by view and action, and DRF turns
+    # wait() into a Retry-After header.
+
+    def allow_request(self, request, view):
+        self.wait_seconds = 0.0
+        view_name, action = view_labels(request, view)
+        if request.user and request.user.is_authenticated:
+            scope = "user"
+            ident = f"user:{request.user.pk}"
+        else:
+            scope = "anon"
+            ident = f"ip:{self.get_ident(request)}"
+
+        view_scope = getattr(view, "throttle_scope", None)
+        if isinstance(view_scope, dict):
+            view_scope = view_scope.get(action)
+        rate = settings.API_RATE_LIMITS.get(view_scope or scope)
+        if not rate:
+            return True
+
+        capacity, per_second = parse_rate(rate)
+        allowed, self.wait_seconds = get_token_bucket().consume(
+            f"api:{view_name}:{action}:{ident}",
+            capacity,
+            per_second,
+        )
+        if not allowed:
+            metrics.http_throttled_total.labels(view_name, action).inc()
+
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
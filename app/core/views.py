@@ -0,0 +1,244 @@
+"""
+View mixins shared by the API apps
+"""
+
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db.models import QuerySet
+from rest_framework.permissions import SAFE_METHODS
+
+from core import binary, idempotency, metrics
+from core.cache import (
+    bump_catalog_versions,
+    cached_response,
+    get_or_compute,
+    response_cache_key,
+    response_entry,
+)
+from core.parsers import MessagePackParser
+from core.renderers import TimedMessagePackRenderer
+from core.routers import (
+    is_pinned_to_primary,
+    pin_to_primary,
+    read_from,
+)
+
+
+class ReplicaReadMixin:
+    # Serve the replica_actions of a viewset from the read replica. After a
+    # successful write the user's reads stay on the primary for
+    # REPLICA_PIN_SECONDS so they always see their own changes. Replayed
+    # idempotent writes changed nothing and leave reads where they are.
+    replica_actions = ("list", "retrieve")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        alias = settings.REPLICA_DATABASE
+        if (
+            alias
+            and self.action in self.replica_actions
+            and request.method in SAFE_METHODS
+            and not is_pinned_to_primary(request.user)
+        ):
+            self._replica_read = read_from(alias)
+            self._replica_read.__enter__()
+
+    def _end_replica_read(self):
+        replica_read = getattr(self, "_replica_read", None)
+        if replica_read is not None:
+            self._replica_read = None
+            replica_read.__exit__(None, None, None)
+
+    def handle_exception(self, exc):
+        try:
+            return super().handle_exception(exc)
+        except Exception:
+            # Unhandled errors skip finalize_response, leave the replica
+            # here or the thread's later requests would still read from it
+            self._end_replica_read()
+            raise
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        self._end_replica_read()
+
+        if (
+            settings.REPLICA_DATABASE
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and not idempotency.is_replay(response)
+            and request.user.is_authenticated
+        ):
+            pin_to_primary(request.user)
+
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+def view_labels(request, view):
+    # Return the (view, action) metric labels of a DRF request
+    match = request.resolver_match
+    view_name = match.view_name if match else view.__class__.__name__
+    action = getattr(view, "action", None) or request.method.lower()
+    return view_name, action
+
+
+class PhaseTimingMixin:
+    # Time authentication, queryset evaluation and serialization of a
+    # request and export them as django_http_request_phase_seconds. The
+    # timings travel on the response to TimedJSONRenderer, which adds
+    # render and the Server-Timing header.
+
+    def initial(self, request, *args, **kwargs):
+        self.phase_timings = {}
+        super().initial(request, *args, **kwargs)
+
+    @contextmanager
+    def time_phase(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings = self.__dict__.setdefault("phase_timings", {})
+            timings[phase] = (
+                timings.get(phase, 0.0) + time.perf_counter() - start
+            )
+
+    def perform_authentication(self, request):
+        with self.time_phase("auth"):
+            super().perform_authentication(request)
+
+    def get_object(self):
+        with self.time_phase("queryset"):
+            return super().get_object()
+
+    def get_serializer(self, *args, **kwargs):
+        # Evaluate list querysets up front so the queries are not counted
+        # as serialization, and time the outermost to_representation
+        instance = args[0] if args else kwargs.get("instance")
+        if isinstance(instance, QuerySet):
+            with self.time_phase("queryset"):
+                len(instance)
+
+        serializer = super().get_serializer(*args, **kwargs)
+        to_representation = serializer.to_representation
+
+        def timed_to_representation(instance):
+            with self.time_phase("serialize"):
+                return to_representation(instance)
+
+        serializer.to_representation = timed_to_representation
+        return serializer
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+
+        labels = view_labels(request, self)
+        timings = getattr(self, "phase_timings", {})
+        for phase, seconds in timings.items():
+            metrics.http_request_phase_seconds.labels(
+                *labels, phase
+            ).observe(seconds)
+
+        response.phase_timings = timings
+        response.phase_labels = labels
+        return response
+
+
+class ResponseCacheMixin:
+    # Serve list responses of a catalog viewset from the per-user response
+    # cache when RESPONSE_CACHE_TIMEOUT is set, see core/cache.py. One
+    # request renders an expired list while concurrent ones wait or get
+    # the stale copy. Writes through the viewset, other than idempotent
+    # replays, invalidate the user's cached responses.
+
+    def list(self, request, *args, **kwargs):
+        if (
+            not settings.RESPONSE_CACHE_TIMEOUT
+            or request.accepted_renderer.format != "json"
+        ):
+            return super().list(request, *args, **kwargs)
+
+        def render_list():
+            response = super(ResponseCacheMixin, self).list(
+                request, *args, **kwargs
+            )
+            response.accepted_renderer = request.accepted_renderer
+            response.accepted_media_type = request.accepted_media_type
+            response.renderer_context = self.get_renderer_context()
+            return response_entry(response.render())
+
+        entry = get_or_compute(
+            response_cache_key(request),
+            render_list,
+            settings.RESPONSE_CACHE_TIMEOUT,
+        )
+        return cached_response(request, entry)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and not idempotency.is_replay(response)
+            and request.user.is_authenticated
+        ):
+            bump_catalog_versions([request.user.pk])
+
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class IdempotencyMixin:
+    # Run writes sent with an Idempotency-Key header once per key and user,
+    # replaying the stored response to retries, see core/idempotency.py
+
+    def initial(self, request, *args, **kwargs):
+        self._idempotency_claim = None
+        super().initial(request, *args, **kwargs)
+        if request.method not in SAFE_METHODS:
+            self._idempotency_claim = idempotency.begin(request)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, idempotency.Replay):
+            return exc.response
+
+        try:
+            return super().handle_exception(exc)
+        except Exception:
+            # Unhandled errors skip finalize_response, free the key here
+            claim = getattr(self, "_idempotency_claim", None)
+            if claim is not None:
+                idempotency.release(claim)
+                self._idempotency_claim = None
+            raise
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        claim = getattr(self, "_idempotency_claim", None)
+        if claim is not None:
+            self._idempotency_claim = None
+            idempotency.finish(claim, response)
+
+        return response
+
+
+class MessagePackMixin:
+    # Offer MessagePack request bodies and responses next to JSON when the
+    # msgpack package is installed, see core/binary.py. JSON stays the
+    # default, clients opt in with Accept and Content-Type headers.
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if binary.msgpack is not None:
+            renderers.append(TimedMessagePackRenderer())
+        return renderers
+
+    def get_parsers(self):
+        parsers = super().get_parsers()
+        if binary.msgpack is not None:
+            parsers.append(MessagePackParser())
+        return parsers
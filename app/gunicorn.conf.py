@@ -0,0 +1,58 @@
+"""
+Gunicorn configuration for production serving
+
+Picked up automatically when gunicorn starts from this directory. Every
+value can be overridden through the GUNICORN_* environment variables.
+"""
+
+import multiprocessing
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings.production")
+
+CPU_COUNT = multiprocessing.cpu_count()
+
+# "gthread" serves app.wsgi, "uvicorn.workers.UvicornWorker" serves app.asgi
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+ASYNC_WORKER = worker_class.startswith("uvicorn")
+
+wsgi_app = os.environ.get(
+    "GUNICORN_APP",
+    "app.asgi:application" if ASYNC_WORKER else "app.wsgi:application",
+)
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# An event loop worker keeps one core busy on its own, threaded workers
+# spend part of their time waiting on PostgreSQL so we oversubscribe.
+workers = int(
+    os.environ.get(
+        "GUNICORN_WORKERS",
+        CPU_COUNT if ASYNC_WORKER else CPU_COUNT * 2 + 1,
+    )
+)
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# Import Django once in the master and fork workers from it. Django opens
+# no database connection at import time, so nothing is shared by accident.
+preload_app = True
+
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+
+# Recycle workers regularly to bound memory growth
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+accesslog = os.environ.get("GUNICORN_ACCESSLOG", "-")
+errorlog = "-"
+
+
+def on_starting(server):
+    # Refuse to serve with DEBUG, it keeps every query in memory
+    from django.conf import settings
+
+    if settings.DEBUG:
+        raise RuntimeError(
+            "DEBUG is enabled, refusing to start the production server"
+        )
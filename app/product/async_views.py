@@ -0,0 +1,140 @@
+"""
+Async (ASGI-native) read views for the product API
+"""
+
+from asgiref.sync import sync_to_async
+from django.db.models import Exists, OuterRef, prefetch_related_objects
+from django.http import (
+    Http404,
+    HttpResponseNotAllowed,
+    JsonResponse,
+)
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from core.authentication import aauthenticate
+from core.models import Product, ProductCategory, ProductCategoryLink
+from product import serializers
+from product.queries import (
+    in_categories,
+    owned_category_links,
+    owned_products,
+    params_to_ints,
+)
+
+
+def _unauthorized():
+    return JsonResponse(
+        {"detail": "Authentication credentials were not provided."},
+        status=401,
+        headers={"WWW-Authenticate": "Token"},
+    )
+
+
+async def _authenticated_get(request):
+    # Return the user for a GET request, or the error response to send
+    if request.method != "GET":
+        return None, HttpResponseNotAllowed(["GET"])
+
+    user = await aauthenticate(request)
+    if user is None:
+        return None, _unauthorized()
+
+    return user, None
+
+
+async def product_list(request):
+    # List products of the authenticated user
+    user, error = await _authenticated_get(request)
+    if error:
+        return error
+
+    queryset = owned_products(user)
+    categories = request.GET.get("categories")
+    if categories:
+        try:
+            category_ids = params_to_ints(categories)
+        except ValueError:
+            return JsonResponse(
+                {"categories": ["Invalid id list."]},
+                status=400,
+            )
+        queryset = in_categories(queryset, user, category_ids)
+
+    # Pages like the sync list when sent ?page_size=N
+    paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+    drf_request = Request(request)
+    page = None
+    if paginator.get_page_size(drf_request):
+        try:
+            page = await sync_to_async(paginator.paginate_queryset)(
+                queryset,
+                drf_request,
+            )
+        except NotFound as exc:
+            return JsonResponse({"detail": exc.detail}, status=404)
+
+    if page is None:
+        products = [product async for product in queryset.aiterator()]
+    else:
+        products = page
+    await sync_to_async(prefetch_related_objects)(
+        products,
+        owned_category_links(user),
+    )
+
+    data = serializers.ProductSerializer(products, many=True).data
+    if page is not None:
+        data = paginator.get_paginated_response(data).data
+    return JsonResponse(data, safe=False)
+
+
+async def product_detail(request, pk):
+    # Retrieve a single product of the authenticated user
+    user, error = await _authenticated_get(request)
+    if error:
+        return error
+
+    try:
+        product = await owned_products(user).aget(pk=pk)
+    except Product.DoesNotExist:
+        raise Http404("No Product matches the given query.")
+
+    await sync_to_async(prefetch_related_objects)(
+        [product],
+        owned_category_links(user),
+    )
+
+    data = serializers.ProductDetailSerializer(product).data
+    return JsonResponse(data)
+
+
+async def category_list(request):
+    # List product categories of the authenticated user
+    user, error = await _authenticated_get(request)
+    if error:
+        return error
+
+    try:
+        assigned_only = bool(int(request.GET.get("assigned_only", 0)))
+    except ValueError:
+        return JsonResponse({"assigned_only": ["Must be 0 or 1."]}, status=400)
+
+    queryset = ProductCategory.objects.filter(created_by=user)
+    if assigned_only:
+        queryset = queryset.filter(
+            Exists(
+                ProductCategoryLink.objects.filter(
+                    created_by=user,
+                    productcategory=OuterRef("pk"),
+                )
+            )
+        )
+
+    categories = [
+        category async for category in queryset.order_by("-name").aiterator()
+    ]
+
+    data = serializers.ProductCategorySerializer(categories, many=True).data
+    return JsonResponse(data, safe=False)
@@ -0,0 +1,71 @@
+"""
+Per-user product querysets, and the id list parsing, shared by the sync
+and async product views
+
+The catalog tables are hash partitioned on created_by_id (see
+core/partitioning.py). PostgreSQL only prunes a join or subquery that
+carries the partition key itself, so every stock join, category link
+subquery and link prefetch here repeats the owner condition.
+"""
+
+from django.db.models import (
+    Exists,
+    FilteredRelation,
+    OuterRef,
+    Prefetch,
+    Q,
+    Value,
+)
+from django.db.models.functions import Coalesce
+
+from core.models import Product, ProductCategoryLink
+
+
+def params_to_ints(qs):
+    # Convert a comma separated list of ids to integers
+    return [int(str_id) for str_id in qs.split(",")]
+
+
+def owned_products(user):
+    # Products of a user, newest first, with the quantity of their stock
+    # row as stock_quantity (read by Product.stock_count)
+    return (
+        Product.objects.filter(created_by=user)
+        .annotate(
+            owned_stock=FilteredRelation(
+                "product_stock",
+                condition=Q(product_stock__created_by=user),
+            ),
+            stock_quantity=Coalesce("owned_stock__quantity", Value(0)),
+        )
+        .order_by("-id")
+    )
+
+
+def owned_category_links(user):
+    # Prefetch of the category links of a user's products, with their
+    # categories, into owned_category_links (read by ProductSerializer).
+    # Prefetching "categories" would join the link table on product_id
+    # alone.
+    return Prefetch(
+        "productcategorylink_set",
+        queryset=ProductCategoryLink.objects.filter(
+            created_by=user
+        ).select_related("productcategory"),
+        to_attr="owned_category_links",
+    )
+
+
+def in_categories(queryset, user, category_ids):
+    # Products of queryset linked to any of category_ids. A semi-join
+    # keeps one row per product without DISTINCT, so the (created_by, id)
+    # index still provides the ordering.
+    return queryset.filter(
+        Exists(
+            ProductCategoryLink.objects.filter(
+                created_by=user,
+                product=OuterRef("pk"),
+                productcategory_id__in=category_ids,
+            )
+        )
+    )
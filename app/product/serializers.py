@@ -2,9 +2,12 @@ from rest_framework import serializers
 
 from core.helper import DEFAULT_READ_ONLY_FIELDS
 from core.models import Product, ProductCategory, ProductStock
+from core.serializers import NativeValuesMixin
 
 
-class ProductCategorySerializer(serializers.ModelSerializer):
+class ProductCategorySerializer(
+    NativeValuesMixin, serializers.ModelSerializer
+):
     # Serializer for the product category object
     class Meta:
         model = ProductCategory
@@ -17,7 +20,7 @@ class ProductCategorySerializer(serializers.ModelSerializer):
         read_only_fields = DEFAULT_READ_ONLY_FIELDS
 
 
-class ProductStockSerializer(serializers.ModelSerializer):
+class ProductStockSerializer(NativeValuesMixin, serializers.ModelSerializer):
     # Serializer for the product stock object
     class Meta:
         model = ProductStock
@@ -31,9 +34,23 @@ class ProductStockSerializer(serializers.ModelSerializer):
         read_only_fields = DEFAULT_READ_ONLY_FIELDS
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductCategoryListSerializer(serializers.ListSerializer):
+    # Categories of a product, read from the owned_category_links prefetch
+    # of product/queries.py when the queryset has one
+
+    def get_attribute(self, instance):
+        links = getattr(instance, "owned_category_links", None)
+        if links is None:
+            return super().get_attribute(instance)
+        return [link.productcategory for link in links]
+
+
+class ProductSerializer(NativeValuesMixin, serializers.ModelSerializer):
     # Serializer for the product object
-    categories = ProductCategorySerializer(many=True, required=False)
+    categories = ProductCategoryListSerializer(
+        child=ProductCategorySerializer(),
+        required=False,
+    )
 
     class Meta:
         model = Product
@@ -48,31 +65,40 @@ class ProductSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = DEFAULT_READ_ONLY_FIELDS + ["stock_count"]
 
-    def _get_or_create_categories(self, categories, product):
+    def _get_or_create_categories(self, categories):
         # Handle getting or creating categories as needed
         auth_user = self.context["request"].user
-        for category in categories:
-            category_obj, _ = ProductCategory.objects.get_or_create(
+        return [
+            ProductCategory.objects.get_or_create(
                 created_by=auth_user,
                 **category,
-            )
-            product.categories.add(category_obj)
+            )[0]
+            for category in categories
+        ]
 
     def create(self, validated_data):
         # Create and return a new product
         categories = validated_data.pop("categories", [])
         product = Product.objects.create(**validated_data)
-        self._get_or_create_categories(categories, product)
+        product.categories.add(
+            *self._get_or_create_categories(categories),
+            through_defaults={"created_by_id": product.created_by_id},
+        )
 
         return product
 
     def update(self, instance, validated_data):
-        # Update an existing product
+        # Update an existing product. Only changed columns are written and
+        # category links are diffed instead of cleared and re-added.
         categories = validated_data.pop("categories", None)
 
         if categories is not None:
-            instance.categories.clear()
-            self._get_or_create_categories(categories, instance)
+            instance.categories.set(
+                self._get_or_create_categories(categories),
+                through_defaults={"created_by_id": instance.created_by_id},
+            )
+            # The prefetched links no longer match
+            instance.__dict__.pop("owned_category_links", None)
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
@@ -2,18 +2,22 @@
 Test for product APIs
 """
 
+from unittest.mock import patch
+
+from django.core.cache import cache
 from django.urls import reverse
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core.models import Product, ProductCategory
+from core.models import Product, ProductCategory, ProductCategoryLink
 from core.helper import create_user, get_time_in_utc
 
 from product.serializers import ProductDetailSerializer, ProductSerializer
 
 PRODUCTS_URL = reverse("product:product-list")
+BATCH_URL = reverse("product:product-batch")
 
 
 def detail_url(product_id):
@@ -211,6 +215,20 @@ class PrivateProductAPITests(TestCase):
             ).exists()
             self.assertTrue(exists)
 
+    def test_category_links_owned_by_product_owner(self):
+        # Test category links carry the owner used for partitioning
+        payload = {
+            "name": "Sample product name",
+            "price": 15000,
+            "categories": [{"name": "For Men"}],
+        }
+        res = self.client.post(PRODUCTS_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        links = ProductCategoryLink.objects.filter(product_id=res.data["id"])
+        self.assertEqual(links.count(), 1)
+        self.assertEqual(links[0].created_by, self.user)
+
     def test_create_product_with_existing_categories(self):
         # Test creating a product with existing categories
         category1 = ProductCategory.objects.create(
@@ -336,3 +354,114 @@ class PrivateProductAPITests(TestCase):
         self.assertIn(serializer1.data, res.data)
         self.assertIn(serializer2.data, res.data)
         self.assertNotIn(serializer3.data, res.data)
+
+
+class ProductBatchAPITests(TestCase):
+    # Test fetching many products by id in one request
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(email="user@example.com")
+        self.client.force_authenticate(self.user)
+        self.products = [
+            create_product(created_by=self.user, name=f"Product {i}")
+            for i in range(3)
+        ]
+
+    def batch(self, ids):
+        return self.client.get(
+            BATCH_URL, {"ids": ",".join(str(pk) for pk in ids)}
+        )
+
+    def test_batch_in_requested_order(self):
+        # Test products come back in the order asked for, once each
+        first, second, third = self.products
+        res = self.batch([third.id, first.id, third.id, second.id])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [
+                ProductDetailSerializer(product).data
+                for product in (third, first, second)
+            ],
+        )
+
+    def test_batch_skips_unknown_and_other_users_products(self):
+        # Test ids the user can't see are left out
+        other = create_user(email="other@example.com")
+        hidden = create_product(created_by=other)
+        res = self.batch([hidden.id, self.products[0].id, 999999])
+
+        self.assertEqual(
+            [item["id"] for item in res.data], [self.products[0].id]
+        )
+
+    def test_batch_invalid_ids(self):
+        # Test missing, malformed and too many ids are rejected
+        for ids in ("", "1,a", ",".join(str(i) for i in range(1, 102))):
+            res = self.client.get(BATCH_URL, {"ids": ids})
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_cache_off_skips_lookup(self):
+        # Test batches don't query a cache that is off
+        with patch("core.cache.cache") as shared_cache:
+            res = self.batch([self.products[0].id])
+
+        self.assertEqual(len(res.data), 1)
+        shared_cache.get_many.assert_not_called()
+        shared_cache.set_many.assert_not_called()
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=60)
+    def test_batch_fetches_only_misses(self):
+        # Test cached products are served without querying them again
+        first, second, third = self.products
+        self.batch([first.id, second.id])
+
+        with self.assertNumQueries(2):
+            res = self.batch([first.id, second.id, third.id])
+        with self.assertNumQueries(0):
+            cached = self.batch([third.id, first.id])
+
+        self.assertEqual(
+            [item["id"] for item in res.data],
+            [first.id, second.id, third.id],
+        )
+        self.assertEqual(
+            [item["id"] for item in cached.data], [third.id, first.id]
+        )
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=60)
+    def test_batch_ignores_categories(self):
+        # Test cached and fetched products are returned alike whatever
+        # the categories parameter
+        first, second = self.products[:2]
+        category = ProductCategory.objects.create(
+            created_by=self.user,
+            name="Men",
+        )
+        first.categories.add(category)
+        self.batch([first.id])
+
+        res = self.client.get(
+            BATCH_URL,
+            {
+                "ids": f"{first.id},{second.id}",
+                "categories": str(category.id),
+            },
+        )
+
+        self.assertEqual(
+            [item["id"] for item in res.data], [first.id, second.id]
+        )
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=60)
+    def test_batch_cache_invalidated_by_writes(self):
+        # Test an update is seen by the next batch
+        product = self.products[0]
+        self.batch([product.id])
+        self.client.patch(detail_url(product.id), {"name": "Renamed"})
+
+        res = self.batch([product.id])
+
+        self.assertEqual(res.data[0]["name"], "Renamed")
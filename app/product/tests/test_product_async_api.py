@@ -0,0 +1,199 @@
+"""
+Test for the async product read APIs
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from core.authentication import token_cache_key
+from core.models import Product, ProductCategory, ProductStock
+from core.helper import create_user
+
+
+ASYNC_PRODUCTS_URL = reverse("product:async-product-list")
+ASYNC_CATEGORIES_URL = reverse("product:async-productcategory-list")
+
+
+def detail_url(product_id):
+    # Create and return an async product detail URL
+    return reverse("product:async-product-detail", args=[product_id])
+
+
+class PublicAsyncProductAPITests(TestCase):
+    # Test unauthenticated async product API requests
+
+    async def test_auth_required(self):
+        # Test auth is required to call API
+        res = await self.async_client.get(ASYNC_PRODUCTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_invalid_token(self):
+        # Test an unknown token is rejected
+        res = await self.async_client.get(
+            ASYNC_PRODUCTS_URL,
+            authorization="Token invalid",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateAsyncProductAPITests(TestCase):
+    # Test authenticated async product API requests
+
+    def setUp(self):
+        self.user = create_user(email="user@example.com")
+        other_user = create_user(email="other@example.com")
+        token = self.token = Token.objects.create(user=self.user)
+        self.auth = {"authorization": f"Token {token.key}"}
+
+        self.category = ProductCategory.objects.create(
+            created_by=self.user,
+            name="Men",
+        )
+        self.product1 = Product.objects.create(
+            created_by=self.user,
+            name="Product 1",
+            price=15000,
+        )
+        self.product1.categories.add(self.category)
+        ProductStock.objects.create(
+            created_by=self.user,
+            product=self.product1,
+            quantity=7,
+        )
+        self.product2 = Product.objects.create(
+            created_by=self.user,
+            name="Product 2",
+            price=20000,
+        )
+        Product.objects.create(
+            created_by=other_user,
+            name="Other product",
+            price=10000,
+        )
+
+    async def test_list_products(self):
+        # Test listing products of the user, newest first
+        res = await self.async_client.get(ASYNC_PRODUCTS_URL, **self.auth)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        data = res.json()
+        self.assertEqual(
+            [product["id"] for product in data],
+            [self.product2.id, self.product1.id],
+        )
+        self.assertEqual(data[1]["stock_count"], 7)
+        self.assertEqual(data[0]["stock_count"], 0)
+        self.assertEqual(data[1]["categories"][0]["name"], "Men")
+
+    async def test_filter_products_by_category(self):
+        # Test filtering products by categories
+        res = await self.async_client.get(
+            ASYNC_PRODUCTS_URL,
+            {"categories": f"{self.category.id}"},
+            **self.auth,
+        )
+
+        self.assertEqual(
+            [product["id"] for product in res.json()],
+            [self.product1.id],
+        )
+
+    async def test_list_products_paginated(self):
+        # Test ?page_size pages like the sync list
+        res = await self.async_client.get(
+            ASYNC_PRODUCTS_URL,
+            {"page_size": 1, "page": 2},
+            **self.auth,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        data = res.json()
+        self.assertEqual(data["count"], 2)
+        self.assertTrue(data["count_is_exact"])
+        self.assertIsNone(data["next"])
+        self.assertEqual(
+            [product["id"] for product in data["results"]],
+            [self.product1.id],
+        )
+        self.assertEqual(data["results"][0]["categories"][0]["name"], "Men")
+
+    async def test_list_products_invalid_page(self):
+        # Test pages past the end are not found
+        res = await self.async_client.get(
+            ASYNC_PRODUCTS_URL,
+            {"page_size": 1, "page": 5},
+            **self.auth,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_retrieve_product(self):
+        # Test retrieving a product detail
+        res = await self.async_client.get(
+            detail_url(self.product1.id),
+            **self.auth,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["name"], "Product 1")
+        self.assertIn("description", res.json())
+
+    async def test_retrieve_other_users_product(self):
+        # Test products of other users are not found
+        other = await Product.objects.aget(name="Other product")
+        res = await self.async_client.get(detail_url(other.id), **self.auth)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_list_categories(self):
+        # Test listing categories of the user
+        res = await self.async_client.get(
+            ASYNC_CATEGORIES_URL,
+            {"assigned_only": 1},
+            **self.auth,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [category["name"] for category in res.json()],
+            ["Men"],
+        )
+
+    async def test_write_not_allowed(self):
+        # Test the async endpoints are read only
+        res = await self.async_client.post(ASYNC_PRODUCTS_URL, **self.auth)
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    async def test_token_cache_holds_no_user_object(self):
+        # Test only the user id and active flag are cached
+        await self.async_client.get(ASYNC_PRODUCTS_URL, **self.auth)
+
+        cached = await caches["near"].aget(token_cache_key(self.token.key))
+        self.assertEqual(cached, (self.user.pk, True))
+
+    async def test_deleted_token_rejected(self):
+        # Test a deleted token stops authenticating right away
+        await self.async_client.get(ASYNC_PRODUCTS_URL, **self.auth)
+        await sync_to_async(self.token.delete)()
+
+        res = await self.async_client.get(ASYNC_PRODUCTS_URL, **self.auth)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_deactivated_user_rejected(self):
+        # Test deactivating a user stops their cached token right away
+        await self.async_client.get(ASYNC_PRODUCTS_URL, **self.auth)
+        self.user.is_active = False
+        await sync_to_async(self.user.save)()
+
+        res = await self.async_client.get(ASYNC_PRODUCTS_URL, **self.auth)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
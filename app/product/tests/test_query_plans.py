@@ -0,0 +1,124 @@
+"""
+Query plan regression tests for the product list endpoints (PostgreSQL)
+"""
+
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.explain import (
+    capture_plans,
+    estimated_rows,
+    reads_table,
+    seq_scans,
+    sort_nodes,
+    table_rows,
+)
+from core.maids import seed_catalog
+from core.models import (
+    Product,
+    ProductCategory,
+    ProductCategoryLink,
+    ProductStock,
+    User,
+)
+
+
+CATALOG_SIZE = 20_000
+PRODUCTS_PER_USER = 100
+# Tables above this many rows must never be read sequentially
+SEQ_SCAN_MAX_ROWS = 5_000
+CATALOG_TABLES = [
+    model._meta.db_table
+    for model in (Product, ProductCategory, ProductCategoryLink, ProductStock)
+]
+
+
+@skipUnless(connection.vendor == "postgresql", "Needs PostgreSQL plans")
+class ListEndpointPlanTests(TestCase):
+    # Every list and filter endpoint against a catalog large enough that
+    # a sequential scan or a sort is a planning regression, not a choice
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_catalog(CATALOG_SIZE, products_per_user=PRODUCTS_PER_USER)
+        with connection.cursor() as cursor:
+            for table in CATALOG_TABLES:
+                cursor.execute(f"ANALYZE {connection.ops.quote_name(table)}")
+
+        cls.large_tables = [
+            table
+            for table in CATALOG_TABLES
+            if table_rows(table) > SEQ_SCAN_MAX_ROWS
+        ]
+        cls.user = User.objects.order_by("id").first()
+        cls.token = Token.objects.create(user=cls.user)
+        cls.category = ProductCategory.objects.filter(
+            created_by=cls.user,
+            productcategorylink__isnull=False,
+        ).first()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+
+    def endpoint_plans(self, url):
+        # Return the plans of the catalog queries a GET of url runs
+        plans = capture_plans(lambda: self.client.get(url))
+        return [
+            plan
+            for _, plan in plans
+            if any(reads_table(plan, table) for table in CATALOG_TABLES)
+        ]
+
+    def assert_plans(self, url, sorted_by_index=True):
+        plans = self.endpoint_plans(url)
+        self.assertTrue(plans, f"{url} ran no catalog queries")
+
+        self.assertIn(Product._meta.db_table, self.large_tables)
+        for plan in plans:
+            for table in self.large_tables:
+                self.assertEqual(seq_scans(plan, table), [], (url, plan))
+
+        # The first catalog query is the page itself; its ordering must
+        # come from an index, and its estimate must be in the right range
+        main = plans[0]
+        if sorted_by_index:
+            self.assertEqual(sort_nodes(main), [], (url, main))
+        self.assertLessEqual(estimated_rows(main), PRODUCTS_PER_USER * 10)
+
+    def test_product_list(self):
+        self.assert_plans(reverse("product:product-list"))
+
+    def test_product_list_filtered_by_category(self):
+        self.assert_plans(
+            reverse("product:product-list")
+            + f"?categories={self.category.id}",
+            sorted_by_index=False,
+        )
+
+    def test_product_detail(self):
+        product = Product.objects.filter(created_by=self.user).first()
+        self.assert_plans(
+            reverse("product:product-detail", args=[product.id])
+        )
+
+    def test_category_list(self):
+        self.assert_plans(reverse("product:productcategory-list"))
+
+    def test_category_list_assigned_only(self):
+        self.assert_plans(
+            reverse("product:productcategory-list") + "?assigned_only=1",
+            sorted_by_index=False,
+        )
+
+    def test_stock_list(self):
+        self.assert_plans(reverse("product:productstock-list"))
+
+    def test_async_product_list(self):
+        self.assert_plans(reverse("product:async-product-list"))
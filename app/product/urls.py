@@ -5,7 +5,7 @@ URL Mappings for the product API
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from product import views
+from product import async_views, views
 
 app_name = "product"
 
@@ -16,4 +16,19 @@ router.register("stocks", views.ProductStockViewSet)
 
 urlpatterns = [
     path("", include(router.urls)),
+    path(
+        "async/products/",
+        async_views.product_list,
+        name="async-product-list",
+    ),
+    path(
+        "async/products/<int:pk>/",
+        async_views.product_detail,
+        name="async-product-detail",
+    ),
+    path(
+        "async/categories/",
+        async_views.category_list,
+        name="async-productcategory-list",
+    ),
 ]
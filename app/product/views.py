@@ -1,3 +1,4 @@
+from django.db.models import Exists, OuterRef
 from drf_spectacular.utils import (
     extend_schema_view,
     extend_schema,
@@ -9,10 +10,33 @@ from rest_framework import (
     mixins,
 )
 from rest_framework.authentication import TokenAuthentication
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
-
-from core.models import Product, ProductCategory, ProductStock
+from rest_framework.response import Response
+
+from core.authentication import SignedTokenAuthentication
+from core.cache import cached_objects, store_objects
+from core.models import (
+    Product,
+    ProductCategory,
+    ProductCategoryLink,
+    ProductStock,
+)
+from core.views import (
+    IdempotencyMixin,
+    MessagePackMixin,
+    PhaseTimingMixin,
+    ReplicaReadMixin,
+    ResponseCacheMixin,
+)
 from product import serializers
+from product.queries import (
+    in_categories,
+    owned_category_links,
+    owned_products,
+    params_to_ints,
+)
 
 
 @extend_schema_view(
@@ -26,30 +50,87 @@ from product import serializers
         ]
     )
 )
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(
+    PhaseTimingMixin,
+    MessagePackMixin,
+    ReplicaReadMixin,
+    ResponseCacheMixin,
+    IdempotencyMixin,
+    viewsets.ModelViewSet,
+):
     # View for manage product APIs
     serializer_class = serializers.ProductDetailSerializer
     queryset = Product.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [
+        TokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [IsAuthenticated]
-
-    def _params_to_ints(self, qs):
-        # Convert a list of strings to integers
-        return [int(str_id) for str_id in qs.split(",")]
+    # Token lookup, products with their stock row, categories, and the
+    # count of a paginated list
+    query_budget = {"list": 4, "retrieve": 3, "batch": 3}
+    throttle_scope = {"list": "catalog-list"}
+    replica_actions = ("list", "retrieve", "batch")
+    batch_max_ids = 100
 
     def get_queryset(self):
         # Retrieve products for authenticated user
+        user = self.request.user
+        queryset = owned_products(user).prefetch_related(
+            owned_category_links(user)
+        )
+        # Batches look products up by id alone, like their cached copies
         categories = self.request.query_params.get("categories")
-        queryset = self.queryset
-        if categories:
-            tag_ids = self._params_to_ints(categories)
-            queryset = queryset.filter(categories__id__in=tag_ids)
-
-        return (
-            queryset.filter(created_by=self.request.user)
-            .order_by("-id")
-            .distinct()
+        if categories and self.action != "batch":
+            queryset = in_categories(
+                queryset,
+                user,
+                params_to_ints(categories),
+            )
+
+        return queryset
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "ids",
+                OpenApiTypes.STR,
+                description="Comma separated list of up to 100 product ids",
+            ),
+        ]
+    )
+    @action(detail=False, methods=["get"])
+    def batch(self, request):
+        # Return many products in the requested order, unknown ids left
+        # out. Cached products are served first and the misses fetched in
+        # one query.
+        try:
+            ids = params_to_ints(request.query_params.get("ids", ""))
+        except ValueError:
+            raise ValidationError({"ids": ["Enter comma separated ids."]})
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > self.batch_max_ids:
+            raise ValidationError(
+                {"ids": [f"Enter at most {self.batch_max_ids} ids."]}
+            )
+
+        # Renderers may need the serialized values in different types
+        prefix, found = cached_objects(
+            request.user.pk,
+            f"product:{request.accepted_renderer.format}",
+            ids,
         )
+        misses = [pk for pk in ids if pk not in found]
+        if misses:
+            products = self.get_queryset().filter(id__in=misses)
+            fetched = {
+                item["id"]: item
+                for item in self.get_serializer(products, many=True).data
+            }
+            store_objects(prefix, fetched)
+            found.update(fetched)
+
+        return Response([found[pk] for pk in ids if pk in found])
 
     def get_serializer_class(self):
         # Return the serializer class for request
@@ -76,14 +157,24 @@ class ProductViewSet(viewsets.ModelViewSet):
     )
 )
 class ProductCategoryViewSet(
+    PhaseTimingMixin,
+    MessagePackMixin,
+    ReplicaReadMixin,
+    ResponseCacheMixin,
+    IdempotencyMixin,
     mixins.ListModelMixin,
     mixins.UpdateModelMixin,
     mixins.DestroyModelMixin,
     viewsets.GenericViewSet,
 ):
     # View for manage product categories APIs
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [
+        TokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [IsAuthenticated]
+    # Token lookup, rows, and the count of a paginated list
+    query_budget = {"list": 3}
 
     def get_queryset(self):
         # Retrieve product categories for authenticated user
@@ -92,34 +183,45 @@ class ProductCategoryViewSet(
         )
         queryset = self.queryset
         if assigned_only:
-            queryset = queryset.filter(product__isnull=False)
-        return (
-            queryset.filter(created_by=self.request.user)
-            .order_by("-name")
-            .distinct()
-        )
+            queryset = queryset.filter(
+                Exists(
+                    ProductCategoryLink.objects.filter(
+                        created_by=self.request.user,
+                        productcategory=OuterRef("pk"),
+                    )
+                )
+            )
+        return queryset.filter(created_by=self.request.user).order_by("-name")
 
     serializer_class = serializers.ProductCategorySerializer
     queryset = ProductCategory.objects.all()
 
 
 class ProductStockViewSet(
+    PhaseTimingMixin,
+    MessagePackMixin,
+    ReplicaReadMixin,
+    ResponseCacheMixin,
+    IdempotencyMixin,
     mixins.ListModelMixin,
     mixins.UpdateModelMixin,
     mixins.DestroyModelMixin,
     viewsets.GenericViewSet,
 ):
     # View for manage product stock  APIs
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [
+        TokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [IsAuthenticated]
+    # Token lookup, rows, and the count of a paginated list
+    query_budget = {"list": 3}
 
     def get_queryset(self):
         # Retrieve product categories for authenticated user
         queryset = self.queryset
-        return (
-            queryset.filter(created_by=self.request.user)
-            .order_by("-quantity")
-            .distinct()
+        return queryset.filter(created_by=self.request.user).order_by(
+            "-quantity"
         )
 
     serializer_class = serializers.ProductStockSerializer
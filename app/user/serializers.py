@@ -1,7 +1,27 @@
+from contextlib import contextmanager
+
 from django.contrib.auth import get_user_model, authenticate
+from django.db import IntegrityError, transaction
 from django.utils.translation import gettext as _
 from rest_framework import serializers
 
+from core.tokens import REFRESH, InvalidToken, verify_token
+
+
+@contextmanager
+def unique_email():
+    # Turn a violation of the email unique constraint into a 400. Relying
+    # on the constraint saves the SELECT a UniqueValidator would run
+    # before every insert and is also correct under concurrent signups.
+    try:
+        with transaction.atomic():
+            yield
+    except IntegrityError:
+        raise serializers.ValidationError(
+            {"email": [_("user with this email already exists.")]},
+            code="unique",
+        )
+
 
 class UserSerializer(serializers.ModelSerializer):
     # Serializer for the user object
@@ -9,22 +29,30 @@ class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = get_user_model()
         fields = ["email", "password", "name"]
-        extra_kwargs = {"password": {"write_only": True, "min_length": 5}}
+        extra_kwargs = {
+            "email": {"validators": []},
+            "password": {"write_only": True, "min_length": 5},
+        }
 
     def create(self, validated_data):
         # Create and return a user with encrypted password
-        return get_user_model().objects.create_user(**validated_data)
+        with unique_email():
+            return get_user_model().objects.create_user(**validated_data)
 
     def update(self, instance, validated_data):
-        # Update user data and return user
+        # Update user data and return user, in a single UPDATE of the
+        # changed columns
         password = validated_data.pop("password", None)
-        user = super().update(instance, validated_data)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
 
         if password:
-            user.set_password(password)
-            user.save()
+            instance.set_password(password)
 
-        return user
+        with unique_email():
+            instance.save()
+
+        return instance
 
 
 class AuthTokenSerializer(serializers.Serializer):
@@ -50,3 +78,15 @@ class AuthTokenSerializer(serializers.Serializer):
 
         attrs["user"] = user
         return attrs
+
+
+class SignedTokenSerializer(serializers.Serializer):
+    # Serializer for a signed refresh token
+    refresh = serializers.CharField(trim_whitespace=False)
+
+    def validate_refresh(self, value):
+        # Verify the token and return its payload
+        try:
+            return verify_token(value, REFRESH)
+        except InvalidToken as e:
+            raise serializers.ValidationError(str(e), code="authorization")
@@ -0,0 +1,160 @@
+"""
+Test login rate shaping and password rehashing
+"""
+
+from base64 import b64encode
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.ratelimit import get_token_bucket
+
+
+TOKEN_URL = reverse("user:token")
+
+LOCAL_BUCKETS = {
+    "RATELIMIT_BACKEND": "core.ratelimit.LocalTokenBucket",
+    "LOGIN_RATE_LIMITS": {"email": "2/min", "ip": "100/min"},
+}
+
+
+@override_settings(**LOCAL_BUCKETS)
+class LoginRateLimitTests(TestCase):
+    def setUp(self):
+        get_token_bucket().clear()
+        self.addCleanup(get_token_bucket().clear)
+        self.client = APIClient()
+        get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+        )
+
+    def test_burst_rejected_before_hashing(self):
+        # Test logins over the limit are rejected without authenticating
+        payload = {"email": "test@example.com", "password": "wrongpass"}
+        for _ in range(2):
+            self.client.post(TOKEN_URL, payload)
+
+        with patch("user.serializers.authenticate") as authenticate:
+            res = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", res)
+        authenticate.assert_not_called()
+
+    def test_basic_auth_header_throttled(self):
+        # Test an Authorization header doesn't get checked ahead of the
+        # limits
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Basic " + b64encode(b"a@b.com:wrong").decode()
+        )
+        payload = {"email": "test@example.com", "password": "wrongpass"}
+        statuses = [
+            self.client.post(TOKEN_URL, payload).status_code
+            for _ in range(3)
+        ]
+
+        self.assertEqual(
+            statuses,
+            [
+                status.HTTP_400_BAD_REQUEST,
+                status.HTTP_400_BAD_REQUEST,
+                status.HTTP_429_TOO_MANY_REQUESTS,
+            ],
+        )
+
+    def test_limit_per_email(self):
+        # Test the email limit is case insensitive and per address
+        for _ in range(2):
+            self.client.post(TOKEN_URL, {"email": "TEST@example.com"})
+
+        res = self.client.post(
+            TOKEN_URL,
+            {"email": "test@example.com", "password": "testpass123"},
+        )
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        res = self.client.post(
+            TOKEN_URL,
+            {"email": "other@example.com", "password": "testpass123"},
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(LOGIN_RATE_LIMITS={"email": "100/min", "ip": "1/min"})
+    def test_limit_per_ip(self):
+        # Test one client IP can't spread a burst over many emails
+        self.client.post(TOKEN_URL, {"email": "first@example.com"})
+        res = self.client.post(TOKEN_URL, {"email": "second@example.com"})
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(LOGIN_RATE_LIMITS={"email": "100/min", "ip": "1/min"})
+    def test_forwarded_for_not_trusted(self):
+        # Test a forged X-Forwarded-For doesn't open a new IP bucket
+        self.client.post(
+            TOKEN_URL,
+            {"email": "first@example.com"},
+            HTTP_X_FORWARDED_FOR="1.1.1.1",
+        )
+        res = self.client.post(
+            TOKEN_URL,
+            {"email": "second@example.com"},
+            HTTP_X_FORWARDED_FOR="2.2.2.2",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_non_object_body(self):
+        # Test a JSON array body is a validation error
+        res = self.client.post(TOKEN_URL, [1, 2], format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(**LOCAL_BUCKETS)
+class PasswordRehashTests(TestCase):
+    def setUp(self):
+        get_token_bucket().clear()
+        self.addCleanup(get_token_bucket().clear)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+        )
+
+    @override_settings(
+        PASSWORD_HASHERS=[
+            "core.hashers.ScryptPasswordHasher",
+            "core.hashers.PBKDF2PasswordHasher",
+        ],
+        PASSWORD_HASHER_COST={"SCRYPT_WORK_FACTOR": 2**10},
+    )
+    def test_rehash_to_preferred_hasher_on_login(self):
+        # Test a login upgrades the hash to the preferred profile
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$"))
+
+        res = self.client.post(
+            TOKEN_URL,
+            {"email": "test@example.com", "password": "testpass123"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("scrypt$"))
+        self.assertTrue(self.user.check_password("testpass123"))
+
+    @override_settings(PASSWORD_HASHER_COST={"PBKDF2_ITERATIONS": 1000})
+    def test_rehash_when_cost_changes(self):
+        # Test a login rehashes with the configured cost
+        self.client.post(
+            TOKEN_URL,
+            {"email": "test@example.com", "password": "testpass123"},
+        )
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
@@ -0,0 +1,176 @@
+"""
+Test the stateless signed token APIs
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core.authentication import SignedTokenAuthentication
+from core.ratelimit import get_token_bucket
+
+
+TOKEN_URL = reverse("user:token")
+REFRESH_URL = reverse("user:token-refresh")
+REVOKE_URL = reverse("user:token-revoke")
+PRODUCTS_URL = reverse("product:product-list")
+
+CREDENTIALS = {"email": "test@example.com", "password": "testpass123"}
+
+
+@override_settings(RATELIMIT_BACKEND="core.ratelimit.LocalTokenBucket")
+class SignedTokenTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_token_bucket().clear()
+        self.addCleanup(get_token_bucket().clear)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(**CREDENTIALS)
+
+    def obtain_tokens(self):
+        res = self.client.post(TOKEN_URL, CREDENTIALS)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    @override_settings(SIGNED_TOKENS_ENABLED=False)
+    def test_signed_tokens_opt_in(self):
+        # Test only the DB token is issued by default
+        data = self.obtain_tokens()
+
+        self.assertIn("token", data)
+        self.assertNotIn("access", data)
+
+    @override_settings(SIGNED_TOKENS_ENABLED=True)
+    def test_access_token_authenticates_without_queries(self):
+        # Test access tokens are verified with no database round trip
+        access = self.obtain_tokens()["access"]
+        request = APIRequestFactory().get(
+            PRODUCTS_URL,
+            HTTP_AUTHORIZATION=f"Bearer {access}",
+        )
+
+        with self.assertNumQueries(0):
+            user, _ = SignedTokenAuthentication().authenticate(request)
+
+        self.assertEqual(user.pk, self.user.pk)
+
+    @override_settings(SIGNED_TOKENS_ENABLED=True)
+    def test_access_token_on_product_api(self):
+        # Test product endpoints accept access tokens
+        access = self.obtain_tokens()["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+        res = self.client.post(
+            PRODUCTS_URL,
+            {"name": "Sample product", "price": 15000},
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.get(PRODUCTS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 1)
+
+    @override_settings(SIGNED_TOKENS_ENABLED=True)
+    def test_expired_access_token_rejected(self):
+        # Test expired access tokens are rejected
+        access = self.obtain_tokens()["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+        with patch("core.tokens.time.time", return_value=2**40):
+            res = self.client.get(PRODUCTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(SIGNED_TOKENS_ENABLED=True)
+    def test_tampered_or_refresh_token_rejected(self):
+        # Test only untampered access tokens authenticate
+        tokens = self.obtain_tokens()
+        for token in (tokens["access"] + "x", tokens["refresh"]):
+            self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+            res = self.client.get(PRODUCTS_URL)
+
+            self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(SIGNED_TOKENS_ENABLED=True)
+    def test_refresh_rotates_tokens(self):
+        # Test a refresh token can be exchanged exactly once
+        refresh = self.obtain_tokens()["refresh"]
+
+        res = self.client.post(REFRESH_URL, {"refresh": refresh})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("access", res.data)
+        self.assertNotEqual(res.data["refresh"], refresh)
+
+        res = self.client.post(REFRESH_URL, {"refresh": refresh})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(SIGNED_TOKENS_ENABLED=True)
+    def test_revoked_refresh_token_rejected(self):
+        # Test a revoked refresh token can't be used
+        refresh = self.obtain_tokens()["refresh"]
+
+        res = self.client.post(REVOKE_URL, {"refresh": refresh})
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        res = self.client.post(REFRESH_URL, {"refresh": refresh})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(SIGNED_TOKENS_ENABLED=True)
+    def test_refresh_for_inactive_user_rejected(self):
+        # Test deactivated users can't refresh
+        refresh = self.obtain_tokens()["refresh"]
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.post(REFRESH_URL, {"refresh": refresh})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(SIGNED_TOKENS_ENABLED=True)
+    def test_concurrent_refresh_single_use(self):
+        # Test two refreshes racing past the revocation check can't both
+        # succeed
+        refresh = self.obtain_tokens()["refresh"]
+
+        with patch("core.tokens.cache.get", return_value=None):
+            first = self.client.post(REFRESH_URL, {"refresh": refresh})
+            second = self.client.post(REFRESH_URL, {"refresh": refresh})
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(SIGNED_TOKENS_ENABLED=True)
+    def test_refresh_after_password_change_rejected(self):
+        # Test changing the password invalidates refresh tokens
+        refresh = self.obtain_tokens()["refresh"]
+        self.user.set_password("newpass123")
+        self.user.save()
+
+        res = self.client.post(REFRESH_URL, {"refresh": refresh})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_disabled_signed_tokens_rejected(self):
+        # Test turning signed tokens off stops access and refresh tokens
+        # issued before
+        with override_settings(SIGNED_TOKENS_ENABLED=True):
+            tokens = self.obtain_tokens()
+
+        with override_settings(SIGNED_TOKENS_ENABLED=False):
+            self.client.credentials(
+                HTTP_AUTHORIZATION=f"Bearer {tokens['access']}"
+            )
+            products = self.client.get(PRODUCTS_URL)
+            self.client.credentials()
+            refresh = self.client.post(
+                REFRESH_URL, {"refresh": tokens["refresh"]}
+            )
+
+        self.assertEqual(products.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(refresh.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,5 +1,7 @@
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.urls import reverse
 
 from rest_framework.test import APIClient
@@ -45,6 +47,25 @@ class PublicUserAPITests(TestCase):
 
         res = self.client.post(CREATE_USER_URL, payload)
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("email", res.data)
+
+    def test_create_user_single_insert(self):
+        # Test registering relies on the unique constraint, not a lookup
+        payload = {
+            "email": "test@example.com",
+            "password": "testpass123",
+            "name": "Test Name",
+        }
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(CREATE_USER_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        statements = [
+            query["sql"].split()[0].upper()
+            for query in queries.captured_queries
+        ]
+        self.assertEqual(statements.count("INSERT"), 1)
+        self.assertNotIn("SELECT", statements)
 
     def test_password_too_short_error(self):
         # Test error returned if password less than 5 characters
@@ -139,9 +160,26 @@ class PrivateUserAPITests(TestCase):
         # Test updating the user profile for the authenticated user
         payload = {"name": "Updated name", "password": "newpass123"}
 
-        res = self.client.patch(ME_URL, payload)
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.patch(ME_URL, payload)
 
+        updates = [
+            query
+            for query in queries.captured_queries
+            if query["sql"].startswith("UPDATE")
+        ]
+        self.assertEqual(len(updates), 1)
         self.user.refresh_from_db()
         self.assertEqual(self.user.name, payload["name"])
         self.assertTrue(self.user.check_password(payload["password"]))
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_update_email_taken_error(self):
+        # Test changing the email to one in use returns an error
+        create_user(email="other@example.com", password="testpass123")
+
+        res = self.client.patch(ME_URL, {"email": "other@example.com"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email, "test@example.com")
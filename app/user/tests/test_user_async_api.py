@@ -0,0 +1,62 @@
+"""
+Test for the async user registration API
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+
+
+ASYNC_CREATE_USER_URL = reverse("user:async-create")
+
+PAYLOAD = {
+    "email": "test@example.com",
+    "password": "testpass123",
+    "name": "Test Name",
+}
+
+
+class AsyncCreateUserAPITests(TestCase):
+    # Test async user registration requests
+
+    async def test_create_user_success(self):
+        # Test creating a user is successful
+        res = await self.async_client.post(
+            ASYNC_CREATE_USER_URL,
+            PAYLOAD,
+            content_type="application/json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("password", res.json())
+        user = await get_user_model().objects.aget(email=PAYLOAD["email"])
+        self.assertTrue(user.check_password(PAYLOAD["password"]))
+
+    async def test_user_with_email_exists_error(self):
+        # Test error returned if user with email exists
+        await get_user_model().objects.acreate(email=PAYLOAD["email"])
+
+        res = await self.async_client.post(
+            ASYNC_CREATE_USER_URL,
+            PAYLOAD,
+            content_type="application/json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("email", res.json())
+
+    async def test_password_too_short_error(self):
+        # Test error returned if password less than 5 characters
+        res = await self.async_client.post(
+            ASYNC_CREATE_USER_URL,
+            {**PAYLOAD, "password": "test"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        exists = await get_user_model().objects.filter(
+            email=PAYLOAD["email"]
+        ).aexists()
+        self.assertFalse(exists)
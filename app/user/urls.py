@@ -3,12 +3,23 @@ URL Mappings for the user API
 """
 
 from django.urls import path
-from user import views
+from user import async_views, views
 
 app_name = "user"
 
 urlpatterns = [
     path("create/", views.CreateUserView.as_view(), name="create"),
+    path("async/create/", async_views.create_user, name="async-create"),
     path("token/", views.CreateTokenView.as_view(), name="token"),
+    path(
+        "token/refresh/",
+        views.RefreshTokenView.as_view(),
+        name="token-refresh",
+    ),
+    path(
+        "token/revoke/",
+        views.RevokeTokenView.as_view(),
+        name="token-revoke",
+    ),
     path("me/", views.ManageUserView.as_view(), name="me"),
 ]
@@ -3,25 +3,120 @@ Views for the user API
 """
 
 # Create your views here.
-from rest_framework import generics, authentication, permissions
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework import generics, authentication, permissions, status
+from rest_framework.exceptions import NotFound
+from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
 
-from user.serializers import UserSerializer, AuthTokenSerializer
+from core.throttling import LoginRateThrottle
+from core.tokens import (
+    claim_token,
+    issue_tokens,
+    matches_password,
+    revoke_token,
+)
+from core.views import MessagePackMixin, PhaseTimingMixin
+from user.serializers import (
+    UserSerializer,
+    AuthTokenSerializer,
+    SignedTokenSerializer,
+)
 
 
-class CreateUserView(generics.CreateAPIView):
+class CreateUserView(
+    PhaseTimingMixin, MessagePackMixin, generics.CreateAPIView
+):
     # Create a new user in the systems
     serializer_class = UserSerializer
 
 
-class CreateTokenView(ObtainAuthToken):
+class CreateTokenView(PhaseTimingMixin, MessagePackMixin, ObtainAuthToken):
     # Create a new auth token for user
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    # Authentication runs before throttles, a Basic header would reach the
+    # hasher ahead of the login limits
+    authentication_classes = []
+    throttle_classes = [LoginRateThrottle]
 
+    def post(self, request, *args, **kwargs):
+        # Return the DB token, plus signed tokens when they are enabled
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data["user"]
+        token, _ = Token.objects.get_or_create(user=user)
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+        data = {"token": token.key}
+        if settings.SIGNED_TOKENS_ENABLED:
+            data.update(issue_tokens(user))
+
+        return Response(data)
+
+
+class SignedTokenView(
+    PhaseTimingMixin, MessagePackMixin, generics.GenericAPIView
+):
+    # Base view for the signed refresh token endpoints
+    authentication_classes = []
+    permission_classes = []
+    serializer_class = SignedTokenSerializer
+
+    def initial(self, request, *args, **kwargs):
+        if not settings.SIGNED_TOKENS_ENABLED:
+            raise NotFound("Signed tokens are disabled.")
+        super().initial(request, *args, **kwargs)
+
+    def get_payload(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data["refresh"]
+
+
+class RefreshTokenView(SignedTokenView):
+    # Exchange a refresh token for a new access and refresh token pair
+    def post(self, request, *args, **kwargs):
+        payload = self.get_payload(request)
+        # Refresh tokens are single use, the first request claiming one
+        # wins
+        if not claim_token(payload):
+            return Response(
+                {"refresh": ["Token has been revoked"]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        user = (
+            get_user_model()
+            .objects.filter(pk=payload["uid"], is_active=True)
+            .first()
+        )
+        if user is None:
+            return Response(
+                {"refresh": ["User is inactive or deleted"]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not matches_password(payload, user):
+            return Response(
+                {"refresh": ["Password changed since the token was issued"]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(issue_tokens(user))
+
+
+class RevokeTokenView(SignedTokenView):
+    # Revoke a refresh token, e.g. on logout
+    def post(self, request, *args, **kwargs):
+        revoke_token(self.get_payload(request))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ManageUserView(
+    PhaseTimingMixin, MessagePackMixin, generics.RetrieveUpdateAPIView
+):
     # Manage the authenticated user
     serializer_class = UserSerializer
     authentication_classes = [authentication.TokenAuthentication]